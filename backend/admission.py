@@ -0,0 +1,190 @@
+"""
+Admission control: a concurrency limit with a bounded priority queue. Requests
+that cannot start in time for their deadline are shed right away with a 503
+instead of waiting until the client has given up
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+from typing import Any, Dict, Optional
+
+
+class RequestClass:
+    """Priority (lower is served first), default deadline and running service-time estimate"""
+
+    def __init__(self, name: str, priority: int, deadline_ms: float):
+        self.name = name
+        self.priority = priority
+        self.deadline_ms = deadline_ms
+        # Exponentially weighted mean of how long admitted requests took
+        self.service_ms = 10.0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "evicted": 0, "deadline": 0, "timeout": 0}
+        self.queued = 0
+
+    def observe(self, elapsed_ms: float):
+        self.service_ms += 0.2 * (elapsed_ms - self.service_ms)
+
+
+class Shed(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _granted(waiter: asyncio.Future) -> bool:
+    return waiter.done() and not waiter.cancelled() and waiter.exception() is None
+
+
+class AdmissionController:
+    """At most `limit` requests run at once; up to `queue_size` more wait by priority.
+
+    A request is shed immediately when its estimated queueing delay plus its
+    class's service time would overrun its deadline, or when the queue is full
+    of requests with the same or higher priority; otherwise the newest waiter
+    of the lowest priority class is shed to make room. A queued request whose
+    deadline passes before it gets a slot is shed as well. Retry-After is the
+    estimated time until the queue drains.
+    """
+
+    def __init__(self, limit: int, queue_size: int, classes: Dict[str, RequestClass]):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.classes = classes
+        self.active = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+
+    def queue_depth(self) -> int:
+        return sum(request_class.queued for request_class in self.classes.values())
+
+    def _estimated_wait_ms(self, priority: int) -> float:
+        """Time until a new request of this priority would get a slot"""
+        if self.active < self.limit and not self.queue_depth():
+            return 0.0
+        ahead = [c for c in self.classes.values() if c.priority <= priority]
+        work = sum(c.queued * c.service_ms for c in ahead)
+        running = min(c.service_ms for c in self.classes.values())
+        return (work + running) / self.limit
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained"""
+        work = sum(c.queued * c.service_ms for c in self.classes.values())
+        return max(1, math.ceil(work / self.limit / 1000))
+
+    async def acquire(self, request_class: RequestClass, deadline: float):
+        """Wait for a slot; deadline is in loop.time() seconds. Raises Shed."""
+        loop = asyncio.get_running_loop()
+        if self.active < self.limit and not self.queue_depth():
+            self.active += 1
+            request_class.admitted += 1
+            return
+
+        expected = (self._estimated_wait_ms(request_class.priority) + request_class.service_ms) / 1000
+        if loop.time() + expected > deadline:
+            request_class.shed["deadline"] += 1
+            raise Shed("deadline", self.retry_after())
+        if self.queue_depth() >= self.queue_size and not self._evict(request_class.priority):
+            request_class.shed["queue_full"] += 1
+            raise Shed("queue_full", self.retry_after())
+
+        waiter = loop.create_future()
+        heapq.heappush(self._waiters, (request_class.priority, next(self._sequence), waiter, request_class))
+        request_class.queued += 1
+        try:
+            await asyncio.wait_for(waiter, timeout=max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            # A slot handed over just as the deadline passed is still used
+            if not _granted(waiter):
+                request_class.queued -= 1
+                request_class.shed["timeout"] += 1
+                raise Shed("timeout", self.retry_after())
+        except Shed:
+            raise
+        except BaseException:
+            # Client went away while queued
+            if _granted(waiter):
+                self.release()
+            else:
+                request_class.queued -= 1
+            raise
+        request_class.admitted += 1
+
+    def _evict(self, priority: int) -> bool:
+        """Shed the newest waiter of a class with lower priority than `priority`, if any"""
+        waiting = [entry for entry in self._waiters if not entry[2].done() and entry[0] > priority]
+        if not waiting:
+            return False
+        _, _, waiter, request_class = max(waiting, key=lambda entry: (entry[0], entry[1]))
+        request_class.queued -= 1
+        request_class.shed["evicted"] += 1
+        waiter.set_exception(Shed("evicted", self.retry_after()))
+        return True
+
+    def release(self):
+        """Hand the slot to the highest priority waiter that is still waiting"""
+        while self._waiters:
+            _, _, waiter, request_class = heapq.heappop(self._waiters)
+            if not waiter.done():
+                request_class.queued -= 1
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "queue_depth": self.queue_depth(),
+            "classes": {
+                name: {
+                    "priority": c.priority,
+                    "deadline_ms": c.deadline_ms,
+                    "service_ms": round(c.service_ms, 3),
+                    "queued": c.queued,
+                    "admitted": c.admitted,
+                    "shed": dict(c.shed)
+                }
+                for name, c in self.classes.items()
+            }
+        }
+
+
+# Interactive autocomplete first, then everything else, then the heavier compare
+REQUEST_CLASSES = {
+    "autocomplete": RequestClass("autocomplete", 0, float(os.getenv("ADMISSION_AUTOCOMPLETE_DEADLINE_MS", "500"))),
+    "default": RequestClass("default", 1, float(os.getenv("ADMISSION_DEFAULT_DEADLINE_MS", "2000"))),
+    "compare": RequestClass("compare", 2, float(os.getenv("ADMISSION_COMPARE_DEADLINE_MS", "3000"))),
+}
+CLASS_BY_PATH = {
+    "/api/colleges/autocomplete": "autocomplete",
+    "/api/colleges/compare": "compare",
+}
+# Clients may ask for a shorter (or longer, up to this cap) deadline
+DEADLINE_HEADER = "x-request-deadline-ms"
+MAX_DEADLINE_MS = 30000
+
+admission = AdmissionController(
+    limit=int(os.getenv("ADMISSION_CONCURRENCY", "16")),
+    queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "256")),
+    classes=REQUEST_CLASSES
+)
+
+
+def classify(path: str) -> Optional[RequestClass]:
+    """Request class for an API path; health checks and admin endpoints are never limited"""
+    if not path.startswith("/api/") or path.startswith("/api/admin/"):
+        return None
+    return REQUEST_CLASSES[CLASS_BY_PATH.get(path, "default")]
+
+
+def deadline_ms(request_class: RequestClass, headers) -> float:
+    try:
+        requested = float(headers.get(DEADLINE_HEADER, ""))
+    except ValueError:
+        return request_class.deadline_ms
+    return min(max(requested, 0.0), MAX_DEADLINE_MS)
@@ -0,0 +1,86 @@
+"""
+Per-connection autocomplete state for the WebSocket channel: each keystroke
+narrows the previous query's matches instead of scanning every college name
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+# Earlier queries kept per session for backspacing
+MAX_DEPTH = 64
+
+
+class AutocompleteSession:
+    """Substring matches of the last queries a client typed, as a stack.
+
+    A name containing a query also contains every substring of it, so when the
+    new query extends (or contains) the one on top of the stack, only that
+    query's matches need checking. Queries the new one no longer contains are
+    popped first, which makes backspace a lookup of an earlier state. Matches
+    keep table order, so results equal a full scan's.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.names: Sequence[str] = ()
+        self.stack: List[tuple] = []
+        self.full_scans = 0
+        self.narrowed = 0
+        self.cached = 0
+
+    def reset(self, version: Any, names: Sequence[str]):
+        """Start over against a new model version's (lower-cased) college names"""
+        self.version = version
+        self.names = names
+        self.stack = []
+
+    def matches(self, query: str) -> List[int]:
+        """Positions of the names containing query (already lower-cased and stripped)"""
+        while self.stack and self.stack[-1][0] not in query:
+            self.stack.pop()
+        if self.stack and self.stack[-1][0] == query:
+            self.cached += 1
+            return self.stack[-1][1]
+
+        names = self.names
+        if self.stack:
+            self.narrowed += 1
+            found = [position for position in self.stack[-1][1] if query in names[position]]
+        else:
+            self.full_scans += 1
+            found = [position for position, name in enumerate(names) if query in name]
+        if len(self.stack) >= MAX_DEPTH:
+            del self.stack[0]
+        self.stack.append((query, found))
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        return {"full_scans": self.full_scans, "narrowed": self.narrowed, "cached": self.cached}
+
+
+class SessionRegistry:
+    """Open sessions plus counters of the ones that have closed"""
+
+    def __init__(self):
+        self.sessions = set()
+        self.closed = {"full_scans": 0, "narrowed": 0, "cached": 0}
+        self.stale_dropped = 0
+
+    def open(self) -> AutocompleteSession:
+        session = AutocompleteSession()
+        self.sessions.add(session)
+        return session
+
+    def close(self, session: Optional[AutocompleteSession]):
+        if session in self.sessions:
+            self.sessions.discard(session)
+            for name, count in session.stats().items():
+                self.closed[name] += count
+
+    def stats(self) -> Dict[str, int]:
+        totals = dict(self.closed)
+        for session in self.sessions:
+            for name, count in session.stats().items():
+                totals[name] += count
+        return {"open_sessions": len(self.sessions), "stale_dropped": self.stale_dropped, **totals}
+
+
+sessions = SessionRegistry()
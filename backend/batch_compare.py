@@ -0,0 +1,144 @@
+"""
+Batch college comparisons for offline jobs.
+
+Reads one pair per line from a file (or stdin) and streams one JSON result per
+line, in input order. Each result body is exactly what POST
+/api/colleges/compare returns. The model is loaded once and the pairs are
+spread over a process pool.
+
+Input lines are either two college names separated by a tab, or a compare
+request body as JSON:
+    VJTI<TAB>ICT
+    {"colleges": ["PICT", "SPCE"], "personalization": {"category": "OBC", ...}}
+
+Usage:
+    python batch_compare.py pairs.txt -o results.jsonl --workers 8
+    cat pairs.txt | python batch_compare.py - --personalization profile.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+import main
+from main import CompareRequest, PersonalizationFactors
+
+# Personalization used for plain "name<TAB>name" lines, set in each worker
+default_personalization: Optional[PersonalizationFactors] = None
+
+
+def init_worker(personalization: Optional[Dict[str, Any]], quiet: bool):
+    """Load the model once per process; forked workers inherit the parent's copy"""
+    global default_personalization
+    # The API's log lines must not end up in the JSONL output
+    sys.stdout = open(os.devnull, "w") if quiet else sys.stderr
+    default_personalization = PersonalizationFactors(**personalization) if personalization else None
+    if main.default_dataset() is None:
+        main.load_model()
+        main.warm_up()
+
+
+def parse_line(line: str) -> CompareRequest:
+    if line.lstrip().startswith("{"):
+        request = CompareRequest(**json.loads(line))
+        if request.personalization is None:
+            request.personalization = default_personalization
+        return request
+    names = [name.strip() for name in line.split("\t")]
+    return CompareRequest(colleges=names, personalization=default_personalization)
+
+
+def compare_line(job: Tuple[int, str]) -> Tuple[bool, str]:
+    """One JSONL result line; errors are reported per line and never stop the batch"""
+    line_number, line = job
+    record: Dict[str, Any] = {"line": line_number}
+    try:
+        request = parse_line(line)
+        record["colleges"] = request.colleges
+        if len(request.colleges) < 2:
+            record["error"] = "At least 2 colleges required for comparison"
+        else:
+            result = main.build_comparison(request.colleges[0], request.colleges[1], request.personalization)
+            if result is None:
+                record["error"] = "One or both colleges not found"
+            else:
+                record["result"] = jsonable_encoder(result)
+    except Exception as e:
+        record["error"] = f"Comparison failed: {str(e)}"
+    return "error" in record, json.dumps(record, ensure_ascii=False)
+
+
+def read_jobs(source):
+    for line_number, line in enumerate(source, start=1):
+        line = line.rstrip("\r\n")
+        if line.strip() and not line.startswith("#"):
+            yield line_number, line
+
+
+def run(args):
+    personalization = None
+    if args.personalization:
+        with open(args.personalization, "r", encoding="utf-8") as f:
+            personalization = json.load(f)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+
+    started = time.perf_counter()
+    # Loaded here first so forked workers share the warm model instead of reloading it
+    init_worker(personalization, args.quiet)
+    if main.default_dataset() is None:
+        print("[ERROR] Model could not be loaded", file=sys.stderr)
+        return 1
+    print(f"[INFO] Model ready in {time.perf_counter() - started:.2f}s, using {args.workers} worker(s)", file=sys.stderr)
+
+    count = errors = 0
+    jobs = read_jobs(source)
+    if args.workers > 1:
+        pool = multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(personalization, args.quiet))
+        results = pool.imap(compare_line, jobs, chunksize=args.chunksize)
+    else:
+        pool = None
+        results = map(compare_line, jobs)
+
+    try:
+        for failed, record in results:
+            output.write(record + "\n")
+            count += 1
+            errors += failed
+            if count % 1000 == 0:
+                output.flush()
+                print(f"[INFO] {count} pairs compared", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        output.flush()
+        if output is not sys.stdout:
+            output.close()
+        if source is not sys.stdin:
+            source.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"[SUCCESS] {count} pairs ({errors} errors) in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare college pairs in bulk and stream JSONL results")
+    parser.add_argument("input", help="File with one pair per line, or '-' for stdin")
+    parser.add_argument("-o", "--output", help="Write JSONL here instead of stdout")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = no pool)")
+    parser.add_argument("--chunksize", type=int, default=64, help="Pairs handed to a worker at a time")
+    parser.add_argument("--personalization", help="JSON file with the default personalization profile")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Discard the API's log output instead of sending it to stderr")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -0,0 +1,96 @@
+"""
+Benchmark response size and server time with field projection and compression.
+
+Sends compare, search and list requests to the app in-process (no network)
+with and without ?fields= and with identity, gzip and brotli encoding, and
+reports bytes on the wire and mean server time per request.
+
+Usage:
+    python bench_payload.py [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.append(str(Path(__file__).parent / "my uploded files" / "final_comparator"))
+
+import main
+from compression import brotli
+from singleflight import coalescer
+
+COMPARE_BODY = {
+    "colleges": ["Veermata Jijabai Technological Institute", "Institute of Chemical Technology"],
+    "personalization": {
+        "category": "OBC",
+        "gender": "Female",
+        "domicile": "Maharashtra",
+        "maxBudget": 300000,
+        "hostelRequired": True
+    }
+}
+# What the comparison cards in src/components/ComparisonResults.tsx display
+CARD_FIELDS = ("score,strengths,weaknesses,quota_insights,city,state,type,established,total_students,"
+               "total_faculty,student_faculty_ratio,google_maps")
+# (endpoint, fields label, method, url, body); the first case of an endpoint is its baseline
+CASES = [
+    ("compare", "all", "POST", "/api/colleges/compare", COMPARE_BODY),
+    ("compare", "cards", "POST", f"/api/colleges/compare?fields={CARD_FIELDS}", COMPARE_BODY),
+    ("search", "all", "GET", "/api/colleges/search?query=VJTI", None),
+    ("search", "name,city", "GET", "/api/colleges/search?query=VJTI&fields=name,city", None),
+    ("list 200", "all", "GET", "/api/colleges/list?limit=200", None),
+    ("list 200", "name", "GET", "/api/colleges/list?limit=200&fields=name", None),
+]
+ENCODINGS = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+
+async def measure(client: httpx.AsyncClient, method: str, url: str, body, encoding: str, count: int):
+    headers = {"Accept-Encoding": encoding}
+    response = await client.request(method, url, json=body, headers=headers)
+    assert response.status_code == 200, response.text
+    start = time.perf_counter()
+    for _ in range(count):
+        await client.request(method, url, json=body, headers=headers)
+    elapsed = time.perf_counter() - start
+    wire = int(response.headers.get("content-length", len(response.content)))
+    return wire, elapsed * 1000 / count
+
+
+async def run(count: int):
+    transport = httpx.ASGITransport(app=main.app)
+    results = []
+    # Sizes come from Content-Length, i.e. before httpx decodes the body
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint, fields, method, url, body in CASES:
+            for encoding in ENCODINGS:
+                results.append((endpoint, fields, encoding) + await measure(client, method, url, body, encoding, count))
+    return results
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Bytes and server time per request with projection and compression")
+    parser.add_argument("--requests", type=int, default=200, help="Sequential requests per measurement")
+    args = parser.parse_args()
+
+    main.load_model()
+    main.warm_up()
+    # Measure the work itself, not sharing between identical requests
+    coalescer.enabled = False
+    sys.stdout, report = open(os.devnull, "w"), sys.stdout
+    results = asyncio.run(run(args.requests))
+    sys.stdout = report
+
+    baseline = {}
+    print(f"{'request':<10}{'fields':<11}{'encoding':<10}{'bytes':>8}{'saved':>7}{'ms/req':>9}{'vs base':>9}")
+    for endpoint, fields, encoding, wire, ms in results:
+        full_wire, full_ms = baseline.setdefault(endpoint, (wire, ms))
+        print(f"{endpoint:<10}{fields:<11}{encoding:<10}{wire:>8}{1 - wire / full_wire:>7.0%}{ms:>9.3f}"
+              f"{ms - full_ms:>+9.3f}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
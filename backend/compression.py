@@ -0,0 +1,111 @@
+"""
+Response compression: bodies above a size threshold are sent brotli or gzip
+encoded, whichever the client accepts (brotli only if the 'brotli' package is
+installed)
+"""
+import gzip
+import os
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+# Small bodies are not worth the CPU time or the encoding headers
+MIN_SIZE = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+# Quality 11 (the default) is far too slow for dynamic responses
+BROTLI_QUALITY = 4
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Encodings named in an Accept-Encoding header with their q-values"""
+    encodings = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    encodings = accepted_encodings(accept_encoding)
+    wildcard = encodings.get("*", 0.0)
+    choices = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(choices, key=lambda name: encodings.get(name, wildcard))
+    return best if encodings.get(best, wildcard) > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """ASGI middleware that buffers a response and compresses it when it is big enough.
+
+    Responses that vary by encoding get 'Vary: Accept-Encoding', and a
+    compressed response's ETag is made weak, since its bytes differ from the
+    identity representation. Responses that already carry a Content-Encoding,
+    304s and non-text bodies pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+        encoding = choose_encoding(accept) if accept else None
+
+        start = None
+        chunks: List[bytes] = []
+
+        async def buffered_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._send(start, b"".join(chunks), encoding, send)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _send(self, start, body: bytes, encoding: Optional[str], send):
+        headers: List[Tuple[bytes, bytes]] = list(start.get("headers", []))
+        names = {name.lower() for name, _ in headers}
+        content_type = next((value.decode("latin-1") for name, value in headers if name.lower() == b"content-type"), "")
+        eligible = (len(body) >= self.minimum_size and b"content-encoding" not in names
+                    and content_type.startswith(COMPRESSIBLE_TYPES))
+        if eligible:
+            headers.append((b"vary", b"Accept-Encoding"))
+            if encoding:
+                body = compress(body, encoding)
+                headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+                headers.append((b"content-length", str(len(body)).encode()))
+                headers.append((b"content-encoding", encoding.encode()))
+                headers = [(name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+                           for name, value in headers]
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+MODEL_DIR = Path(__file__).parent / "my uploded files" / "final_comparator"
+sys.path.append(str(MODEL_DIR))
+
+
+@pytest.fixture
+def model():
+    """A fresh model built from the bundled CSV, safe to modify"""
+    from build_model import CollegeComparator
+    return CollegeComparator(str(MODEL_DIR / "maharashtra_colleges_location.csv"))
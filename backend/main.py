@@ -1,17 +1,56 @@
-from fastapi import FastAPI, HTTPException
+import time
+STARTED_AT = time.perf_counter()
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from starlette.concurrency import run_in_threadpool
+from typing import FrozenSet, List, Optional, Dict, Any
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import os
 import pickle
 import sys
+import threading
 from pathlib import Path
-import pandas as pd
-import numpy as np
 
 # Add the uploaded files directory to path so we can import the model
 sys.path.append(str(Path(__file__).parent / "my uploded files" / "final_comparator"))
 
-from build_model import CollegeComparator
+from admission import Shed, admission, classify, deadline_ms
+from autocomplete_session import AutocompleteSession, sessions
+from compression import CompressionMiddleware
+from singleflight import coalescer
+from profiling import (clear_samples, finish_profile, recent_samples, record_startup_phase, should_profile,
+                       span, start_profile, startup_phase, startup_report)
+
+record_startup_phase("app_imports", (time.perf_counter() - STARTED_AT) * 1000)
+
+# pandas, numpy and the model code are imported by import_model_modules() when
+# the model loads, so the process can answer /health before they are ready
+pd = np = None
+CollegeComparator = SKYLINE_CRITERIA = ScoringKernel = None
+college_features = load_rules = merge_rules = table_features = candidate_mask = select_shortlist = None
+
+def import_model_modules():
+    """Import the heavy modules the model and scoring code depend on (once)"""
+    global pd, np, CollegeComparator, SKYLINE_CRITERIA, ScoringKernel, college_features, load_rules, merge_rules, table_features
+    global candidate_mask, select_shortlist
+    if CollegeComparator is not None:
+        return
+    with startup_phase("model_imports"):
+        import pandas as pd
+        import numpy as np
+        from build_model import CollegeComparator
+        from skyline import CRITERIA as SKYLINE_CRITERIA
+        from scoring import ScoringKernel, college_features, load_rules, merge_rules, table_features
+        from shortlist import candidate_mask, select as select_shortlist
 
 app = FastAPI(
     title="Margadarshak College Comparator API",
@@ -19,43 +58,301 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Configure CORS
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profile requests sent with 'X-Profile: 1' or picked by PROFILE_SAMPLE_RATE"""
+    forced = should_profile(request.headers)
+    if forced is None:
+        return await call_next(request)
+    
+    profile = start_profile(request.method, request.url.path, forced)
+    response = await call_next(request)
+    finish_profile(profile)
+    response.headers["Server-Timing"] = profile.server_timing()
+    return response
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Limit concurrent API work; shed requests that would miss their deadline with a fast 503"""
+    request_class = classify(request.url.path)
+    if request_class is None:
+        return await call_next(request)
+    
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        await admission.acquire(request_class, started + deadline_ms(request_class, request.headers) / 1000)
+    except Shed as shed:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server busy, please retry", "reason": shed.reason},
+            headers={"Retry-After": str(shed.retry_after)}
+        )
+    
+    admitted = loop.time()
+    try:
+        return await call_next(request)
+    finally:
+        request_class.observe((loop.time() - admitted) * 1000)
+        admission.release()
+
+# Middleware added last runs first: CORS stays outermost so shed 503s and
+# compressed responses carry the CORS headers too
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After", "ETag"],
 )
 
 # Load the college comparator model
 MODEL_PATH = Path(__file__).parent / "my uploded files" / "final_comparator" / "college_comparator.pkl"
-comparator_model: CollegeComparator = None
+# Optional pre-warmed snapshot (model with every index built plus the scoring
+# bases), written by 'python main.py --snapshot' and used while it is fresh
+SNAPSHOT_PATH = Path(os.getenv("MODEL_SNAPSHOT_PATH", MODEL_PATH.with_name("college_comparator.warm.pkl")))
+# Bump when the snapshot layout changes; edits to these modules make a snapshot stale as well
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_CODE_MODULES = ("build_model", "aliases", "bitmaps", "course_index", "facets", "features", "retrieval",
+                         "similarity", "skyline", "scoring", __name__)
+# Served snapshots of the college data by name: the model above (DEFAULT_DATASET)
+# plus one derived snapshot per overlay file in DATASETS_DIR, e.g. '2024.csv'
+DEFAULT_DATASET = os.getenv("DEFAULT_DATASET", "current")
+DATASETS_DIR = Path(os.getenv("DATASETS_DIR", MODEL_PATH.with_name("datasets")))
+datasets: Dict[str, "Dataset"] = {}
+# A dataset gets a new version when it is created or one of its colleges changes,
+# so coalesced requests never share a result computed against older data
+dataset_versions = itertools.count(1)
+# How long browsers and CDNs may reuse a read response before revalidating it
+CACHE_CONTROL = f"public, max-age={int(os.getenv('CACHE_MAX_AGE', '60'))}"
+# Adding and editing colleges needs this token in X-Admin-Token; unset, the write endpoints are disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Serializes model reads done in the thread pool with in-place college updates
+model_lock = threading.RLock()
+# Readiness, separate from liveness: starting -> loading -> ready (or failed)
+model_status = "starting"
+model_warm = False
+# Versioned scoring/quota rule table, loaded and compiled together with the model
+scoring_rules: Dict[str, Any] = None
+scoring_kernel: "ScoringKernel" = None
+# Fields ?fields= can select; college_name / id are always included
+CARD_DATA_FIELDS = ("city", "state", "type", "established", "university", "campus_size", "total_students",
+                    "total_faculty", "student_faculty_ratio", "fees", "rating", "facilities", "courses", "google_maps")
+CARD_FIELDS = ("score", "ranking", "strengths", "weaknesses", "quota_insights") + CARD_DATA_FIELDS
+SEARCH_FIELDS = ("name", "city", "type", "university", "fees", "students", "faculty", "rating")
+LIST_FIELDS = ("name", "city", "type", "fees")
+# Columns every college needs; summaries and filters read them for every row
+REQUIRED_COLLEGE_FIELDS = ("College Name", "City", "College Type")
+# Columns /api/datasets/diff can compare, by API name
+DIFF_COLUMNS = {
+    "fees": "Average Fees",
+    "rating": "Rating",
+    "students": "Total Student Enrollments",
+    "faculty": "Total Faculty",
+    "type": "College Type",
+    "university": "University",
+    "city": "City",
+    "courses": "Courses",
+    "facilities": "Facilities",
+}
+
+class Dataset:
+    """One servable snapshot of the college data and the scoring state derived from it"""
+    def __init__(self, name: str, model: "CollegeComparator", base: Optional[str] = None, changed: List[str] = ()):
+        self.name = name
+        self.model = model
+        # Dataset this one was derived from and the columns it replaces
+        self.base = base
+        self.changed = list(changed)
+        # User-independent scoring base per college id, built in bulk or on first use
+        self.college_bases: Dict[int, Dict[str, Any]] = {}
+        # Scoring inputs of the whole table for vectorized rule evaluation
+        self.score_features: Dict[str, Any] = None
+        self.touch()
+    
+    def touch(self):
+        """New version and content hash (the ETag of read endpoints) after a change"""
+        self.version = next(dataset_versions)
+        self.etag = content_hash(self.model.df)
+        # Lower-cased college names for autocomplete sessions, built on first use
+        self.names: List[str] = None
+    
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "base": self.base,
+            "changed_columns": self.changed,
+            "colleges": len(self.model.df),
+            "version": self.version,
+            "etag": self.etag,
+            "shared_indexes": sorted(self.model.__dict__.get("shared_indexes", ()))
+        }
+
+class ModelUnpickler(pickle.Unpickler):
+    """build_model.py pickles the model from __main__; resolve it to the build_model module"""
+    def find_class(self, module, name):
+        if module == "__main__" and name == "CollegeComparator":
+            return CollegeComparator
+        return super().find_class(module, name)
+
+def snapshot_source() -> Dict[str, Any]:
+    """Freshness key of a snapshot: size and mtime of the files it is derived from,
+    plus a hash of the code that builds its indexes and scoring bases"""
+    from scoring import RULES_PATH
+    code = hashlib.sha256(str(SNAPSHOT_FORMAT).encode())
+    for name in SNAPSHOT_CODE_MODULES:
+        code.update(Path(sys.modules[name].__file__).read_bytes())
+    return {
+        "files": [[path.stat().st_size, path.stat().st_mtime_ns] for path in (MODEL_PATH, RULES_PATH)],
+        "code": code.hexdigest()
+    }
+
+def load_snapshot() -> Optional[Dataset]:
+    """Restore the pre-warmed snapshot if there is one for the current model and rules"""
+    if not SNAPSHOT_PATH.exists():
+        return None
+    try:
+        with startup_phase("snapshot_load"):
+            with open(SNAPSHOT_PATH, "rb") as f:
+                snapshot = ModelUnpickler(f).load()
+        if snapshot["source"] != snapshot_source():
+            print(f"[INFO] Ignoring stale snapshot: {SNAPSHOT_PATH}")
+            return None
+    except Exception as e:
+        print(f"[ERROR] Failed to read snapshot: {str(e)}")
+        return None
+    ds = Dataset(DEFAULT_DATASET, snapshot["model"])
+    ds.college_bases = snapshot["college_bases"]
+    ds.score_features = snapshot["score_features"]
+    print(f"[INFO] Loaded pre-warmed snapshot: {SNAPSHOT_PATH}")
+    return ds
+
+def save_snapshot():
+    """Warm the loaded model completely and write it as the pre-warmed snapshot"""
+    warm_up()
+    ds = datasets[DEFAULT_DATASET]
+    snapshot = {
+        "source": snapshot_source(),
+        "model": ds.model,
+        "college_bases": ds.college_bases,
+        "score_features": ds.score_features,
+    }
+    with open(SNAPSHOT_PATH, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"[SUCCESS] Snapshot saved: {SNAPSHOT_PATH}")
 
 def load_model():
-    global comparator_model
+    """Load the model and rules; indexes and scoring bases are built lazily or by warm_up()"""
+    global datasets, model_status, model_warm
+    model_status = "loading"
+    model_warm = False
     try:
+        import_model_modules()
         print(f"[INFO] Loading model from: {MODEL_PATH}")
         if not MODEL_PATH.exists():
             print(f"[ERROR] Model file does not exist at: {MODEL_PATH}")
             print("  Please ensure the file is present or run 'python build_model.py'")
+            model_status = "failed"
             return
         
-        with open(MODEL_PATH, "rb") as f:
-            comparator_model = pickle.load(f)
+        ds = load_snapshot()
+        if ds is None:
+            with startup_phase("unpickle"):
+                with open(MODEL_PATH, "rb") as f:
+                    model = ModelUnpickler(f).load()
+            with startup_phase("content_hash"):
+                ds = Dataset(DEFAULT_DATASET, model)
+        with startup_phase("scoring_rules"):
+            load_scoring_rules()
+        # Derived snapshots are rebuilt from the new model by warm_up()
+        datasets = {DEFAULT_DATASET: ds}
+        model_status = "ready"
         print(f"✓ Model loaded successfully!")
-        print(f"  Total colleges in database: {len(comparator_model.df)}")
+        print(f"  Total colleges in database: {len(ds.model.df)}")
     except FileNotFoundError:
+        model_status = "failed"
         print(f"⚠ Model file not found at {MODEL_PATH}")
         print("  Please run 'python build_model.py' in the final_comparator directory")
     except Exception as e:
+        model_status = "failed"
         print(f"[ERROR] Failed to load model: {str(e)}")
         import traceback
         traceback.print_exc()
 
+def warm_up():
+    """Build every index and scoring base and touch the hot paths once"""
+    global model_warm
+    ds = default_dataset()
+    if ds is None:
+        return
+    with startup_phase("index_build"):
+        ds.model.build_indexes()
+    with startup_phase("scoring_bases"):
+        if len(ds.college_bases) != len(ds.model.df) or ds.score_features is None:
+            build_college_bases(ds)
+    with startup_phase("datasets"):
+        load_datasets()
+    with startup_phase("warmup"):
+        name = ds.model.df["College Name"].iloc[0]
+        ds.model.df["name_clean"].str.contains(name[:3].lower(), regex=False, na=False)
+        ds.model.find_college(name)
+        scoring_kernel.score(ds.score_features, None)
+    model_warm = True
+
+def load_datasets():
+    """Derive a snapshot from the default dataset for every overlay CSV in DATASETS_DIR.
+
+    An overlay identifies colleges by an 'id' column (college id) or else by
+    'College Name', and has the columns that differ in that snapshot (e.g.
+    'Average Fees', 'Rating'). Colleges it leaves out, or cells it leaves
+    empty, keep the default dataset's values. Names shared by several
+    colleges cannot be matched and need an 'id'.
+    """
+    base = datasets[DEFAULT_DATASET]
+    if not DATASETS_DIR.is_dir():
+        return
+    names = base.model.df["name_clean"]
+    unique = names[~names.duplicated(keep=False)]
+    ids_by_name = pd.Series(unique.index, index=unique.to_numpy())
+    for path in sorted(DATASETS_DIR.glob("*.csv")):
+        name = path.stem
+        if name == DEFAULT_DATASET:
+            print(f"[ERROR] Dataset overlay {path.name} would replace the default dataset, skipped")
+            continue
+        try:
+            overlay = pd.read_csv(path)
+            if "id" in overlay.columns:
+                ids = pd.to_numeric(overlay.pop("id"), errors="coerce")
+                ids = ids.where(ids.isin(base.model.df.index))
+            else:
+                ids = overlay.pop("College Name").str.lower().str.strip().map(ids_by_name)
+            known = ids.notna().to_numpy()
+            if not known.all():
+                print(f"[INFO] {path.name}: {int((~known).sum())} colleges unknown or ambiguous in the default dataset, skipped")
+            changes = overlay[known].set_axis(ids[known].astype(int).to_numpy())
+            with model_lock:
+                model, changed = base.model.derive(changes)
+            datasets[name] = Dataset(name, model, base=base.name, changed=changed)
+            print(f"[INFO] Dataset '{name}': {len(changes)} colleges, changed {changed}")
+        except Exception as e:
+            print(f"[ERROR] Failed to load dataset {path.name}: {str(e)}")
+
+def load_and_warm():
+    load_model()
+    if model_status == "ready":
+        print(f"[INFO] Model ready {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms after process start")
+        warm_up()
+    print("[INFO] Startup timing (ms):")
+    for phase, ms in startup_report()["phases_ms"].items():
+        print(f"  {phase:<14} {ms:>9.1f}")
+
 @app.on_event("startup")
 async def startup_event():
-    load_model()
+    # Load in the background so liveness (/health) is answered right away and
+    # readiness (/ready) flips once the model can serve requests
+    threading.Thread(target=load_and_warm, daemon=True).start()
 
 # Request/Response Models
 class PersonalizationFactors(BaseModel):
@@ -90,6 +387,60 @@ class CompareRequest(BaseModel):
 class SearchRequest(BaseModel):
     query: str
 
+class CollegeUpdateRequest(BaseModel):
+    fields: Dict[str, Any]
+
+class RuleVariantsRequest(BaseModel):
+    variants: Dict[str, Dict[str, Any]] = {}
+    personalization: Optional[PersonalizationFactors] = None
+    limit: int = 10
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "variants": {
+                    "rating_heavy": {"score": {"rating_weight": 2.0}},
+                    "strict_budget": {"score": {"over_budget_points": -3.0}}
+                },
+                "personalization": {
+                    "category": "General",
+                    "gender": "Male",
+                    "domicile": "Maharashtra",
+                    "maxBudget": 300000
+                }
+            }
+        }
+
+class ShortlistRequest(BaseModel):
+    personalization: Optional[PersonalizationFactors] = None
+    # Hard constraints; personalization.maxBudget only lowers the score of expensive colleges
+    maxFees: Optional[float] = None
+    allowUnknownFees: bool = False
+    facilities: List[str] = []
+    programs: List[str] = []
+    cities: List[str] = []
+    maxPerCity: Optional[int] = None
+    size: int = 20
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "personalization": {
+                    "category": "OBC",
+                    "gender": "Female",
+                    "domicile": "Maharashtra",
+                    "maxBudget": 200000,
+                    "locationPreference": ["Pune"]
+                },
+                "maxFees": 250000,
+                "facilities": ["Hostel", "Library"],
+                "programs": ["B.Tech"],
+                "cities": ["Pune", "Mumbai"],
+                "maxPerCity": 12,
+                "size": 20
+            }
+        }
+
 # API Endpoints
 @app.get("/")
 async def root():
@@ -97,81 +448,110 @@ async def root():
         "message": "Margadarshak College Comparator API",
         "version": "1.0.0",
         "status": "online",
-        "model_loaded": comparator_model is not None
+        "model_loaded": default_dataset() is not None
     }
 
 @app.get("/health")
 async def health_check():
+    """Liveness: the process is up, whether or not the model has loaded"""
     return {
         "status": "healthy",
-        "model_loaded": comparator_model is not None
+        "model_loaded": default_dataset() is not None,
+        "model_status": model_status
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 until the model is loaded and can serve requests"""
+    body = {"ready": model_status == "ready", "model_status": model_status, "warm": model_warm}
+    if model_status != "ready":
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "1"})
+    return body
+
+@app.get("/api/admin/admission")
+async def get_admission_stats():
+    """Concurrency limit, queue depth and admitted/shed counts per request class"""
+    return {"success": True, **admission.stats()}
+
+@app.get("/api/admin/autocomplete")
+async def get_autocomplete_stats():
+    """Open WebSocket autocomplete sessions and how their queries were answered"""
+    return {"success": True, **sessions.stats()}
+
+@app.get("/api/admin/coalescing")
+async def get_coalescing_stats():
+    """How many compare/search/autocomplete calls shared an in-flight computation"""
+    return {"success": True, **coalescer.stats()}
+
+@app.get("/api/admin/startup")
+async def get_startup_report():
+    """Phase-by-phase startup timing of this process"""
+    return {"success": True, "model_status": model_status, "warm": model_warm, **startup_report()}
+
 @app.post("/api/reload-model")
 async def reload_model():
     """Reload the college comparator model"""
     try:
         load_model()
+        warm_up()
         return {
             "success": True,
             "message": "Model reloaded successfully",
-            "model_loaded": comparator_model is not None
+            "model_loaded": default_dataset() is not None
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reload model: {str(e)}")
 
+@app.get("/api/admin/profiles")
+async def get_profiles(limit: int = 50):
+    """Recent profiled requests (explicit or slow sampled), newest first"""
+    samples = recent_samples(limit)
+    return {"success": True, "samples": samples, "count": len(samples)}
+
+@app.delete("/api/admin/profiles")
+async def delete_profiles():
+    """Clear the stored profile samples"""
+    clear_samples()
+    return {"success": True}
+
 @app.post("/api/colleges/compare")
-async def compare_colleges(request: CompareRequest):
-    """Compare two or more colleges"""
+async def compare_colleges(request: CompareRequest, fields: str = "", dataset: str = ""):
+    """Compare two or more colleges; ?fields= limits each comparison card to the named fields"""
     print(f"[DEBUG] Received comparison request: {request.colleges}")
     
-    if comparator_model is None:
+    if default_dataset() is None:
         print("[ERROR] Model not loaded!")
         raise HTTPException(status_code=503, detail="Model not loaded. Please restart the backend.")
+    ds = get_dataset(dataset)
     
     if len(request.colleges) < 2:
         raise HTTPException(status_code=400, detail="At least 2 colleges required for comparison")
     
+    selected = parse_fields(fields, CARD_FIELDS)
+    
     # For now, compare the first two colleges
     college1 = request.colleges[0]
     college2 = request.colleges[1]
     
     print(f"[DEBUG] Comparing: '{college1}' vs '{college2}'")
     
+    personalization = request.personalization.model_dump_json() if request.personalization else None
+    key = ("compare", ds.name, ds.version, college1.lower().strip(), college2.lower().strip(), personalization, selected)
+    body = await coalescer.run(key, compare_response, ds, college1, college2, request.personalization, selected)
+    return Response(content=body, media_type="application/json")
+
+def compare_response(ds: Dataset, college1: str, college2: str, personalization: Optional[PersonalizationFactors],
+                     fields: Optional[FrozenSet[str]] = None) -> bytes:
+    """Rendered compare response, shared by identical concurrent requests"""
     try:
-        result = comparator_model.compare(college1, college2)
-        print(f"[DEBUG] Comparison result: {result.get('error', 'Success')}")
-        
-        if "error" in result:
-            print(f"[ERROR] {result['error']}")
-            raise HTTPException(status_code=404, detail=result["error"])
+        with model_lock:
+            response_data = build_comparison(college1, college2, personalization, fields, ds)
+        if response_data is None:
+            print(f"[ERROR] One or both colleges not found")
+            raise HTTPException(status_code=404, detail="One or both colleges not found")
         
-        print(f"[DEBUG] Formatting college1...")
-        college1_formatted = format_college_result(result["college1"], 1, request.personalization)
-        print(f"[DEBUG] Formatting college2...")
-        college2_formatted = format_college_result(result["college2"], 2, request.personalization)
-        
-        print(f"[DEBUG] Generating recommendation...")
-        recommendation = generate_recommendation(result["college1"], result["college2"], request.personalization)
-        
-        # Format the response
-        response_data = {
-            "success": True,
-            "comparison": [
-                college1_formatted,
-                college2_formatted
-            ],
-            "recommendation": recommendation,
-            "personalization_applied": request.personalization is not None,
-            "user_category": request.personalization.category if request.personalization else None,
-            "metadata": {
-                "total_colleges": 2,
-                "features_compared": ["fees", "students", "faculty", "location", "facilities"],
-                "personalized": request.personalization is not None
-            }
-        }
         print(f"[DEBUG] Sending response successfully")
-        return response_data
+        return render(response_data)
     except HTTPException:
         raise
     except Exception as e:
@@ -181,96 +561,523 @@ async def compare_colleges(request: CompareRequest):
         raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
 
 @app.get("/api/colleges/autocomplete")
-async def autocomplete_colleges(query: str = "", limit: int = 10):
+async def autocomplete_colleges(request: Request, query: str = "", limit: int = 10, dataset: str = ""):
     """Get college suggestions for autocomplete"""
-    if comparator_model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    ds = get_dataset(dataset)
+    
+    etag = ds.etag
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
     if not query or len(query) < 2:
         return {"success": True, "suggestions": []}
     
+    body = await coalescer.run(("autocomplete", ds.name, ds.version, query.lower().strip(), limit), autocomplete_response, ds, query, limit)
+    return cacheable(body, etag)
+
+def autocomplete_response(ds: Dataset, query: str, limit: int) -> bytes:
     try:
         query_lower = query.lower().strip()
         
         # Search in college names
-        mask = comparator_model.df["name_clean"].str.contains(query_lower, regex=False, na=False)
-        results = comparator_model.df[mask].head(limit)
+        with span("find"), model_lock:
+            mask = ds.model.df["name_clean"].str.contains(query_lower, regex=False, na=False)
+            results = ds.model.df[mask].head(limit)
         
-        suggestions = []
-        for _, college in results.iterrows():
-            suggestions.append({
-                "name": str(college["College Name"]),
-                "city": str(college["City"]),
-                "type": str(college.get("College Type", "N/A")),
-                "fees": float(college.get("Average Fees", 0)) if pd.notna(college.get("Average Fees")) else None
-            })
+        suggestions = [autocomplete_suggestion(college_id, college) for college_id, college in results.iterrows()]
         
-        return {
+        return render({
             "success": True,
             "suggestions": suggestions,
             "count": len(suggestions)
-        }
+        })
     except Exception as e:
         print(f"[ERROR] Autocomplete failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Autocomplete failed: {str(e)}")
 
+@app.websocket("/api/colleges/autocomplete/ws")
+async def autocomplete_socket(websocket: WebSocket, dataset: str = ""):
+    """Incremental autocomplete: send {"id", "query", "limit"} per keystroke and get the
+    suggestions back with the same id. Matches are narrowed from the previous query's,
+    and queries superseded before they were answered are dropped."""
+    await websocket.accept()
+    try:
+        get_dataset(dataset)
+    except HTTPException as e:
+        await websocket.close(code=1013 if e.status_code == 503 else 1008, reason=e.detail)
+        return
+    
+    session = sessions.open()
+    pending = {}
+    arrived = asyncio.Event()
+    
+    async def answer():
+        while True:
+            await arrived.wait()
+            arrived.clear()
+            message = pending.pop("message")
+            # Looked up per message: a model reload replaces the dataset, and its
+            # new version resets the session's matches
+            try:
+                current = get_dataset(dataset)
+            except HTTPException as e:
+                await websocket.send_json({"success": False, "id": message.get("id"), "detail": e.detail})
+                continue
+            # In the thread pool: the step waits for model_lock, which a compare may hold
+            try:
+                reply = await run_in_threadpool(autocomplete_step, current, session, message)
+            except Exception as e:
+                print(f"[ERROR] Autocomplete step failed: {str(e)}")
+                reply = json.dumps({"success": False, "id": message.get("id"), "detail": f"Autocomplete failed: {str(e)}"})
+            await websocket.send_text(reply)
+    
+    worker = asyncio.create_task(answer())
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                if not isinstance(message, dict):
+                    raise ValueError("expected an object")
+            except ValueError as e:
+                await websocket.send_json({"success": False, "detail": f"Invalid message: {str(e)}"})
+                continue
+            if "message" in pending:
+                sessions.stale_dropped += 1
+            pending["message"] = message
+            arrived.set()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        sessions.close(session)
+
+def autocomplete_step(ds: Dataset, session: AutocompleteSession, message: Dict[str, Any]) -> str:
+    """Answer one WebSocket autocomplete query from the session's earlier matches"""
+    query = str(message.get("query") or "")
+    try:
+        limit = max(1, min(int(message.get("limit", 10)), 50))
+    except (TypeError, ValueError):
+        limit = 10
+    
+    suggestions = []
+    if len(query) >= 2:
+        with span("find"), model_lock:
+            if session.version != ds.version:
+                session.reset(ds.version, college_names(ds))
+            found = session.matches(query.lower().strip())
+            results = ds.model.df.iloc[found[:limit]]
+        suggestions = [autocomplete_suggestion(college_id, college) for college_id, college in results.iterrows()]
+    
+    return render({
+        "success": True,
+        "id": message.get("id"),
+        "query": query,
+        "suggestions": suggestions,
+        "count": len(suggestions)
+    }).decode()
+
 @app.post("/api/colleges/search")
-async def search_college(request: SearchRequest):
+async def search_college(request: SearchRequest, fields: str = "", dataset: str = ""):
     """Search for a college by name"""
-    if comparator_model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    ds = get_dataset(dataset)
     
+    selected = parse_fields(fields, SEARCH_FIELDS)
+    key = ("search", ds.name, ds.version, request.query.lower().strip(), selected)
+    body = await coalescer.run(key, search_response, ds, request.query, selected)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/api/colleges/search")
+async def search_college_cached(request: Request, query: str = "", fields: str = "", dataset: str = ""):
+    """Search for a college by name; cacheable GET form of the POST endpoint"""
+    ds = get_dataset(dataset)
+    
+    etag = ds.etag
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    selected = parse_fields(fields, SEARCH_FIELDS)
+    body = await coalescer.run(("search", ds.name, ds.version, query.lower().strip(), selected), search_response, ds, query, selected)
+    return cacheable(body, etag)
+
+def search_response(ds: Dataset, query: str, fields: Optional[FrozenSet[str]] = None) -> bytes:
     try:
-        college = comparator_model.find_college(request.query)
+        with span("find"), model_lock:
+            college = ds.model.find_college(query)
         
         if college is None:
-            raise HTTPException(status_code=404, detail=f"College '{request.query}' not found")
+            raise HTTPException(status_code=404, detail=f"College '{query}' not found")
         
-        return {
+        return render({
             "success": True,
-            "college": {
+            "college": project({
+                "id": int(college.name),
                 "name": college["College Name"],
                 "city": college["City"],
-                "type": college.get("College Type", "N/A"),
-                "university": college.get("University", "N/A"),
-                "fees": college.get("Average Fees", 0),
-                "students": college.get("Total Student Enrollments", 0),
-                "faculty": college.get("Total Faculty", 0),
-                "rating": college.get("Rating", "N/A")
-            }
-        }
+                "type": safe_value(college.get("College Type", "N/A")),
+                "university": safe_value(college.get("University", "N/A")),
+                "fees": safe_value(college.get("Average Fees", 0)),
+                "students": safe_value(college.get("Total Student Enrollments", 0)),
+                "faculty": safe_value(college.get("Total Faculty", 0)),
+                "rating": safe_value(college.get("Rating", "N/A"))
+            }, fields)
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @app.get("/api/colleges/list")
-async def list_colleges(limit: int = 50, offset: int = 0):
+async def list_colleges(request: Request, limit: int = 50, offset: int = 0, fields: str = "", dataset: str = ""):
     """Get list of all colleges"""
-    if comparator_model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    ds = get_dataset(dataset)
+    
+    etag = ds.etag
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
+    selected = parse_fields(fields, LIST_FIELDS)
     try:
-        colleges_df = comparator_model.df[offset:offset+limit]
+        colleges_df = ds.model.df[offset:offset+limit]
         colleges_list = []
         
-        for _, college in colleges_df.iterrows():
-            colleges_list.append({
+        for college_id, college in colleges_df.iterrows():
+            colleges_list.append(project({
+                "id": int(college_id),
                 "name": college["College Name"],
                 "city": college["City"],
                 "type": college.get("College Type", "N/A"),
                 "fees": float(college.get("Average Fees", 0)) if college.get("Average Fees") else 0
-            })
+            }, selected))
         
-        return {
+        return cacheable(render({
             "success": True,
             "colleges": colleges_list,
-            "total": len(comparator_model.df),
+            "total": len(ds.model.df),
             "limit": limit,
             "offset": offset
-        }
+        }), etag)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list colleges: {str(e)}")
 
+@app.get("/api/courses/search")
+async def search_courses(query: str = "", limit: int = 20, dataset: str = ""):
+    """Find colleges offering a program, ranked by BM25 over course names"""
+    ds = get_dataset(dataset)
+    
+    if not query or len(query.strip()) < 2:
+        return {"success": True, "query": query, "results": [], "count": 0}
+    
+    try:
+        with span("find"):
+            matches = ds.model.search_courses(query, limit)
+        results = []
+        for college_id, score, courses in matches:
+            entry = summarize_college(college_id, ds.model.df.iloc[college_id])
+            entry["score"] = score
+            entry["matched_courses"] = courses
+            results.append(entry)
+        
+        return serialize({
+            "success": True,
+            "query": query,
+            "results": results,
+            "count": len(results)
+        })
+    except Exception as e:
+        print(f"[ERROR] Course search failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Course search failed: {str(e)}")
+
+@app.get("/api/colleges/retrieve")
+async def retrieve_colleges(query: str = "", limit: int = 5, dataset: str = ""):
+    """Top matching colleges as compact fact snippets, for grounding chat answers"""
+    ds = get_dataset(dataset)
+    
+    if not query or len(query.strip()) < 2:
+        return {"success": True, "query": query, "results": [], "count": 0}
+    
+    try:
+        with span("find"):
+            matches = ds.model.retrieve(query, max(1, min(limit, 20)))
+        results = []
+        for college_id, score in matches:
+            entry = college_facts(college_id, ds.model.df.iloc[college_id])
+            entry["score"] = score
+            results.append(entry)
+        
+        return serialize({
+            "success": True,
+            "query": query,
+            "results": results,
+            "count": len(results)
+        })
+    except Exception as e:
+        print(f"[ERROR] Retrieval failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Retrieval failed: {str(e)}")
+
+@app.get("/api/colleges/skyline")
+async def college_skyline(criteria: str = "fees,rating,ratio", city: str = "", college_type: str = Query("", alias="type"), limit: int = 100, dataset: str = ""):
+    """Colleges not beaten on every criterion by another college (lower fees and
+    student/faculty ratio, higher rating), optionally within a city and/or type"""
+    ds = get_dataset(dataset)
+    
+    names = tuple(dict.fromkeys(item.strip().lower() for item in criteria.split(",") if item.strip()))
+    unknown = [name for name in names if name not in SKYLINE_CRITERIA]
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"criteria must be a comma separated subset of {', '.join(SKYLINE_CRITERIA)}")
+    
+    try:
+        with span("find"):
+            ids, considered, skipped = ds.model.pareto_frontier(names, city or None, college_type or None)
+        frontier = ds.model.df.iloc[ids]
+        colleges = []
+        for college_id, (_, college) in zip(ids.tolist(), frontier.iterrows()):
+            entry = summarize_college(college_id, college)
+            students = safe_value(college.get("Total Student Enrollments"))
+            faculty = safe_value(college.get("Total Faculty"))
+            entry["student_faculty_ratio"] = round(students / faculty, 2) if students and faculty else None
+            colleges.append(entry)
+        colleges.sort(key=lambda entry: (entry["fees"] is None, entry["fees"] or 0))
+        
+        return serialize({
+            "success": True,
+            "criteria": list(names),
+            "frontier": colleges[:max(0, limit)],
+            "frontier_size": len(colleges),
+            "considered": considered,
+            "skipped_missing_values": skipped
+        })
+    except Exception as e:
+        print(f"[ERROR] Skyline query failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Skyline query failed: {str(e)}")
+
+@app.get("/api/colleges/facets")
+async def college_facets(facilities: str = "", programs: str = "", limit: int = 20, dataset: str = ""):
+    """Counts and fee/rating distributions by city, type, university and fee bucket"""
+    ds = get_dataset(dataset)
+    
+    try:
+        facility_filters = [item.strip() for item in facilities.split(",") if item.strip()]
+        program_filters = [item.strip() for item in programs.split(",") if item.strip()]
+        total, facets = ds.model.facets(facility_filters, program_filters, limit)
+        return {
+            "success": True,
+            "total": total,
+            "filters": {"facilities": facility_filters, "programs": program_filters},
+            "facets": facets
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compute facets: {str(e)}")
+
+@app.post("/api/colleges/shortlist")
+async def shortlist_colleges(request: ShortlistRequest, dataset: str = ""):
+    """Ordered option list of the best-scoring colleges that meet every hard constraint"""
+    ds = get_dataset(dataset)
+
+    if request.maxPerCity is not None and request.maxPerCity < 1:
+        raise HTTPException(status_code=400, detail="maxPerCity must be at least 1")
+    if request.size < 1:
+        raise HTTPException(status_code=400, detail="size must be at least 1")
+
+    try:
+        ids, scores, considered = build_shortlist(ds, request)
+        colleges = []
+        for rank, (college_id, score) in enumerate(zip(ids.tolist(), scores.tolist()), 1):
+            entry = summarize_college(college_id, ds.model.df.iloc[college_id])
+            entry["rank"] = rank
+            entry["score"] = score
+            colleges.append(entry)
+
+        return {
+            "success": True,
+            "rules_version": scoring_rules["version"],
+            "shortlist": colleges,
+            "count": len(colleges),
+            "considered": considered,
+            "total": len(ds.model.df)
+        }
+    except Exception as e:
+        print(f"[ERROR] Shortlist failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Shortlist failed: {str(e)}")
+
+@app.get("/api/colleges/{college_id}/similar")
+async def similar_colleges(college_id: int, limit: int = 10, dataset: str = ""):
+    """Get the most similar colleges from the precomputed neighbour lists"""
+    ds = get_dataset(dataset)
+    
+    college = ds.model.get_college(college_id)
+    if college is None:
+        raise HTTPException(status_code=404, detail=f"College id {college_id} not found")
+    
+    try:
+        similar = []
+        for similar_id, similarity in ds.model.similar_colleges(college_id, limit):
+            entry = summarize_college(similar_id, ds.model.df.iloc[similar_id])
+            entry["similarity"] = similarity
+            similar.append(entry)
+        
+        return {
+            "success": True,
+            "college": summarize_college(college_id, college),
+            "similar": similar,
+            "count": len(similar)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Similar colleges lookup failed: {str(e)}")
+
+@app.get("/api/datasets")
+async def list_datasets():
+    """Served snapshots of the college data; /api/colleges/* endpoints take ?dataset=<name>"""
+    get_dataset()
+    return {
+        "success": True,
+        "default": DEFAULT_DATASET,
+        "datasets": [ds.describe() for ds in list(datasets.values())]
+    }
+
+@app.get("/api/datasets/diff")
+async def diff_datasets(request: Request, old: str = Query(..., alias="from"), new: str = Query(..., alias="to"),
+                        columns: str = "fees,rating", limit: int = 100):
+    """Per-college changes between two datasets (e.g. fees year over year), largest
+    relative change of the first column first"""
+    base, other = get_dataset(old), get_dataset(new)
+    names = list(dict.fromkeys(item.strip().lower() for item in columns.split(",") if item.strip()))
+    unknown = [name for name in names if name not in DIFF_COLUMNS]
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"columns must be a comma separated subset of {', '.join(DIFF_COLUMNS)}")
+    
+    etag = f'"{hashlib.sha256((base.etag + other.etag).encode()).hexdigest()[:32]}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    try:
+        with span("find"), model_lock:
+            changes = base.model.diff(other.model, [DIFF_COLUMNS[name] for name in names])
+            display_names = other.model.df["College Name"]
+        api_names = {column: name for name, column in DIFF_COLUMNS.items()}
+        colleges = {}
+        for college_id, column, value, other_value in changes.itertuples(index=False):
+            entry = colleges.setdefault(int(college_id), {
+                "id": int(college_id),
+                "name": str(display_names.iloc[college_id]),
+                "changes": {}
+            })
+            change = {"from": safe_value(value), "to": safe_value(other_value)}
+            if isinstance(change["from"], (int, float)) and isinstance(change["to"], (int, float)):
+                change["change"] = change["to"] - change["from"]
+                change["percent"] = round(change["change"] * 100 / change["from"], 2) if change["from"] else None
+            entry["changes"][api_names[column]] = change
+        
+        def magnitude(entry):
+            change = entry["changes"].get(names[0], {})
+            return abs(change.get("percent") or 0) if change else -1
+        ranked = sorted(colleges.values(), key=lambda entry: (-magnitude(entry), entry["id"]))
+        
+        return cacheable(render({
+            "success": True,
+            "from": base.name,
+            "to": other.name,
+            "columns": names,
+            "colleges": ranked[:max(0, limit)],
+            "changed_colleges": len(ranked)
+        }), etag)
+    except Exception as e:
+        print(f"[ERROR] Dataset diff failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Dataset diff failed: {str(e)}")
+
+@app.get("/api/scoring/rules")
+async def get_scoring_rules():
+    """Return the active scoring/quota rule table"""
+    if scoring_rules is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return {"success": True, "version": scoring_rules["version"], "rules": scoring_rules}
+
+@app.post("/api/scoring/evaluate")
+async def evaluate_scoring_rules(request: RuleVariantsRequest, dataset: str = ""):
+    """Rank all colleges under the active rules and alternative weightings in one pass"""
+    ds = get_dataset(dataset)
+    
+    names = ["active"] + list(request.variants)
+    try:
+        tables = [scoring_rules] + [merge_rules(scoring_rules, overrides) for overrides in request.variants.values()]
+        kernel = ScoringKernel(tables)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rule variant: {str(e)}")
+    
+    try:
+        scores = kernel.score(get_score_features(ds), request.personalization)
+        limit = max(1, min(request.limit, len(ds.model.df)))
+        results = {}
+        for name, row in zip(names, scores):
+            top = np.argsort(-row, kind="stable")[:limit]
+            colleges = []
+            for college_id in top:
+                entry = summarize_college(int(college_id), ds.model.df.iloc[college_id])
+                entry["score"] = float(row[college_id])
+                colleges.append(entry)
+            results[name] = colleges
+        
+        return {
+            "success": True,
+            "rules_version": scoring_rules["version"],
+            "variants": names,
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rule evaluation failed: {str(e)}")
+
+@app.post("/api/colleges")
+async def add_college(request: CollegeUpdateRequest, dataset: str = "",
+                      x_admin_token: Optional[str] = Header(default=None)):
+    """Add a college and incrementally update the precomputed indexes (admin only)"""
+    require_admin(x_admin_token)
+    ds = get_dataset(dataset)
+    missing = [field for field in REQUIRED_COLLEGE_FIELDS if is_blank(request.fields.get(field))]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing required fields: {', '.join(missing)}")
+    
+    try:
+        with model_lock:
+            college_id = ds.model.upsert_college(request.fields)
+            refresh_college_base(college_id, ds)
+        return {"success": True, "college": summarize_college(college_id, ds.model.df.iloc[college_id])}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to add college: {str(e)}")
+
+@app.put("/api/colleges/{college_id}")
+async def update_college(college_id: int, request: CollegeUpdateRequest, dataset: str = "",
+                         x_admin_token: Optional[str] = Header(default=None)):
+    """Update a college's fields and incrementally update the precomputed indexes (admin only)"""
+    require_admin(x_admin_token)
+    ds = get_dataset(dataset)
+    if ds.model.get_college(college_id) is None:
+        raise HTTPException(status_code=404, detail=f"College id {college_id} not found")
+    cleared = [field for field in REQUIRED_COLLEGE_FIELDS if field in request.fields and is_blank(request.fields[field])]
+    if cleared:
+        raise HTTPException(status_code=422, detail=f"Required fields cannot be empty: {', '.join(cleared)}")
+    
+    try:
+        with model_lock:
+            ds.model.upsert_college(request.fields, college_id)
+            refresh_college_base(college_id, ds)
+        return {"success": True, "college": summarize_college(college_id, ds.model.df.iloc[college_id])}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update college: {str(e)}")
+
 # Helper functions
+def require_admin(token: Optional[str]):
+    """403 unless token matches ADMIN_TOKEN (always, when no ADMIN_TOKEN is configured)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="College edits are disabled: ADMIN_TOKEN is not set")
+    if not token or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Token")
+
+def is_blank(value) -> bool:
+    return value is None or not str(value).strip() or (isinstance(value, float) and math.isnan(value))
+
 def safe_value(value):
     """Convert pandas/numpy types to JSON-serializable Python types"""
     if pd.isna(value):
@@ -281,57 +1088,241 @@ def safe_value(value):
         return value.tolist()
     return value
 
-def format_college_result(college_data: Dict, rank: int, personalization: Optional[PersonalizationFactors] = None) -> Dict[str, Any]:
-    """Format college data for API response"""
+def build_comparison(college1: str, college2: str, personalization: Optional[PersonalizationFactors],
+                     fields: Optional[FrozenSet[str]] = None, ds: Optional[Dataset] = None) -> Optional[Dict[str, Any]]:
+    """Compare response body for two colleges, or None if either is not found (shared with batch_compare.py)"""
+    ds = ds or default_dataset()
+    # Same steps as CollegeComparator.compare(), split so each phase can be timed
+    with span("find"):
+        found1 = ds.model.find_college(college1)
+        found2 = ds.model.find_college(college2)
+    
+    if found1 is None or found2 is None:
+        return None
+    
+    with span("extract"):
+        result = {
+            "college1": ds.model.extract(found1),
+            "college2": ds.model.extract(found2)
+        }
+    print(f"[DEBUG] Comparison result: Success")
+    
+    print(f"[DEBUG] Formatting college1...")
+    college1_formatted = format_college_result(result["college1"], 1, personalization, fields, ds)
+    print(f"[DEBUG] Formatting college2...")
+    college2_formatted = format_college_result(result["college2"], 2, personalization, fields, ds)
+    
+    print(f"[DEBUG] Generating recommendation...")
+    with span("recommend"):
+        recommendation = generate_recommendation(result["college1"], result["college2"], personalization, ds)
+    
+    # Format the response
+    return {
+        "success": True,
+        "comparison": [
+            college1_formatted,
+            college2_formatted
+        ],
+        "recommendation": recommendation,
+        "personalization_applied": personalization is not None,
+        "user_category": personalization.category if personalization else None,
+        "metadata": {
+            "total_colleges": 2,
+            "features_compared": ["fees", "students", "faculty", "location", "facilities"],
+            "personalized": personalization is not None,
+            "rules_version": scoring_rules["version"],
+            "dataset": ds.name
+        }
+    }
+
+def default_dataset() -> Optional[Dataset]:
+    return datasets.get(DEFAULT_DATASET)
+
+def get_dataset(name: str = "") -> Dataset:
+    """Dataset chosen by ?dataset= (the default one when empty); 503 until the model is loaded"""
+    ds = default_dataset()
+    if ds is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if not name or name == DEFAULT_DATASET:
+        return ds
+    if name not in datasets:
+        if not model_warm and (DATASETS_DIR / f"{name}.csv").exists():
+            raise HTTPException(status_code=503, detail=f"Dataset '{name}' is still loading")
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{name}'. Available: {', '.join(datasets)}")
+    return datasets[name]
+
+def render(data: Dict[str, Any]) -> bytes:
+    """Encode a response body inside the 'serialize' span"""
+    with span("serialize"):
+        return JSONResponse(content=jsonable_encoder(data)).body
+
+def serialize(data: Dict[str, Any]) -> Response:
+    return Response(content=render(data), media_type="application/json")
+
+def autocomplete_suggestion(college_id: int, college: "pd.Series") -> Dict[str, Any]:
+    return {
+        "id": int(college_id),
+        "name": str(college["College Name"]),
+        "city": str(college["City"]),
+        "type": str(college.get("College Type", "N/A")),
+        "fees": float(college.get("Average Fees", 0)) if pd.notna(college.get("Average Fees")) else None
+    }
+
+def college_names(ds: Dataset) -> List[str]:
+    """Lower-cased college names by id for the dataset's current version"""
+    if ds.names is None:
+        ds.names = ds.model.df["name_clean"].fillna("").map(str).tolist()
+    return ds.names
+
+def parse_fields(fields: str, allowed: tuple) -> Optional[FrozenSet[str]]:
+    """Field names from a comma separated ?fields= value, or None (everything) when empty"""
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = sorted(names.difference(allowed))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(allowed)}")
+    return names or None
+
+def project(record: Dict[str, Any], fields: Optional[FrozenSet[str]], keep: str = "id") -> Dict[str, Any]:
+    if fields is None:
+        return record
+    return {name: value for name, value in record.items() if name == keep or name in fields}
+
+def content_hash(df: "pd.DataFrame") -> str:
+    """ETag for everything derived from a college table: a hash of its contents
+    and the API version, so it changes on reload, upsert or a response format change"""
+    digest = hashlib.sha256(app.version.encode())
+    digest.update("\x1f".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return f'"{digest.hexdigest()[:32]}"'
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Whether If-None-Match names etag (weak comparison, as RFC 9110 requires)"""
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def cacheable(body: bytes, etag: Optional[str]) -> Response:
+    """JSON response that clients and CDNs may cache and revalidate with If-None-Match"""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL} if etag else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def summarize_college(college_id: int, college: "pd.Series") -> Dict[str, Any]:
+    """Compact college card used by list-style responses"""
+    return {
+        "id": int(college_id),
+        "name": str(college["College Name"]),
+        "city": str(college["City"]),
+        "type": str(college.get("College Type", "N/A")),
+        "fees": safe_value(college.get("Average Fees")),
+        "rating": safe_value(college.get("Rating"))
+    }
+
+def college_facts(college_id: int, college: "pd.Series") -> Dict[str, Any]:
+    """College card plus a one-paragraph fact snippet taken straight from the dataset"""
+    facts = summarize_college(college_id, college)
+    facts["university"] = safe_value(college.get("University"))
+    facts["established"] = safe_value(college.get("Established Year"))
+    students = safe_value(college.get("Total Student Enrollments"))
+    faculty = safe_value(college.get("Total Faculty"))
+    courses = str(college.get("Courses", "")).split(",") if safe_value(college.get("Courses")) else []
+    facilities = str(college.get("Facilities", "")).split(",") if safe_value(college.get("Facilities")) else []
+    
+    parts = [f"{facts['name'].strip()} is a {facts['type']} college in {facts['city']}"]
+    if facts["university"]:
+        parts[0] += f" affiliated to {facts['university']}"
+    if facts["established"]:
+        parts.append(f"established in {int(facts['established'])}")
+    if facts["fees"]:
+        parts.append(f"average fees ₹{facts['fees']/100000:.2f}L per year")
+    if facts["rating"]:
+        parts.append(f"rated {facts['rating']}/5")
+    if students and faculty:
+        parts.append(f"{int(students)} students and {int(faculty)} faculty")
+    if courses:
+        parts.append(f"{len(courses)} courses including {', '.join(c.strip() for c in courses[:4])}")
+    if facilities:
+        parts.append(f"facilities: {', '.join(f.strip() for f in facilities[:6])}")
+    facts["text"] = "; ".join(parts) + "."
+    return facts
+
+def format_college_result(college_data: Dict, rank: int, personalization: Optional[PersonalizationFactors] = None,
+                          fields: Optional[FrozenSet[str]] = None, ds: Optional[Dataset] = None) -> Dict[str, Any]:
+    """Format college data for API response; with fields, only those are computed"""
+    def wanted(name: str) -> bool:
+        return fields is None or name in fields
+    
+    result = {"college_name": str(college_data["overview"]["College Name"])}
+    
     # Calculate a score based on available metrics with personalization
-    score = calculate_score(college_data, personalization)
+    if wanted("score"):
+        with span("score"):
+            result["score"] = float(calculate_score(college_data, personalization, ds))
+    if wanted("ranking"):
+        result["ranking"] = int(rank)
     
     # Extract strengths and weaknesses
-    strengths, weaknesses = analyze_college(college_data, personalization)
+    if wanted("strengths") or wanted("weaknesses"):
+        with span("analyze"):
+            strengths, weaknesses = analyze_college(college_data, personalization, ds)
+        if wanted("strengths"):
+            result["strengths"] = strengths
+        if wanted("weaknesses"):
+            result["weaknesses"] = weaknesses
     
-    # Calculate student-faculty ratio
     total_students = safe_value(college_data["academics"]["Total Students"])
     total_faculty = safe_value(college_data["academics"]["Total Faculty"])
     
-    student_faculty_ratio = None
-    if total_students and total_faculty and not pd.isna(total_students) and not pd.isna(total_faculty) and total_faculty > 0:
-        student_faculty_ratio = round(total_students / total_faculty, 2)
-    
-    # Generate quota-specific insights
-    quota_insights = None
-    if personalization:
-        quota_insights = generate_quota_insights(college_data, personalization)
+    # Calculate student-faculty ratio
+    def student_faculty_ratio():
+        if total_students and total_faculty and not pd.isna(total_students) and not pd.isna(total_faculty) and total_faculty > 0:
+            return round(total_students / total_faculty, 2)
+        return None
     
-    result = {
-        "college_name": str(college_data["overview"]["College Name"]),
-        "score": float(score),
-        "ranking": int(rank),
-        "strengths": strengths,
-        "weaknesses": weaknesses,
-        "data": {
-            "city": str(college_data["location"]["City"]),
-            "state": str(college_data["location"]["State"]),
-            "type": str(college_data["overview"]["Ownership Type"]),
-            "established": safe_value(college_data["overview"]["Established Year"]),
-            "university": str(college_data["overview"]["University"]),
-            "campus_size": safe_value(college_data["overview"]["Campus Size"]),
-            "total_students": total_students,
-            "total_faculty": total_faculty,
-            "student_faculty_ratio": student_faculty_ratio,
-            "fees": safe_value(college_data["fees"]["Average Fees"]),
-            "rating": safe_value(college_data["rating"]["Rating"]),
-            "facilities": str(college_data["facilities"]["Facilities"]),
-            "courses": str(college_data["academics"]["Courses"]),
-            "google_maps": str(college_data["location"]["Google Maps"])
-        }
+    data_fields = {
+        "city": lambda: str(college_data["location"]["City"]),
+        "state": lambda: str(college_data["location"]["State"]),
+        "type": lambda: str(college_data["overview"]["Ownership Type"]),
+        "established": lambda: safe_value(college_data["overview"]["Established Year"]),
+        "university": lambda: str(college_data["overview"]["University"]),
+        "campus_size": lambda: safe_value(college_data["overview"]["Campus Size"]),
+        "total_students": lambda: total_students,
+        "total_faculty": lambda: total_faculty,
+        "student_faculty_ratio": student_faculty_ratio,
+        "fees": lambda: safe_value(college_data["fees"]["Average Fees"]),
+        "rating": lambda: safe_value(college_data["rating"]["Rating"]),
+        "facilities": lambda: str(college_data["facilities"]["Facilities"]),
+        "courses": lambda: str(college_data["academics"]["Courses"]),
+        "google_maps": lambda: str(college_data["location"]["Google Maps"])
     }
+    data = {name: value() for name, value in data_fields.items() if wanted(name)}
+    if data:
+        result["data"] = data
     
-    # Add quota insights if available
-    if quota_insights:
-        result["quota_insights"] = quota_insights
+    # Add quota-specific insights if available
+    if personalization and wanted("quota_insights"):
+        quota_insights = generate_quota_insights(college_data, personalization)
+        if quota_insights:
+            result["quota_insights"] = quota_insights
     
     return result
 
+def rule_applies(rule: Dict[str, Any], is_government: bool, fees, facilities: str) -> bool:
+    """Check the optional conditions of one quota rule-table entry"""
+    if rule.get("government_only") and not is_government:
+        return False
+    if "fees_below" in rule and not (fees and fees < rule["fees_below"]):
+        return False
+    if "fees_above" in rule and not (fees and fees > rule["fees_above"]):
+        return False
+    if "facility" in rule and rule["facility"] not in facilities.lower():
+        return False
+    return True
+
 def generate_quota_insights(college_data: Dict, personalization: PersonalizationFactors) -> Dict[str, Any]:
     """Generate quota and category-specific insights"""
     insights = {
@@ -341,206 +1332,225 @@ def generate_quota_insights(college_data: Dict, personalization: Personalization
         "admission_notes": []
     }
     
+    rules = scoring_rules["quotas"]
     ownership_type = str(college_data["overview"]["Ownership Type"])
     is_government = "Public" in ownership_type or "Government" in ownership_type
     fees = safe_value(college_data["fees"]["Average Fees"])
+    facilities = str(college_data["facilities"]["Facilities"])
+    
+    def add(entries, section):
+        for rule in entries:
+            if rule_applies(rule, is_government, fees, facilities):
+                insights[section].append(rule["text"].format(category=personalization.category))
     
     # Category-specific quota information
-    if personalization.category in ['SC', 'ST']:
-        insights["applicable_quotas"].append(f"{personalization.category} Reservation (15%/7.5% seats)")
-        if is_government:
-            insights["fee_benefits"].append("Fee concession/waiver available for SC/ST students")
-            insights["admission_notes"].append("Lower cutoff marks applicable")
-        insights["admission_notes"].append("Post-matric scholarship available")
-    
-    elif personalization.category == 'OBC':
-        insights["applicable_quotas"].append("OBC Reservation (27% seats)")
-        if is_government and fees and fees < 800000:
-            insights["fee_benefits"].append("May qualify for fee concession")
-        insights["admission_notes"].append("Creamy layer certificate required")
-    
-    elif personalization.category == 'EWS':
-        insights["applicable_quotas"].append("EWS Reservation (10% seats)")
-        if is_government:
-            insights["fee_benefits"].append("Fee structure same as general category")
-        insights["admission_notes"].append("Income certificate (< ₹8 lakh) required")
-    
-    elif personalization.category in ['NT-A', 'NT-B', 'NT-C', 'NT-D', 'VJ-A', 'SBC', 'SEBC']:
-        insights["applicable_quotas"].append(f"{personalization.category} Reservation (Maharashtra State)")
-        if is_government:
-            insights["fee_benefits"].append("State-level fee concessions may apply")
-        insights["admission_notes"].append("Domicile certificate required")
+    for group in rules["categories"]:
+        if personalization.category in group["categories"]:
+            insights["applicable_quotas"].append(group["quota"].format(category=personalization.category))
+            add(group["fee_benefits"], "fee_benefits")
+            add(group["admission_notes"], "admission_notes")
+            break
     
     # Domicile-specific information
-    if personalization.domicile == 'Maharashtra':
-        insights["admission_notes"].append("Home state quota applicable (85% seats)")
+    if personalization.domicile == rules["home_state"]:
+        add(rules["home_state_notes"], "admission_notes")
     else:
-        insights["admission_notes"].append("All India quota applicable (15% seats)")
-        insights["admission_notes"].append("Higher cutoff may be required")
+        add(rules["other_state_notes"], "admission_notes")
     
     # Gender-specific information
-    facilities = str(college_data["facilities"]["Facilities"])
-    if personalization.gender == 'Female':
-        if "Girls Hostel" in facilities or "girls hostel" in facilities.lower():
-            insights["admission_notes"].append("Girls hostel available")
-        if is_government:
-            insights["fee_benefits"].append("May qualify for girls' scholarships")
+    for group in rules["genders"]:
+        if personalization.gender == group["gender"]:
+            add(group["admission_notes"], "admission_notes")
+            add(group["fee_benefits"], "fee_benefits")
     
     # Financial aid information
-    if fees and fees > 200000:
-        insights["admission_notes"].append("Education loan facilities available")
+    add(rules["financial_notes"], "admission_notes")
     
     return insights
 
-def calculate_score(college_data: Dict, personalization: Optional[PersonalizationFactors] = None) -> float:
-    """Calculate overall score for a college (0-10) with optional personalization"""
-    score = 5.0  # Base score
+def load_scoring_rules():
+    """Load the versioned rule table and compile it into the scoring kernel"""
+    global scoring_rules, scoring_kernel
+    scoring_rules = load_rules()
+    scoring_kernel = ScoringKernel([scoring_rules])
+    print(f"  Scoring rules version: {scoring_rules['version']}")
+
+def build_college_base(college_data: Dict) -> Dict[str, Any]:
+    """Precompute the user-independent half of calculate_score and analyze_college"""
+    rules = scoring_rules["analysis"]
+    features = college_features(college_data)
+    fees = features["fees"][0]
+    has_fees = not np.isnan(fees)
     
-    # Adjust based on fees (lower is better)
-    fees = safe_value(college_data["fees"]["Average Fees"])
+    # Default fee strengths/weaknesses (used without a budget)
+    fee_strengths, fee_weaknesses = [], []
+    if has_fees and fees < rules["affordable_below"]:
+        fee_strengths.append("Affordable fees")
+    elif has_fees and fees > rules["high_fees_above"]:
+        fee_weaknesses.append("High fees")
     
-    if personalization and personalization.maxBudget:
-        # Personalized fee scoring based on user's budget
-        if fees and not pd.isna(fees):
-            if fees <= personalization.maxBudget * 0.7:  # Well within budget
-                score += 2.0
-            elif fees <= personalization.maxBudget:  # Within budget
-                score += 1.0
-            elif fees <= personalization.maxBudget * 1.2:  # Slightly over budget
-                score += 0.5
-            else:  # Over budget
-                score -= 1.5
-    else:
-        # Default fee scoring
-        if fees and not pd.isna(fees) and fees < 300000:
-            score += 1.5
-        elif fees and not pd.isna(fees) and fees < 500000:
-            score += 1.0
-        elif fees and not pd.isna(fees) and fees > 1000000:
-            score -= 1.0
-    
-    # Adjust based on type with personalization
-    ownership_type = str(college_data["overview"]["Ownership Type"])
-    is_government = "Public" in ownership_type or "Government" in ownership_type
+    core_strengths, core_weaknesses = [], []
+    if features["is_government"][0]:
+        core_strengths.append("Government college")
     
-    if is_government:
-        if personalization and personalization.prioritizeGovernmentCollege:
-            score += 1.5  # Higher boost if user prefers government
-        else:
-            score += 0.5  # Standard boost
-    
-    # Location preference
-    if personalization and personalization.locationPreference and 'Any' not in personalization.locationPreference:
-        city = str(college_data["location"]["City"])
-        if any(loc.lower() in city.lower() for loc in personalization.locationPreference):
-            score += 1.0  # Bonus for preferred location
-    
-    # Hostel requirement
-    if personalization and personalization.hostelRequired:
-        facilities = str(college_data["facilities"]["Facilities"])
-        if "Hostel" in facilities or "hostel" in facilities.lower():
-            score += 0.8
-        else:
-            score -= 1.0  # Penalty if hostel required but not available
-    
-    # Student-faculty ratio preference
-    if personalization and personalization.preferSmallCampus:
-        students = safe_value(college_data["academics"]["Total Students"])
-        faculty = safe_value(college_data["academics"]["Total Faculty"])
-        
-        if students and faculty and not pd.isna(students) and not pd.isna(faculty) and faculty > 0:
-            ratio = students / faculty
-            if ratio < 15:
-                score += 1.5
-            elif ratio < 20:
-                score += 1.0
-            elif ratio > 30:
-                score -= 0.5
-    
-    # Adjust based on rating
-    rating = safe_value(college_data["rating"]["Rating"])
-    if rating and not pd.isna(rating) and isinstance(rating, (int, float)):
-        score += (rating - 3.0)  # Assuming 3.0 is average
-    
-    # Adjust based on facilities
-    facilities = str(college_data["facilities"]["Facilities"])
-    if facilities and facilities != "nan" and len(facilities) > 100:
-        score += 0.5
+    students = safe_value(college_data["academics"]["Total Students"])
+    faculty = safe_value(college_data["academics"]["Total Faculty"])
+    if students and not pd.isna(students) and students > rules["large_students_above"]:
+        core_strengths.append("Large student community")
+    elif students and not pd.isna(students) and students < rules["small_students_below"]:
+        core_weaknesses.append("Small student body")
     
-    # Ensure score is between 0 and 10
-    return max(0.0, min(10.0, score))
-
-def analyze_college(college_data: Dict, personalization: Optional[PersonalizationFactors] = None) -> tuple:
-    """Analyze college and return strengths and weaknesses with personalization"""
-    strengths = []
-    weaknesses = []
+    if faculty and students and not pd.isna(faculty) and not pd.isna(students):
+        if students / faculty < rules["good_ratio_below"]:
+            core_strengths.append("Good student-faculty ratio")
+        elif students / faculty > rules["high_ratio_above"]:
+            core_weaknesses.append("High student-faculty ratio")
     
-    # Check fees with personalization
-    fees = safe_value(college_data["fees"]["Average Fees"])
+    facilities = str(college_data["facilities"]["Facilities"])
+    has_facilities = bool(facilities and facilities != "nan")
     
-    if personalization and personalization.maxBudget and fees and not pd.isna(fees):
-        if fees <= personalization.maxBudget * 0.7:
+    base = {
+        "features": features,
+        "fees": fees if has_fees else None,
+        "fee_strengths": fee_strengths,
+        "fee_weaknesses": fee_weaknesses,
+        "core_strengths": core_strengths,
+        "core_weaknesses": core_weaknesses,
+        "has_facilities": has_facilities,
+        "has_hostel": bool(features["has_hostel"][0]),
+        "good_sports": has_facilities and "Gym" in facilities and "Sports" in facilities,
+        "city": str(college_data["location"]["City"]),
+    }
+    base["score"] = personalized_score(base, None)
+    base["strengths"], base["weaknesses"] = personalized_analysis(base, None)
+    return base
+
+def build_college_bases(ds: Optional[Dataset] = None):
+    """Precompute the static scoring base for every college in a dataset (the default one if None).
+
+    Runs without model_lock (it is slow and runs during warm-up) on the data as
+    it was when it started; upserts replace the model's DataFrame rather than
+    writing into it. Every base already in the dataset when the results are
+    merged is current (refresh_college_base keeps them so), so only missing
+    bases are filled in and a college changed meanwhile keeps its new base.
+    """
+    ds = ds or default_dataset()
+    with model_lock:
+        df = ds.model.df
+    bases = {}
+    for _, college in df.iterrows():
+        college_data = ds.model.extract(college)
+        bases[college_data["id"]] = build_college_base(college_data)
+    features = table_features(df)
+    with model_lock:
+        for college_id, base in bases.items():
+            ds.college_bases.setdefault(college_id, base)
+        if ds.model.df is df:
+            ds.score_features = features
+
+def refresh_college_base(college_id: int, ds: Optional[Dataset] = None):
+    """Recompute the scoring inputs after a college was added or changed"""
+    ds = ds or default_dataset()
+    ds.touch()
+    ds.college_bases[college_id] = build_college_base(ds.model.extract(ds.model.df.iloc[college_id]))
+    ds.score_features = table_features(ds.model.df)
+
+def get_score_features(ds: Optional[Dataset] = None) -> Dict[str, Any]:
+    """Scoring inputs of the whole table, computed on first use"""
+    ds = ds or default_dataset()
+    if ds.score_features is None:
+        ds.score_features = table_features(ds.model.df)
+    return ds.score_features
+
+def get_college_base(college_data: Dict, ds: Optional[Dataset] = None) -> Dict[str, Any]:
+    """Precomputed base for a compare() result; computed on the fly if missing, and kept
+    if the college is from a dataset (derived snapshots build their bases as they are used)"""
+    if "id" not in college_data:
+        return build_college_base(college_data)
+    bases = (ds or default_dataset()).college_bases
+    base = bases.get(college_data["id"])
+    if base is None:
+        base = bases[college_data["id"]] = build_college_base(college_data)
+    return base
+
+def personalized_score(base: Dict[str, Any], personalization: Optional[PersonalizationFactors]) -> float:
+    """Run the compiled rule kernel on one college's precomputed features"""
+    return float(scoring_kernel.score(base["features"], personalization)[0, 0])
+
+def personalized_analysis(base: Dict[str, Any], personalization: Optional[PersonalizationFactors]) -> tuple:
+    """Assemble strengths and weaknesses from the static base and the personalization"""
+    rules = scoring_rules["analysis"]
+    fees = base["fees"]
+    if personalization and personalization.maxBudget and fees:
+        strengths, weaknesses = [], []
+        if fees <= personalization.maxBudget * rules["well_within_budget"]:
             strengths.append(f"Well within your budget (₹{fees/100000:.1f}L)")
-        elif fees <= personalization.maxBudget:
+        elif fees <= personalization.maxBudget * rules["within_budget"]:
             strengths.append(f"Within your budget (₹{fees/100000:.1f}L)")
-        elif fees > personalization.maxBudget * 1.2:
+        elif fees > personalization.maxBudget * rules["above_budget"]:
             weaknesses.append(f"Above your budget (₹{fees/100000:.1f}L)")
     else:
-        if fees and not pd.isna(fees) and fees < 300000:
-            strengths.append("Affordable fees")
-        elif fees and not pd.isna(fees) and fees > 800000:
-            weaknesses.append("High fees")
+        strengths, weaknesses = list(base["fee_strengths"]), list(base["fee_weaknesses"])
     
-    # Check type
-    ownership_type = str(college_data["overview"]["Ownership Type"])
-    if "Public" in ownership_type or "Government" in ownership_type:
-        strengths.append("Government college")
+    strengths += base["core_strengths"]
+    weaknesses += base["core_weaknesses"]
     
-    # Check students
-    students = safe_value(college_data["academics"]["Total Students"])
-    if students and not pd.isna(students) and students > 3000:
-        strengths.append("Large student community")
-    elif students and not pd.isna(students) and students < 1000:
-        weaknesses.append("Small student body")
-    
-    # Check faculty
-    faculty = safe_value(college_data["academics"]["Total Faculty"])
-    students = safe_value(college_data["academics"]["Total Students"])
-    if faculty and students and not pd.isna(faculty) and not pd.isna(students):
-        ratio = students / faculty
-        if ratio < 20:
-            strengths.append("Good student-faculty ratio")
-        elif ratio > 30:
-            weaknesses.append("High student-faculty ratio")
-    
-    # Check facilities with personalization
-    facilities = str(college_data["facilities"]["Facilities"])
-    if facilities and facilities != "nan":
-        has_hostel = "Hostel" in facilities or "hostel" in facilities.lower()
-        
+    if base["has_facilities"]:
         if personalization and personalization.hostelRequired:
-            if has_hostel:
+            if base["has_hostel"]:
                 strengths.append("Hostel available (as required)")
             else:
                 weaknesses.append("No hostel facility")
-        elif has_hostel:
+        elif base["has_hostel"]:
             strengths.append("Hostel available")
-            
-        if "Gym" in facilities and "Sports" in facilities:
+        
+        if base["good_sports"]:
             strengths.append("Good sports facilities")
     
-    # Location match
-    if personalization and personalization.locationPreference and 'Any' not in personalization.locationPreference:
-        city = str(college_data["location"]["City"])
-        if any(loc.lower() in city.lower() for loc in personalization.locationPreference):
-            strengths.append(f"In your preferred location ({city})")
+    if ScoringKernel.location_mask(base["features"], personalization)[0]:
+        strengths.append(f"In your preferred location ({base['city']})")
     
-    return strengths[:4], weaknesses[:3]  # Limit strengths to top 4, weaknesses to 3
+    return strengths[:rules["max_strengths"]], weaknesses[:rules["max_weaknesses"]]
 
-def generate_recommendation(college1: Dict, college2: Dict, personalization: Optional[PersonalizationFactors] = None) -> str:
+def build_shortlist(ds: Dataset, request: ShortlistRequest) -> tuple:
+    """(college ids, scores, candidate count) of a shortlist, best first.
+
+    Hard constraints prune the catalogue with the filter bitmaps and feature
+    columns, then only the candidates go through the scoring kernel, so the
+    scores equal calculate_score's.
+    """
+    features = get_score_features(ds)
+    with span("find"):
+        mask = candidate_mask(features, ds.model.filters, request.maxFees, request.facilities, request.programs,
+                              request.cities, request.allowUnknownFees)
+        ids = np.flatnonzero(mask)
+    with span("score"):
+        candidates = {key: value if key == "cities" else value[ids] for key, value in features.items()}
+        scores = scoring_kernel.score(candidates, request.personalization)[0]
+        chosen = select_shortlist(scores, candidates["city_codes"], request.size, request.maxPerCity)
+    return ids[chosen], scores[chosen], len(ids)
+
+def calculate_score(college_data: Dict, personalization: Optional[PersonalizationFactors] = None,
+                    ds: Optional[Dataset] = None) -> float:
+    """Calculate overall score for a college (0-10) with optional personalization"""
+    base = get_college_base(college_data, ds)
+    if personalization is None:
+        return base["score"]
+    return personalized_score(base, personalization)
+
+def analyze_college(college_data: Dict, personalization: Optional[PersonalizationFactors] = None,
+                    ds: Optional[Dataset] = None) -> tuple:
+    """Analyze college and return strengths and weaknesses with personalization"""
+    base = get_college_base(college_data, ds)
+    if personalization is None:
+        return list(base["strengths"]), list(base["weaknesses"])
+    return personalized_analysis(base, personalization)
+
+def generate_recommendation(college1: Dict, college2: Dict, personalization: Optional[PersonalizationFactors] = None,
+                            ds: Optional[Dataset] = None) -> str:
     """Generate a recommendation based on comparison with personalization"""
-    score1 = calculate_score(college1, personalization)
-    score2 = calculate_score(college2, personalization)
+    score1 = calculate_score(college1, personalization, ds)
+    score2 = calculate_score(college2, personalization, ds)
     
     fees1 = safe_value(college1["fees"]["Average Fees"])
     fees2 = safe_value(college2["fees"]["Average Fees"])
@@ -567,6 +1577,13 @@ def generate_recommendation(college1: Dict, college2: Dict, personalization: Opt
     return recommendation
 
 if __name__ == "__main__":
+    if "--snapshot" in sys.argv:
+        load_model()
+        if model_status != "ready":
+            sys.exit(1)
+        save_snapshot()
+        sys.exit(0)
+    
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
 
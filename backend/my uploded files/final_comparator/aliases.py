@@ -0,0 +1,175 @@
+import re
+
+# Words left out of the short acronym form ("Institute of Chemical Technology" -> "ict")
+STOPWORDS = {"of", "and", "the", "for", "in", "at", "&"}
+
+# Generic phrases removed to build the "short name" alias
+GENERIC_PHRASES = [
+    "institute of", "college of", "school of", "university of",
+    "institute", "college", "university", "deemed",
+]
+
+
+def normalize(text):
+    """Alias key form: lowercase, punctuation dropped, single spaces"""
+    text = str(text).lower().replace(".", "").replace("'s ", " ").replace("'", "")
+    return " ".join(re.sub(r"[^a-z0-9&]+", " ", text).split())
+
+
+def exact_name(name):
+    """Exact-name key, the same form as the model's name_clean column"""
+    return str(name).lower().strip()
+
+
+def _initials(words):
+    # Short all-caps words are already initials ("KJ", "AP", "SIES")
+    letters = []
+    for word in words:
+        if word.isupper() and len(word) <= 4:
+            letters.append(word.lower())
+        elif word[0].isalnum():
+            letters.append(word[0].lower())
+    return "".join(letters)
+
+
+def generate_aliases(name, city=""):
+    """Alias keys for one college: full name, short name and acronyms"""
+    words = re.sub(r"[^A-Za-z0-9&' ]+", " ", str(name).replace(".", "")).split()
+    full = normalize(name)
+    aliases = set()
+
+    variants = [words]
+    # Drop a trust prefix such as "SCTR's Pune Institute of Computer Technology"
+    if words and words[0].endswith("'s"):
+        variants.append(words[1:])
+    # Drop a trailing city ("Visvesvaraya National Institute of Technology Nagpur")
+    city_words = str(city).split()
+    for variant in list(variants):
+        if city_words and len(variant) > len(city_words) and [w.lower() for w in variant[-len(city_words):]] == [w.lower() for w in city_words]:
+            variants.append(variant[:-len(city_words)])
+
+    for variant in variants:
+        cleaned = [word.replace("'s", "").replace("'", "") for word in variant]
+        aliases.add(normalize(" ".join(cleaned)))
+        content = [word for word in cleaned if word.lower() not in STOPWORDS]
+        for acronym in (_initials(content), _initials([w for w in cleaned if w != "&"])):
+            if len(acronym) >= 3:
+                aliases.add(acronym)
+                if city:
+                    aliases.add(f"{acronym} {normalize(city)}")
+
+    short = f" {full} "
+    for phrase in GENERIC_PHRASES:
+        short = short.replace(f" {phrase} ", " ")
+    short = " ".join(word for word in short.split() if word not in STOPWORDS)
+    if len(short) >= 4 and short != full:
+        aliases.add(short)
+
+    aliases.discard(full)
+    return full, aliases
+
+
+class AliasIndex:
+    """One hash index from alias keys (names, short names, acronyms) to college ids.
+
+    Aliases are generated for every college. An exact college name (lower-cased
+    and stripped, like name_clean) resolves first, to the first college carrying
+    it, so names that differ only in punctuation ("Bharati Vidyapeeth's ..." and
+    "Bharati Vidyapeeth ...") stay apart. Manual overrides come next, then the
+    generated keys. A generated alias shared by several colleges is ambiguous
+    and kept out of the index (see ``collisions``); the city-qualified form
+    ("gcoe karad") still resolves.
+    """
+
+    def __init__(self, df, overrides=None):
+        self.overrides = {}
+        self.unresolved_overrides = []
+        self.names = {}
+        self.name_of = {}
+        self.candidates = {}
+        self.aliases_of = {}
+        self.index = {}
+        self.collisions = {}
+        for college_id, (name, city) in enumerate(zip(df["College Name"], df["City"])):
+            self._add(college_id, name, city)
+        for alias in self.candidates:
+            self._settle(alias)
+        self.set_overrides(df, overrides or {})
+
+    def _add(self, college_id, name, city):
+        self.name_of[college_id] = exact_name(name)
+        self.names.setdefault(self.name_of[college_id], set()).add(college_id)
+        full, aliases = generate_aliases(name, city)
+        keys = {full: True}
+        keys.update({alias: False for alias in aliases if alias != full})
+        self.aliases_of[college_id] = keys
+        for alias, is_full_name in keys.items():
+            self.candidates.setdefault(alias, {})[college_id] = is_full_name
+
+    def _remove(self, college_id):
+        name = self.name_of.pop(college_id, None)
+        owners = self.names.get(name, set())
+        owners.discard(college_id)
+        if not owners:
+            self.names.pop(name, None)
+        for alias in self.aliases_of.pop(college_id, {}):
+            owners = self.candidates.get(alias, {})
+            owners.pop(college_id, None)
+            if not owners:
+                self.candidates.pop(alias, None)
+
+    def _settle(self, alias):
+        """Recompute the index entry of one alias from its candidate colleges"""
+        owners = self.candidates.get(alias, {})
+        self.index.pop(alias, None)
+        self.collisions.pop(alias, None)
+        full_name_owners = [college_id for college_id, is_full in owners.items() if is_full]
+        if full_name_owners:
+            self.index[alias] = min(full_name_owners)
+        elif len(owners) == 1:
+            self.index[alias] = next(iter(owners))
+        elif owners:
+            self.collisions[alias] = sorted(owners)
+
+    def set_overrides(self, df, overrides):
+        """Pin aliases to a college; targets are names or any existing alias"""
+        self.overrides = {}
+        self.unresolved_overrides = []
+        names = df["College Name"].map(normalize)
+        for alias, target in overrides.items():
+            target_key = normalize(target)
+            college_id = self.index.get(target_key)
+            if college_id is None:
+                matches = names.index[names.str.contains(target_key, regex=False)]
+                college_id = int(matches[0]) if len(matches) else None
+            if college_id is None:
+                self.unresolved_overrides.append(alias)
+            else:
+                self.overrides[normalize(alias)] = college_id
+
+    def update(self, df, ids):
+        """Regenerate the aliases of changed colleges and re-check their collisions"""
+        touched = set()
+        for college_id in set(ids):
+            touched.update(self.aliases_of.get(college_id, {}))
+            self._remove(college_id)
+            row = df.iloc[college_id]
+            self._add(college_id, row["College Name"], row["City"])
+            touched.update(self.aliases_of[college_id])
+        for alias in touched:
+            self._settle(alias)
+
+    def resolve(self, query):
+        """College id for an exact name or alias, or None"""
+        owners = self.names.get(exact_name(query))
+        if owners:
+            return min(owners)
+        key = normalize(query)
+        if key in self.overrides:
+            return self.overrides[key]
+        # Generated aliases drop apostrophes, so "kit's" would hit the acronym
+        # of another college; a query spelled with one only matches full names
+        if "'" in query:
+            full_name_owners = [college_id for college_id, is_full in self.candidates.get(key, {}).items() if is_full]
+            return min(full_name_owners) if full_name_owners else None
+        return self.index.get(key)
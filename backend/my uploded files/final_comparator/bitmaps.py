@@ -0,0 +1,88 @@
+import numpy as np
+
+from course_index import tokenize
+from features import split_items
+
+
+def college_facilities(value):
+    """Lowercase facility keys of one college, plus 'hostel' if any hostel is listed"""
+    keys = {item.lower() for item in split_items(value)}
+    if "hostel" in str(value).lower():
+        keys.add("hostel")
+    return keys
+
+
+def college_programs(value):
+    """Degree keys (btech, mtech, be, mba, bpharma, ...) from the first word of each course"""
+    programs = set()
+    for course in split_items(value):
+        tokens = tokenize(course)
+        if tokens:
+            programs.add(tokens[0])
+    return programs
+
+
+class FilterBitmaps:
+    """Packed per-facility and per-program bitmaps over college ids.
+
+    Filters combine with a bitwise AND of the packed arrays, so narrowing the
+    catalogue to e.g. "hostel + gym + mtech" costs a few vectorized byte ops.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        facility_rows = {}
+        program_rows = {}
+        for college_id, (facilities, courses) in enumerate(zip(df["Facilities"], df["Courses"])):
+            for key in college_facilities(facilities):
+                facility_rows.setdefault(key, []).append(college_id)
+            for key in college_programs(courses):
+                program_rows.setdefault(key, []).append(college_id)
+        self.facilities = {key: self._pack(rows) for key, rows in facility_rows.items()}
+        self.programs = {key: self._pack(rows) for key, rows in program_rows.items()}
+
+    def _pack(self, rows):
+        bits = np.zeros(self.size, dtype=bool)
+        bits[rows] = True
+        return np.packbits(bits)
+
+    def _empty(self):
+        return np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    @staticmethod
+    def _set(bits, college_id, value):
+        byte, bit = college_id >> 3, 0x80 >> (college_id & 7)
+        if value:
+            bits[byte] |= bit
+        else:
+            bits[byte] &= ~bit & 0xFF
+
+    def update(self, df, ids):
+        """Set or clear the bits of changed colleges, growing the bitmaps for new ones"""
+        if len(df) > self.size:
+            self.size = len(df)
+            for table in (self.facilities, self.programs):
+                for key, bits in table.items():
+                    table[key] = np.concatenate([bits, np.zeros(len(self._empty()) - len(bits), dtype=np.uint8)])
+        for college_id in set(ids):
+            row = df.iloc[college_id]
+            for table, keys in ((self.facilities, college_facilities(row["Facilities"])),
+                                (self.programs, college_programs(row["Courses"]))):
+                for key in keys:
+                    if key not in table:
+                        table[key] = self._empty()
+                for key, bits in table.items():
+                    self._set(bits, college_id, key in keys)
+
+    def packed_mask(self, facilities=(), programs=()):
+        """Packed AND of the requested facility and program bitmaps"""
+        bits = np.packbits(np.ones(self.size, dtype=bool))
+        for key in facilities:
+            bits &= self.facilities.get(key.strip().lower(), self._empty())
+        for key in programs:
+            bits &= self.programs.get("".join(tokenize(key)), self._empty())
+        return bits
+
+    def mask(self, facilities=(), programs=()):
+        """Boolean array over college ids matching every requested filter"""
+        return np.unpackbits(self.packed_mask(facilities, programs), count=self.size).astype(bool)
@@ -1,30 +1,154 @@
+import copy
+import numpy as np
 import pandas as pd
 import pickle
+import threading
+
+from aliases import AliasIndex
+from bitmaps import FilterBitmaps
+from course_index import CourseIndex
+from facets import FacetCubes
+from retrieval import FactIndex
+from similarity import SimilarityIndex
+from skyline import SkylineIndex
+
+# Manual alias overrides. Acronyms and short names for every college are
+# generated by AliasIndex; these only pin aliases it cannot derive or that collide
+ALIAS_OVERRIDES = {
+    'spce': 'sardar patel college of engineering',
+    'sies': 'sies graduate school of technology',
+    'dmce': 'dwarkadas j sanghvi college of engineering',
+    'universal': 'dr dy patil vidyapeeth',
+}
+
+# Precomputed lookup structures, built on first use unless build_indexes() is called
+INDEX_BUILDERS = {
+    'similarity': lambda df: SimilarityIndex(df),
+    'aliases': lambda df: AliasIndex(df, ALIAS_OVERRIDES),
+    'courses': lambda df: CourseIndex(df),
+    'filters': lambda df: FilterBitmaps(df),
+    'facet_cubes': lambda df: FacetCubes(df),
+    'facts': lambda df: FactIndex(df),
+    'skyline': lambda df: SkylineIndex(df),
+}
+# Columns each index is built from; derive() shares an index when none of them changed
+INDEX_COLUMNS = {
+    'similarity': ['Average Fees', 'Rating', 'Total Faculty', 'Total Student Enrollments', 'College Type',
+                   'Facilities', 'Courses'],
+    'aliases': ['College Name', 'City'],
+    'courses': ['Courses'],
+    'filters': ['Facilities', 'Courses'],
+    'facet_cubes': ['Average Fees', 'City', 'College Type', 'Rating', 'University'],
+    'facts': ['College Name', 'City', 'University', 'Facilities', 'Courses'],
+    'skyline': ['Average Fees', 'Rating', 'Total Faculty', 'Total Student Enrollments', 'City', 'College Type'],
+}
+_index_lock = threading.RLock()
+
+def _shares_data(a, b):
+    """True when two columns are backed by the same memory, i.e. one was shared by derive()"""
+    if len(a) != len(b):
+        return False
+    try:
+        return np.may_share_memory(a.to_numpy(copy=False), b.to_numpy(copy=False))
+    except (TypeError, ValueError):
+        return False
 
 class CollegeComparator:
     def __init__(self, csv_path):
         self.df = pd.read_csv(csv_path)
-        # Common college abbreviations mapping
-        self.abbreviations = {
-            'vjti': 'veermata jijabai technological institute',
-            'coep': 'college of engineering pune',
-            'spce': 'sardar patel college of engineering',
-            'spit': 'sardar patel institute of technology',
-            'kjsce': 'kj somaiya college of engineering',
-            'kjsieit': 'kj somaiya institute of engineering',
-            'pict': 'pune institute of computer technology',
-            'rait': 'ramrao adik institute of technology',
-            'dbit': 'don bosco institute of technology',
-            'sies': 'sies graduate school of technology',
-            'tsec': 'thadomal shahani engineering college',
-            'fcrit': 'fr conceicao rodrigues institute of technology',
-            'dmce': 'dwarkadas j sanghvi college of engineering',
-            'djsce': 'dwarkadas j sanghvi college of engineering',
-            'apsit': 'a p shah institute of technology',
-            'rait': 'ramrao adik institute of technology',
-            'universal': 'dr dy patil vidyapeeth',
-        }
         self.clean_data()
+        self.build_indexes()
+
+    def __getattr__(self, name):
+        # Only reached when the attribute is missing: models pickled without an
+        # index (or loaded lazily) build it the first time it is used
+        if name not in INDEX_BUILDERS or "df" not in self.__dict__:
+            raise AttributeError(name)
+        with _index_lock:
+            if self.__dict__.get(name) is None:
+                self.__dict__[name] = INDEX_BUILDERS[name](self.df)
+            return self.__dict__[name]
+
+    def build_indexes(self):
+        """Build every index that is not built yet (they are pickled with the model)"""
+        for name in INDEX_BUILDERS:
+            getattr(self, name)
+
+    def built_indexes(self):
+        return [name for name in INDEX_BUILDERS if self.__dict__.get(name) is not None]
+
+    def refresh_indexes(self, college_ids):
+        """Incrementally update the built indexes for changed colleges; unbuilt ones see the new data when built"""
+        shared = self.__dict__.get("shared_indexes", set())
+        for name in self.built_indexes():
+            if name in shared:
+                # Also used by another snapshot: update a private copy
+                self.__dict__[name] = copy.deepcopy(self.__dict__[name])
+                shared.discard(name)
+            self.__dict__[name].update(self.df, college_ids)
+
+    def derive(self, changes):
+        """Snapshot with some values replaced, e.g. another admission year's fees.
+
+        changes is a DataFrame indexed by college id whose columns replace
+        those values (NaN cells keep the current value). Unchanged columns
+        share memory with this model until either side writes to them, and
+        every index built from unchanged columns is shared instead of rebuilt.
+        Returns (snapshot, changed columns).
+        """
+        unknown = [column for column in changes.columns if column not in self.df.columns]
+        if unknown:
+            raise KeyError(f"Unknown columns: {unknown}")
+        df = self.df.copy(deep=False)
+        changed = []
+        for column in changes.columns:
+            values = changes[column].dropna()
+            updated = df[column].copy()
+            updated.loc[values.index] = values
+            if not updated.equals(df[column]):
+                df[column] = updated
+                changed.append(column)
+        if "College Name" in changed:
+            df["name_clean"] = df["College Name"].str.lower().str.strip()
+
+        snapshot = CollegeComparator.__new__(CollegeComparator)
+        # Upserts replace the columns they touch instead of writing into them,
+        # so neither side ever sees the other's edits
+        snapshot.df = df
+        snapshot.shared_indexes = set()
+        self.__dict__.setdefault("shared_indexes", set())
+        for name in self.built_indexes():
+            if not set(INDEX_COLUMNS[name]) & set(changed):
+                snapshot.__dict__[name] = self.__dict__[name]
+                snapshot.shared_indexes.add(name)
+                self.shared_indexes.add(name)
+        return snapshot, changed
+
+    def diff(self, other, columns):
+        """Values of columns that differ between this model and other, by college id.
+
+        Returns a DataFrame with one row per change: college_id, column, value
+        (this model) and other_value. Columns still shared with other (see
+        derive()) are skipped without comparing any values.
+        """
+        common = self.df.index.intersection(other.df.index)
+        changes = []
+        for column in columns:
+            mine, theirs = self.df[column], other.df[column]
+            if _shares_data(mine, theirs):
+                continue
+            mine, theirs = mine.loc[common], theirs.loc[common]
+            differs = ((mine != theirs) & ~(mine.isna() & theirs.isna())).to_numpy()
+            if differs.any():
+                changes.append(pd.DataFrame({
+                    "college_id": common[differs],
+                    "column": column,
+                    "value": mine[differs].to_numpy(dtype=object),
+                    "other_value": theirs[differs].to_numpy(dtype=object),
+                }))
+        if not changes:
+            return pd.DataFrame(columns=["college_id", "column", "value", "other_value"])
+        return pd.concat(changes, ignore_index=True)
 
     def clean_data(self):
         # Drop useless columns starting with 'Unnamed'
@@ -39,12 +163,115 @@ class CollegeComparator:
             axis=1
         )
 
+    def get_college(self, college_id):
+        """Return the row for a college id (its position in the data) or None"""
+        if college_id < 0 or college_id >= len(self.df):
+            return None
+        return self.df.iloc[college_id]
+
+    def coerce_record(self, record):
+        """Copy of record with numeric columns as floats (None, NaN or blank is missing).
+
+        Raises ValueError for columns the data does not have and for values
+        that do not fit their column, before anything is changed.
+        """
+        coerced = {}
+        for column, value in record.items():
+            if column not in self.df.columns or column == "name_clean":
+                raise ValueError(f"Unknown column '{column}'")
+            numeric = pd.api.types.is_numeric_dtype(self.df[column])
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                coerced[column] = np.nan if numeric else None
+            elif not numeric:
+                if not isinstance(value, str):
+                    raise ValueError(f"'{column}' must be text, got {value!r}")
+                coerced[column] = value
+            elif isinstance(value, str) and not value.strip():
+                coerced[column] = np.nan
+            else:
+                try:
+                    if isinstance(value, bool):
+                        raise ValueError
+                    number = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"'{column}' must be a number, got {value!r}") from None
+                if not np.isfinite(number):
+                    raise ValueError(f"'{column}' must be a finite number, got {value!r}")
+                coerced[column] = number
+        return coerced
+
+    def upsert_college(self, record, college_id=None):
+        """Add a college (college_id=None) or update one, then refresh the indexes.
+
+        The change is made on a copy of the data that replaces df only together
+        with the refreshed indexes: if a value or an index update fails, the
+        model is left as it was (indexes touched by the failed update are
+        dropped and rebuilt from the old data on next use).
+        """
+        record = self.coerce_record(record)
+        if college_id is None:
+            college_id = len(self.df)
+            new_row = pd.DataFrame([record], columns=self.df.columns, index=[college_id])
+            df = pd.concat([self.df, new_row.astype(self.df.dtypes.to_dict())])
+        elif self.get_college(college_id) is None:
+            raise KeyError(f"Unknown college id {college_id}")
+        else:
+            # Shallow copy with private copies of the columns being written
+            df = self.df.copy(deep=False)
+            for column in set(record) | {"name_clean", "location"}:
+                df[column] = df[column].copy()
+            for column, value in record.items():
+                df.loc[college_id, column] = value
+        name = str(df.loc[college_id, "College Name"])
+        df.loc[college_id, "name_clean"] = name.lower().strip()
+        if not isinstance(df.loc[college_id, "location"], str) or not df.loc[college_id, "location"]:
+            df.loc[college_id, "location"] = f"https://www.google.com/maps/search/?api=1&query={name.replace(' ', '+')}"
+
+        previous = self.df
+        self.df = df
+        try:
+            self.refresh_indexes([college_id])
+        except Exception:
+            self.df = previous
+            for index_name in self.built_indexes():
+                if index_name not in self.__dict__.get("shared_indexes", set()):
+                    del self.__dict__[index_name]
+            raise
+        return college_id
+
+    def similar_colleges(self, college_id, limit=10):
+        """Return [(college_id, similarity)] from the precomputed neighbour lists"""
+        return self.similarity.query(college_id, limit)
+
+    def search_courses(self, query, limit=20):
+        """Return [(college_id, score, matched courses)] for a program search"""
+        return self.courses.search(query, limit)
+
+    def pareto_frontier(self, criteria, city=None, college_type=None):
+        """Return (ids of colleges no other college beats on every criterion, considered, skipped)"""
+        return self.skyline.frontier(criteria, city, college_type)
+
+    def retrieve(self, query, limit=5):
+        """Return [(college_id, similarity)] for free text such as a chat message"""
+        return self.facts.search(query, limit)
+
+    def facets(self, facilities=(), programs=(), limit=20):
+        """Facet counts and fee/rating distributions, optionally filtered.
+
+        Returns (matching college count, facets per dimension).
+        """
+        if not facilities and not programs:
+            return len(self.df), self.facet_cubes.facets(limit=limit)
+        mask = self.filters.mask(facilities, programs)
+        return int(mask.sum()), self.facet_cubes.facets(mask, limit=limit)
+
     def find_college(self, query):
         query_lower = query.lower().strip()
         
-        # Check if the query is a known abbreviation
-        if query_lower in self.abbreviations:
-            query_lower = self.abbreviations[query_lower]
+        # Exact names, acronyms and short names resolve in one lookup
+        college_id = self.aliases.resolve(query_lower)
+        if college_id is not None:
+            return self.df.iloc[college_id]
         
         # Try exact substring match first
         results = self.df[self.df["name_clean"].str.contains(query_lower, regex=False, na=False)]
@@ -65,6 +292,39 @@ class CollegeComparator:
         
         return None
 
+    def extract(self, col):
+        """Group one college row into the sections used by compare()"""
+        return {
+            "id": int(col.name),
+            "overview": {
+                "College Name": col["College Name"],
+                "Established Year": col.get("Established Year", None),
+                "Ownership Type": col.get("College Type", None),
+                "University": col.get("University", None),
+                "Genders Accepted": col.get("Genders Accepted", None),
+                "Campus Size": col.get("Campus Size", None),
+            },
+            "location": {
+                "City": col["City"],
+                "State": col.get("State", "Maharashtra"),
+                "Google Maps": col.get("location")  # use 'location' column now
+            },
+            "academics": {
+                "Total Faculty": col.get("Total Faculty", None),
+                "Total Students": col.get("Total Student Enrollments", None),
+                "Courses": col.get("Courses", None),
+            },
+            "fees": {
+                "Average Fees": col.get("Average Fees", None)
+            },
+            "facilities": {
+                "Facilities": col.get("Facilities", None)
+            },
+            "rating": {
+                "Rating": col.get("Rating", None)
+            }
+        }
+
     def compare(self, c1, c2):
         col1 = self.find_college(c1)
         col2 = self.find_college(c2)
@@ -72,40 +332,9 @@ class CollegeComparator:
         if col1 is None or col2 is None:
             return {"error": "One or both colleges not found"}
 
-        def extract(col):
-            return {
-                "overview": {
-                    "College Name": col["College Name"],
-                    "Established Year": col.get("Established Year", None),
-                    "Ownership Type": col.get("College Type", None),
-                    "University": col.get("University", None),
-                    "Genders Accepted": col.get("Genders Accepted", None),
-                    "Campus Size": col.get("Campus Size", None),
-                },
-                "location": {
-                    "City": col["City"],
-                    "State": col.get("State", "Maharashtra"),
-                    "Google Maps": col.get("location")  # use 'location' column now
-                },
-                "academics": {
-                    "Total Faculty": col.get("Total Faculty", None),
-                    "Total Students": col.get("Total Student Enrollments", None),
-                    "Courses": col.get("Courses", None),
-                },
-                "fees": {
-                    "Average Fees": col.get("Average Fees", None)
-                },
-                "facilities": {
-                    "Facilities": col.get("Facilities", None)
-                },
-                "rating": {
-                    "Rating": col.get("Rating", None)
-                }
-            }
-
         return {
-            "college1": extract(col1),
-            "college2": extract(col2)
+            "college1": self.extract(col1),
+            "college2": self.extract(col2)
         }
 
 if __name__ == "__main__":
@@ -114,3 +343,6 @@ if __name__ == "__main__":
         pickle.dump(model, f)
 
     print("[SUCCESS] Model saved: college_comparator.pkl")
+    print(f"  Aliases: {len(model.aliases.index)}, ambiguous: {len(model.aliases.collisions)}")
+    if model.aliases.unresolved_overrides:
+        print(f"  [WARN] Overrides with no matching college: {model.aliases.unresolved_overrides}")
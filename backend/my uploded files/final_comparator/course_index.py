@@ -0,0 +1,184 @@
+import math
+import re
+from array import array
+
+import numpy as np
+
+from features import split_items
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase word tokens; dots inside degree names are dropped (M.Tech -> mtech)"""
+    return TOKEN_PATTERN.findall(text.lower().replace(".", ""))
+
+
+def encode_ids(ids):
+    """Delta + varint encode a sorted list of non-negative ints"""
+    out = bytearray()
+    previous = 0
+    for value in ids:
+        delta = value - previous
+        previous = value
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_ids(data):
+    """Vectorized inverse of encode_ids, returns an int64 array"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if len(raw) == 0:
+        return np.empty(0, dtype=np.int64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    group = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shift = 7 * (np.arange(len(raw)) - starts[group])
+    deltas = np.add.reduceat((raw & 0x7F).astype(np.int64) << shift, starts)
+    return np.cumsum(deltas)
+
+
+class CourseIndex:
+    """Inverted index over course names with BM25 ranking.
+
+    Each distinct course name is one document. Term postings (course ids and
+    term frequencies) and the course -> colleges postings are stored as
+    delta + varint encoded bytes, so the index stays a fraction of the raw
+    Courses text even for very large catalogues. A course no college offers
+    any more (after an update) is left out of the BM25 statistics, so scores
+    match a freshly built index.
+    """
+
+    def __init__(self, df, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.course_names = []
+        self.course_lookup = {}
+        self.doc_lengths = array("H")
+        self.term_postings = {}
+        self.course_colleges = []
+        self.college_courses = []
+
+        term_docs = {}
+        college_lists = []
+        for college_id, value in enumerate(df["Courses"]):
+            course_ids = sorted({self._course_id(name, term_docs) for name in split_items(value)})
+            self.college_courses.append(encode_ids(course_ids))
+            for course_id in course_ids:
+                while len(college_lists) <= course_id:
+                    college_lists.append([])
+                college_lists[course_id].append(college_id)
+
+        self.course_colleges = [encode_ids(colleges) for colleges in college_lists]
+        self.term_postings = {term: self._encode_postings(docs) for term, docs in term_docs.items()}
+        self.live = np.ones(len(self.course_names), dtype=bool)
+
+    def _course_id(self, name, term_docs):
+        """Id of a course name, adding it as a new document when unseen"""
+        key = " ".join(tokenize(name))
+        if key in self.course_lookup:
+            return self.course_lookup[key]
+        course_id = len(self.course_names)
+        self.course_lookup[key] = course_id
+        self.course_names.append(name)
+        tokens = tokenize(name)
+        self.doc_lengths.append(min(len(tokens), 0xFFFF))
+        for term in set(tokens):
+            term_docs.setdefault(term, []).append((course_id, min(tokens.count(term), 255)))
+        return course_id
+
+    @staticmethod
+    def _encode_postings(docs):
+        docs = sorted(docs)
+        return encode_ids([doc for doc, _ in docs]), bytes(tf for _, tf in docs)
+
+    def _postings(self, term):
+        if term not in self.term_postings:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        ids, tfs = self.term_postings[term]
+        return decode_ids(ids), np.frombuffer(tfs, dtype=np.uint8).astype(np.float64)
+
+    def update(self, df, ids):
+        """Re-index the courses of changed colleges, touching only affected postings"""
+        term_docs = {}
+        changed_courses = {}
+        for college_id in sorted(set(ids)):
+            old = set(decode_ids(self.college_courses[college_id]).tolist()) if college_id < len(self.college_courses) else set()
+            new = {self._course_id(name, term_docs) for name in split_items(df["Courses"].iloc[college_id])}
+            while len(self.college_courses) <= college_id:
+                self.college_courses.append(b"")
+            self.college_courses[college_id] = encode_ids(sorted(new))
+            for course_id in old - new:
+                changed_courses.setdefault(course_id, set()).add((college_id, False))
+            for course_id in new - old:
+                changed_courses.setdefault(course_id, set()).add((college_id, True))
+
+        for term, docs in term_docs.items():
+            if term in self.term_postings:
+                old_ids, old_tfs = self.term_postings[term]
+                docs = list(zip(decode_ids(old_ids).tolist(), old_tfs)) + docs
+            self.term_postings[term] = self._encode_postings(docs)
+
+        while len(self.course_colleges) < len(self.course_names):
+            self.course_colleges.append(b"")
+        for course_id, changes in changed_courses.items():
+            colleges = set(decode_ids(self.course_colleges[course_id]).tolist())
+            for college_id, present in changes:
+                if present:
+                    colleges.add(college_id)
+                else:
+                    colleges.discard(college_id)
+            self.course_colleges[course_id] = encode_ids(sorted(colleges))
+        self.live = np.array([len(colleges) > 0 for colleges in self.course_colleges], dtype=bool)
+
+    def search_courses(self, query):
+        """BM25 score for every course document, as (course_ids, scores) sorted best first"""
+        n_docs = int(self.live.sum())
+        if n_docs == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        lengths = np.frombuffer(self.doc_lengths, dtype=np.uint16).astype(np.float64)
+        avg_length = lengths[self.live].mean() or 1.0
+        scores = np.zeros(len(self.course_names))
+        for term in set(tokenize(query)):
+            doc_ids, tfs = self._postings(term)
+            alive = self.live[doc_ids]
+            doc_ids, tfs = doc_ids[alive], tfs[alive]
+            if len(doc_ids) == 0:
+                continue
+            idf = math.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_ids] / avg_length)
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        matched = np.flatnonzero(scores)
+        order = np.argsort(-scores[matched], kind="stable")
+        return matched[order], scores[matched][order]
+
+    def search(self, query, limit=20):
+        """Return [(college_id, score, [matched course names])] ranked by best matching course"""
+        course_ids, scores = self.search_courses(query)
+        if len(course_ids) == 0:
+            return []
+        best = {}
+        for position, (course_id, score) in enumerate(zip(course_ids.tolist(), scores.tolist())):
+            for college_id in decode_ids(self.course_colleges[course_id]).tolist():
+                best.setdefault(college_id, score)
+            # Courses are visited best first, so once the list is full and scores
+            # drop no unseen college can outrank the ones already collected
+            if len(best) >= limit and (position + 1 == len(scores) or scores[position + 1] < score):
+                break
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+        rank_of = {course_id: rank for rank, course_id in enumerate(course_ids.tolist())}
+        results = []
+        for college_id, score in ranked:
+            offered = [c for c in decode_ids(self.college_courses[college_id]).tolist() if c in rank_of]
+            offered.sort(key=rank_of.get)
+            results.append((college_id, round(score, 4), [self.course_names[c] for c in offered[:3]]))
+        return results
+
+    def nbytes(self):
+        """Approximate size of the compressed postings in bytes"""
+        postings = sum(len(ids) + len(tfs) for ids, tfs in self.term_postings.values())
+        return postings + sum(map(len, self.course_colleges)) + sum(map(len, self.college_courses)) + len(self.doc_lengths) * self.doc_lengths.itemsize
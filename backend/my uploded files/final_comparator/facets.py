@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+# Fee buckets line up with the thresholds used by the API's fee scoring
+FEE_BUCKETS = [
+    (100000, "Under ₹1L"),
+    (200000, "₹1L - ₹2L"),
+    (300000, "₹2L - ₹3L"),
+    (500000, "₹3L - ₹5L"),
+    (1000000, "₹5L - ₹10L"),
+    (float("inf"), "Above ₹10L"),
+]
+RATING_EDGES = [2.5, 3.0, 3.5, 4.0, 4.5]
+RATING_LABELS = ["< 2.5", "2.5 - 3.0", "3.0 - 3.5", "3.5 - 4.0", "4.0 - 4.5", "4.5+", "unrated"]
+
+
+def fee_bucket(fees):
+    if fees is None or pd.isna(fees):
+        return "Unknown"
+    for upper, label in FEE_BUCKETS:
+        if fees < upper:
+            return label
+    return FEE_BUCKETS[-1][1]
+
+
+def dimension_values(df):
+    """Facet value of every college for each dimension"""
+    return {
+        "city": df["City"].fillna("Unknown").astype(str).str.strip().tolist(),
+        "type": df["College Type"].fillna("Unknown").astype(str).tolist(),
+        "university": df["University"].fillna("Unknown").astype(str).tolist(),
+        "fee_bucket": [fee_bucket(fees) for fees in df["Average Fees"]],
+    }
+
+
+def rating_bins(ratings):
+    """Histogram bin per rating; unrated colleges go to the last bin"""
+    ratings = np.asarray(ratings, dtype=float)
+    bins = np.digitize(ratings, RATING_EDGES)
+    bins[np.isnan(ratings)] = len(RATING_LABELS) - 1
+    return bins.astype(np.int8)
+
+
+class FacetCubes:
+    """Group-by cubes (count, fee min/max/mean, rating histogram) per facet dimension.
+
+    The unfiltered cubes are computed once at build time and adjusted in place
+    when colleges change. Filtered facets reuse the per-college group codes and
+    aggregate only the rows selected by a filter mask with bincount.
+    """
+
+    def __init__(self, df):
+        self.labels = {}
+        self.lookup = {}
+        self.codes = {}
+        for dim, values in dimension_values(df).items():
+            self.labels[dim] = []
+            self.lookup[dim] = {}
+            self.codes[dim] = np.array([self._code(dim, value) for value in values], dtype=np.int32)
+        self.fees = df["Average Fees"].to_numpy(dtype=float, copy=True)
+        self.ratings = rating_bins(df["Rating"])
+        self.cubes = {dim: self._aggregate(dim, None) for dim in self.codes}
+
+    def _code(self, dim, value):
+        if value not in self.lookup[dim]:
+            self.lookup[dim][value] = len(self.labels[dim])
+            self.labels[dim].append(value)
+        return self.lookup[dim][value]
+
+    def _aggregate(self, dim, mask):
+        """Cube arrays for one dimension over the rows selected by mask (None = all)"""
+        codes, fees, ratings = self.codes[dim], self.fees, self.ratings
+        if mask is not None:
+            codes, fees, ratings = codes[mask], fees[mask], ratings[mask]
+        groups = len(self.labels[dim])
+        known = ~np.isnan(fees)
+        cube = {
+            "count": np.bincount(codes, minlength=groups),
+            "fee_count": np.bincount(codes[known], minlength=groups),
+            "fee_sum": np.bincount(codes[known], weights=fees[known], minlength=groups),
+            "fee_min": np.full(groups, np.inf),
+            "fee_max": np.full(groups, -np.inf),
+            "rating": np.bincount(codes * len(RATING_LABELS) + ratings, minlength=groups * len(RATING_LABELS))
+                        .reshape(groups, len(RATING_LABELS)),
+        }
+        np.minimum.at(cube["fee_min"], codes[known], fees[known])
+        np.maximum.at(cube["fee_max"], codes[known], fees[known])
+        return cube
+
+    def _grow(self, dim):
+        cube = self.cubes[dim]
+        extra = len(self.labels[dim]) - len(cube["count"])
+        if extra <= 0:
+            return
+        for key, fill in (("count", 0), ("fee_count", 0), ("fee_sum", 0.0), ("fee_min", np.inf), ("fee_max", -np.inf)):
+            cube[key] = np.concatenate([cube[key], np.full(extra, fill, dtype=cube[key].dtype)])
+        cube["rating"] = np.vstack([cube["rating"], np.zeros((extra, len(RATING_LABELS)), dtype=cube["rating"].dtype)])
+
+    def _apply(self, cube, group, fees, rating, sign):
+        cube["count"][group] += sign
+        cube["rating"][group, rating] += sign
+        if not np.isnan(fees):
+            cube["fee_count"][group] += sign
+            cube["fee_sum"][group] += sign * fees
+
+    def update(self, df, ids):
+        """Move changed colleges between groups, adjusting only the groups they touch"""
+        ids = sorted(set(ids))
+        old_size = len(self.fees)
+        if len(df) > old_size:
+            grow = len(df) - old_size
+            self.fees = np.concatenate([self.fees, np.full(grow, np.nan)])
+            self.ratings = np.concatenate([self.ratings, np.full(grow, -1, dtype=np.int8)])
+            for dim in self.codes:
+                self.codes[dim] = np.concatenate([self.codes[dim], np.full(grow, -1, dtype=np.int32)])
+
+        changed = df.iloc[ids]
+        new_values = dimension_values(changed)
+        new_fees = changed["Average Fees"].astype(float).to_numpy()
+        new_ratings = rating_bins(changed["Rating"])
+        old_fees = self.fees[ids].copy()
+        old_ratings = self.ratings[ids].copy()
+        self.fees[ids] = new_fees
+        self.ratings[ids] = new_ratings
+
+        for dim in self.codes:
+            cube = self.cubes[dim]
+            recheck = set()
+            for position, college_id in enumerate(ids):
+                old_group = self.codes[dim][college_id]
+                if old_group >= 0:
+                    self._apply(cube, old_group, old_fees[position], old_ratings[position], -1)
+                    if old_fees[position] in (cube["fee_min"][old_group], cube["fee_max"][old_group]):
+                        recheck.add(old_group)
+                group = self._code(dim, new_values[dim][position])
+                self._grow(dim)
+                self.codes[dim][college_id] = group
+                self._apply(cube, group, new_fees[position], new_ratings[position], 1)
+                if not np.isnan(new_fees[position]):
+                    cube["fee_min"][group] = min(cube["fee_min"][group], new_fees[position])
+                    cube["fee_max"][group] = max(cube["fee_max"][group], new_fees[position])
+            # A removed extreme value can only be replaced by scanning that group
+            for group in recheck:
+                members = (self.codes[dim] == group) & ~np.isnan(self.fees)
+                cube["fee_min"][group] = self.fees[members].min() if members.any() else np.inf
+                cube["fee_max"][group] = self.fees[members].max() if members.any() else -np.inf
+
+    def facets(self, mask=None, limit=20, dimensions=None):
+        """Facet lists per dimension, largest groups first"""
+        result = {}
+        for dim in dimensions or self.codes:
+            cube = self.cubes[dim] if mask is None else self._aggregate(dim, mask)
+            order = np.argsort(-cube["count"], kind="stable")
+            entries = []
+            for group in order[:limit]:
+                count = int(cube["count"][group])
+                if count == 0:
+                    break
+                fee_count = int(cube["fee_count"][group])
+                entries.append({
+                    "value": self.labels[dim][group],
+                    "count": count,
+                    "fees": {
+                        "min": float(cube["fee_min"][group]) if fee_count else None,
+                        "max": float(cube["fee_max"][group]) if fee_count else None,
+                        "mean": round(float(cube["fee_sum"][group]) / fee_count, 2) if fee_count else None,
+                    },
+                    "rating_histogram": dict(zip(RATING_LABELS, cube["rating"][group].tolist())),
+                })
+            result[dim] = entries
+        return result
@@ -0,0 +1,68 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+def split_items(value):
+    """Split a comma separated cell (Courses, Facilities) into clean items"""
+    if not isinstance(value, str):
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def student_faculty_ratio(df):
+    """Students per faculty member, NaN where either number is missing"""
+    faculty = df["Total Faculty"].where(df["Total Faculty"] > 0)
+    return (df["Total Student Enrollments"] / faculty).astype(float)
+
+
+def is_government(df):
+    """True for public/government colleges, matching the API's ownership check"""
+    ownership = df["College Type"].map(str)
+    return ownership.str.contains("Public", regex=False) | ownership.str.contains("Government", regex=False)
+
+
+def facility_vocabulary(df):
+    """Sorted list of every facility that appears in the data"""
+    vocabulary = set()
+    for value in df["Facilities"]:
+        vocabulary.update(split_items(value))
+    return sorted(vocabulary)
+
+
+def facility_matrix(df, vocabulary):
+    """Boolean (colleges x facilities) matrix; facilities outside the vocabulary are ignored"""
+    positions = {name: i for i, name in enumerate(vocabulary)}
+    matrix = np.zeros((len(df), len(vocabulary)), dtype=bool)
+    for row, value in enumerate(df["Facilities"]):
+        for item in split_items(value):
+            if item in positions:
+                matrix[row, positions[item]] = True
+    return matrix
+
+
+def hashed_course_matrix(df, dims=256):
+    """Course sets folded into a fixed number of buckets with a stable hash"""
+    matrix = np.zeros((len(df), dims), dtype=np.float32)
+    for row, value in enumerate(df["Courses"]):
+        for item in split_items(value):
+            matrix[row, zlib.crc32(item.lower().encode("utf-8")) % dims] = 1.0
+    return matrix
+
+
+def unit_rows(matrix):
+    """Scale each row to unit length, leaving all-zero rows untouched"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def min_max(values, low, high):
+    """Scale into [0, 1] with fixed bounds, so later rows reuse the build-time scale"""
+    span = high - low if high > low else 1.0
+    return np.clip((np.asarray(values, dtype=float) - low) / span, 0.0, 1.0)
+
+
+def nan_to(values, fill):
+    """Replace NaN entries of a float array or Series with a constant"""
+    return np.where(pd.isna(values), fill, values).astype(float)
@@ -0,0 +1,137 @@
+import math
+import zlib
+
+import numpy as np
+
+from aliases import generate_aliases
+from course_index import tokenize
+from features import split_items
+
+# Relative weight of each text field in a college's vector. Names and their
+# generated acronyms dominate so "vjti fees" lands on VJTI, not on every
+# college that lists fees-related facilities
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "aliases": 3.0,
+    "city": 2.0,
+    "university": 1.5,
+    "facilities": 1.0,
+    "courses": 1.0,
+}
+
+
+def hash_token(token, dims):
+    return zlib.crc32(token.encode("utf-8")) % dims
+
+
+def college_terms(row):
+    """Weighted term frequencies of one college across all indexed fields"""
+    name = tokenize(str(row["College Name"]))
+    _, aliases = generate_aliases(row["College Name"], row["City"])
+    fields = {
+        "name": name,
+        # Only the alias tokens the name lacks: acronyms and short forms
+        "aliases": sorted({token for alias in aliases for token in tokenize(alias)} - set(name)),
+        "city": tokenize(str(row["City"])),
+        "university": tokenize(str(row.get("University", ""))),
+        "facilities": [token for item in split_items(row.get("Facilities")) for token in tokenize(item)],
+        "courses": [token for item in split_items(row.get("Courses")) for token in tokenize(item)],
+    }
+    terms = {}
+    for field, tokens in fields.items():
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            # Sublinear tf so long course lists don't drown out the name
+            terms[token] = terms.get(token, 0.0) + FIELD_WEIGHTS[field] * (1 + math.log(count))
+    return terms
+
+
+class FactIndex:
+    """Hashed TF-IDF vectors of every college for retrieval-style lookups.
+
+    Tokens from the name, generated aliases, city, university, facilities and
+    courses are hashed into a fixed number of buckets, so there is no
+    vocabulary to maintain. Vectors are L2 normalised and stored as an
+    inverted index (bucket -> colleges, weights); a query touches only the
+    postings of its own buckets.
+    """
+
+    def __init__(self, df, dims=2 ** 18):
+        self.dims = dims
+        self.doc_buckets = []
+        self.doc_tfs = []
+        for _, row in df.iterrows():
+            self._set_doc(len(self.doc_buckets), row)
+        self._pack()
+
+    def _set_doc(self, college_id, row):
+        weights = {}
+        for token, tf in college_terms(row).items():
+            bucket = hash_token(token, self.dims)
+            weights[bucket] = weights.get(bucket, 0.0) + tf
+        buckets = np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))
+        tfs = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+        order = np.argsort(buckets)
+        while len(self.doc_buckets) <= college_id:
+            self.doc_buckets.append(np.empty(0, dtype=np.int64))
+            self.doc_tfs.append(np.empty(0))
+        self.doc_buckets[college_id] = buckets[order]
+        self.doc_tfs[college_id] = tfs[order]
+
+    def _pack(self):
+        """Recompute idf, normalise every vector and lay the postings out by bucket"""
+        n_docs = len(self.doc_buckets)
+        lengths = np.array([len(b) for b in self.doc_buckets], dtype=np.int64)
+        docs = np.repeat(np.arange(n_docs), lengths)
+        buckets = np.concatenate(self.doc_buckets) if n_docs else np.empty(0, dtype=np.int64)
+        tfs = np.concatenate(self.doc_tfs) if n_docs else np.empty(0)
+
+        unique, doc_freq = np.unique(buckets, return_counts=True)
+        idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1.0
+        weights = tfs * idf[np.searchsorted(unique, buckets)]
+        norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=n_docs))
+        weights = weights / np.where(norms > 0, norms, 1.0)[docs]
+
+        order = np.argsort(buckets, kind="stable")
+        self.buckets = unique
+        self.idf = idf
+        self.offsets = np.concatenate(([0], np.cumsum(doc_freq)))
+        self.posting_docs = docs[order].astype(np.int32)
+        self.posting_weights = weights[order].astype(np.float32)
+        self.n_docs = n_docs
+
+    def update(self, df, ids):
+        """Re-vectorise changed colleges; idf and norms are recomputed for all"""
+        for college_id in sorted(set(ids)):
+            self._set_doc(college_id, df.iloc[college_id])
+        self._pack()
+
+    def search(self, query, limit=5):
+        """Return [(college_id, cosine similarity)] best first"""
+        counts = {}
+        for token in tokenize(query):
+            bucket = hash_token(token, self.dims)
+            counts[bucket] = counts.get(bucket, 0) + 1
+        if not counts or self.n_docs == 0:
+            return []
+        query_buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        positions = np.searchsorted(self.buckets, query_buckets)
+        positions = np.minimum(positions, len(self.buckets) - 1)
+        known = self.buckets[positions] == query_buckets
+        if not known.any():
+            return []
+        positions = positions[known]
+        query_weights = np.array([1 + math.log(counts[b]) for b in query_buckets[known]]) * self.idf[positions]
+        query_weights /= np.linalg.norm(query_weights)
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for position, weight in zip(positions.tolist(), query_weights.tolist()):
+            start, end = self.offsets[position], self.offsets[position + 1]
+            scores[self.posting_docs[start:end]] += weight * self.posting_weights[start:end]
+
+        limit = min(limit, self.n_docs)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(int(college_id), round(float(scores[college_id]), 4)) for college_id in top if scores[college_id] > 0]
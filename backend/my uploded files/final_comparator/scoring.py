@@ -0,0 +1,212 @@
+import copy
+import json
+import math
+import operator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RULES_PATH = Path(__file__).parent / "scoring_rules.json"
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def load_rules(path=RULES_PATH):
+    """Read the versioned scoring/quota rule table"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_rules(rules, overrides):
+    """Copy of a rule table with nested overrides applied (lists are replaced whole)"""
+    merged = copy.deepcopy(rules)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_rules(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _number(value):
+    """Float for a present, non-zero number, otherwise NaN (the API treats 0 as missing)"""
+    if value is None or isinstance(value, str):
+        return math.nan
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return value if value and not math.isnan(value) else math.nan
+
+
+def college_features(college_data):
+    """Scoring inputs of one college from a compare()/extract() dict"""
+    students = _number(college_data["academics"]["Total Students"])
+    faculty = _number(college_data["academics"]["Total Faculty"])
+    facilities = str(college_data["facilities"]["Facilities"])
+    ownership = str(college_data["overview"]["Ownership Type"])
+    rating = college_data["rating"]["Rating"]
+    return {
+        "fees": np.array([_number(college_data["fees"]["Average Fees"])]),
+        "students": np.array([students]),
+        "ratio": np.array([students / faculty if faculty > 0 else math.nan]),
+        "rating": np.array([_number(rating) if isinstance(rating, (int, float, np.number)) else math.nan]),
+        "is_government": np.array(["Public" in ownership or "Government" in ownership]),
+        "has_hostel": np.array(["hostel" in facilities.lower()]),
+        "facilities_length": np.array([len(facilities) if facilities and facilities != "nan" else 0]),
+        "city_codes": np.array([0]),
+        "cities": [str(college_data["location"]["City"]).lower()],
+    }
+
+
+def table_features(df):
+    """Scoring inputs of every college as column arrays, same semantics as college_features"""
+    def numbers(column):
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, copy=True)
+        values[values == 0] = np.nan
+        return values
+
+    students = numbers("Total Student Enrollments")
+    faculty = numbers("Total Faculty")
+    facilities = df["Facilities"].map(str)
+    ownership = df["College Type"].map(str)
+    cities, city_codes = np.unique(df["City"].map(str).str.lower().to_numpy(), return_inverse=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(faculty > 0, students / faculty, np.nan)
+    return {
+        "fees": numbers("Average Fees"),
+        "students": students,
+        "ratio": ratio,
+        "rating": numbers("Rating"),
+        "is_government": (ownership.str.contains("Public", regex=False) | ownership.str.contains("Government", regex=False)).to_numpy(),
+        "has_hostel": facilities.str.lower().str.contains("hostel", regex=False).to_numpy(),
+        "facilities_length": np.where((facilities != "nan") & (facilities != ""), facilities.str.len(), 0),
+        "city_codes": city_codes,
+        "cities": cities.tolist(),
+    }
+
+
+def _compile_bands(tables, key):
+    """Pad every variant's band list to the same length.
+
+    Returns, per band position, the comparison operators in use with a
+    (V, 1) row mask each, plus (V, B) thresholds and points. Padding bands
+    never match: they are in no operator's row mask, and their NaN threshold
+    compares false anyway.
+    """
+    width = max(len(rules["score"][key]) for rules in tables)
+    values = np.full((len(tables), width), np.nan)
+    points = np.zeros((len(tables), width))
+    ops = [{} for _ in range(width)]
+    for v, rules in enumerate(tables):
+        for b, band in enumerate(rules["score"][key]):
+            if band["op"] not in OPERATORS:
+                raise ValueError(f"Unknown operator {band['op']!r} in {key}")
+            values[v, b] = band["value"]
+            points[v, b] = band["points"]
+            ops[b].setdefault(band["op"], np.zeros((len(tables), 1), dtype=bool))[v] = True
+    for b in range(width):
+        if not ops[b]:
+            ops[b]["<"] = np.ones((len(tables), 1), dtype=bool)
+    return ops, values, points
+
+
+def _apply_bands(x, ops, thresholds, points, otherwise):
+    """First matching band per (variant, college); (V, N) points, `otherwise` where none match"""
+    result = np.empty((thresholds.shape[0], len(x)))
+    result[...] = otherwise
+    pending = np.ones(result.shape, dtype=bool)
+    for b, band_ops in enumerate(ops):
+        t = thresholds[:, b:b + 1]
+        # Always masked by rows: a variant only matches the bands it defines
+        hit = np.zeros(result.shape, dtype=bool)
+        for op, rows in band_ops.items():
+            hit |= rows & OPERATORS[op](x, t)
+        hit &= pending
+        result = np.where(hit, points[:, b:b + 1], result)
+        pending &= ~hit
+    return result
+
+
+class ScoringKernel:
+    """One or more rule tables compiled into parameter arrays for vectorized scoring.
+
+    score() evaluates every rule variant against every college in a single
+    numpy pass and returns a (variants x colleges) matrix. A single college is
+    just a one-row feature table. Additions happen in the same order as the
+    original calculate_score, so the default rule table reproduces it exactly.
+    """
+
+    def __init__(self, tables):
+        self.tables = list(tables)
+        self.versions = [rules.get("version") for rules in self.tables]
+
+        def column(key):
+            return np.array([[rules["score"][key]] for rules in self.tables], dtype=float)
+
+        self.base = column("base")
+        self.min = column("min")
+        self.max = column("max")
+        self.over_budget = column("over_budget_points")
+        self.government = column("government_points")
+        self.preferred_government = column("preferred_government_points")
+        self.location = column("location_points")
+        self.hostel_available = column("hostel_available_points")
+        self.hostel_missing = column("hostel_missing_points")
+        self.average_rating = column("average_rating")
+        self.rating_weight = column("rating_weight")
+        self.facilities_min_length = column("facilities_min_length")
+        self.facilities_points = column("facilities_points")
+        self.default_fee_bands = _compile_bands(self.tables, "default_fee_bands")
+        self.budget_bands = _compile_bands(self.tables, "budget_bands")
+        self.ratio_bands = _compile_bands(self.tables, "small_campus_ratio_bands")
+
+    @staticmethod
+    def location_mask(features, personalization):
+        """True for colleges whose city matches one of the preferred locations"""
+        preferences = personalization.locationPreference if personalization else None
+        if not preferences or "Any" in preferences:
+            return np.zeros(len(features["city_codes"]), dtype=bool)
+        matches = np.array([any(loc.lower() in city for loc in preferences) for city in features["cities"]], dtype=bool)
+        return matches[features["city_codes"]]
+
+    def score(self, features, personalization=None):
+        """(variants x colleges) score matrix for one personalization"""
+        fees = features["fees"]
+        has_fees = ~np.isnan(fees)
+        zeros = np.zeros((len(self.tables), len(fees)))
+
+        if personalization and personalization.maxBudget:
+            ops, values, points = self.budget_bands
+            fee_points = _apply_bands(fees, ops, personalization.maxBudget * values, points, self.over_budget)
+        else:
+            fee_points = _apply_bands(fees, *self.default_fee_bands, 0.0)
+        fee_points = np.where(has_fees, fee_points, 0.0)
+
+        preferred = personalization and personalization.prioritizeGovernmentCollege
+        government_points = np.where(features["is_government"], self.preferred_government if preferred else self.government, 0.0)
+
+        location_points = np.where(self.location_mask(features, personalization), self.location, 0.0)
+
+        hostel_points = zeros
+        if personalization and personalization.hostelRequired:
+            hostel_points = np.where(features["has_hostel"], self.hostel_available, self.hostel_missing)
+
+        ratio_points = zeros
+        if personalization and personalization.preferSmallCampus:
+            ratio = features["ratio"]
+            ratio_points = np.where(np.isnan(ratio), 0.0, _apply_bands(ratio, *self.ratio_bands, 0.0))
+
+        rating = features["rating"]
+        rating_points = np.where(np.isnan(rating), 0.0, (rating - self.average_rating) * self.rating_weight)
+        facilities_points = np.where(features["facilities_length"] > self.facilities_min_length, self.facilities_points, 0.0)
+
+        score = self.base + fee_points
+        score = score + government_points
+        score = score + location_points
+        score = score + hostel_points
+        score = score + ratio_points
+        score = score + rating_points
+        score = score + facilities_points
+        return np.maximum(self.min, np.minimum(self.max, score))
@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def candidate_mask(features, filters, max_fees=None, facilities=(), programs=(), cities=(), allow_unknown_fees=False):
+    """Boolean array over college ids meeting every hard constraint.
+
+    Facility and program requirements are an AND of the packed filter bitmaps;
+    the fee cap and city list are compared on the precomputed feature columns.
+    Cities match like the scoring's location preference (substring, any case).
+    """
+    mask = filters.mask(facilities, programs)
+    if max_fees is not None:
+        fees = features["fees"]
+        with np.errstate(invalid="ignore"):
+            within = fees <= max_fees
+        mask &= (within | np.isnan(fees)) if allow_unknown_fees else within
+    wanted = [city.strip().lower() for city in cities if city.strip()]
+    if wanted:
+        matches = np.array([any(city in name for city in wanted) for name in features["cities"]], dtype=bool)
+        mask &= matches[features["city_codes"]]
+    return mask
+
+
+def select(scores, groups, size, max_per_group=None):
+    """Positions of the best `size` scores, highest first, ties by position.
+
+    With max_per_group, at most that many positions of each group (e.g. city)
+    are kept. Taking the best remaining item that still fits is optimal for a
+    per-group cap, and it is done without a Python loop: each item's rank
+    within its group follows from a stable sort of the groups in score order.
+    """
+    order = np.argsort(-scores, kind="stable")
+    if max_per_group is not None and len(order):
+        ordered_groups = groups[order]
+        by_group = np.argsort(ordered_groups, kind="stable")
+        sorted_groups = ordered_groups[by_group]
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[by_group] = np.arange(len(order)) - np.searchsorted(sorted_groups, sorted_groups, side="left")
+        order = order[rank < max_per_group]
+    return order[:size]
@@ -0,0 +1,152 @@
+import numpy as np
+
+from features import (
+    facility_matrix, facility_vocabulary, hashed_course_matrix, is_government,
+    min_max, nan_to, student_faculty_ratio, unit_rows,
+)
+
+# Relative importance of each feature block in the distance
+DEFAULT_WEIGHTS = {
+    "fees": 1.0,
+    "ratio": 0.6,
+    "rating": 0.6,
+    "type": 0.8,
+    "facilities": 0.8,
+    "courses": 1.0,
+}
+
+
+class SimilarityIndex:
+    """Precomputed k-nearest-neighbour lists over normalized college features.
+
+    Every college becomes one weighted feature vector (scaled fees, student/faculty
+    ratio and rating, ownership type, facility set and hashed course set) and its
+    k closest colleges by Euclidean distance are stored, so a lookup is a single
+    row read. Distances are computed brute force in vectorized chunks.
+    """
+
+    def __init__(self, df, k=10, weights=None, course_dims=256, chunk_size=1024):
+        self.k = k
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.course_dims = course_dims
+        self.chunk_size = chunk_size
+        self._fit_scale(df)
+        self.vectors = self._vectorize(df)
+        self.neighbors, self.distances = self._knn(np.arange(len(df)))
+
+    def __getstate__(self):
+        # Vectors are cheap to rebuild from the DataFrame; keep the pickle small
+        state = self.__dict__.copy()
+        state["vectors"] = None
+        return state
+
+    def _fit_scale(self, df):
+        fees = np.log1p(df["Average Fees"].astype(float))
+        ratio = np.log1p(student_faculty_ratio(df))
+        rating = df["Rating"].astype(float)
+        self.scale = {}
+        for name, values in (("fees", fees), ("ratio", ratio), ("rating", rating)):
+            known = values.dropna()
+            if len(known):
+                self.scale[name] = (float(known.min()), float(known.max()), float(known.median()))
+            else:
+                self.scale[name] = (0.0, 1.0, 0.5)
+        self.facilities = facility_vocabulary(df)
+        w = self.weights
+        self.max_distance = float(np.sqrt(
+            w["fees"] ** 2 + w["ratio"] ** 2 + w["rating"] ** 2 + w["type"] ** 2
+            + 2 * w["facilities"] ** 2 + 2 * w["courses"] ** 2
+        ))
+
+    def _numeric(self, name, values):
+        low, high, median = self.scale[name]
+        return min_max(nan_to(values, median), low, high)
+
+    def _vectorize(self, df):
+        w = self.weights
+        fees = self._numeric("fees", np.log1p(df["Average Fees"].astype(float)))
+        ratio = self._numeric("ratio", np.log1p(student_faculty_ratio(df)))
+        rating = self._numeric("rating", df["Rating"].astype(float))
+        government = is_government(df).to_numpy(dtype=float)
+        blocks = [
+            np.column_stack([fees * w["fees"], ratio * w["ratio"], rating * w["rating"], government * w["type"]]),
+            unit_rows(facility_matrix(df, self.facilities).astype(np.float32)) * w["facilities"],
+            unit_rows(hashed_course_matrix(df, self.course_dims)) * w["courses"],
+        ]
+        return np.hstack(blocks).astype(np.float32)
+
+    def _squared_distances(self, rows, columns):
+        """Squared Euclidean distances between two sets of vectors"""
+        d = (
+            np.einsum("ij,ij->i", rows, rows)[:, None]
+            + np.einsum("ij,ij->i", columns, columns)[None, :]
+            - 2.0 * rows @ columns.T
+        )
+        return np.maximum(d, 0.0)
+
+    def _knn(self, ids):
+        """Nearest neighbour lists for the given row ids against every college"""
+        n = len(self.vectors)
+        k = min(self.k, max(n - 1, 0))
+        neighbors = np.full((len(ids), self.k), -1, dtype=np.int32)
+        distances = np.full((len(ids), self.k), np.inf, dtype=np.float32)
+        if k == 0:
+            return neighbors, distances
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = ids[start:start + self.chunk_size]
+            d = self._squared_distances(self.vectors[chunk], self.vectors)
+            d[np.arange(len(chunk)), chunk] = np.inf
+            top = np.argpartition(d, k - 1, axis=1)[:, :k]
+            top_d = np.take_along_axis(d, top, axis=1)
+            order = np.argsort(top_d, axis=1, kind="stable")
+            neighbors[start:start + len(chunk), :k] = np.take_along_axis(top, order, axis=1)
+            distances[start:start + len(chunk), :k] = np.sqrt(np.take_along_axis(top_d, order, axis=1))
+        return neighbors, distances
+
+    def update(self, df, ids):
+        """Refresh the index after the given colleges were added or changed.
+
+        Only the changed rows, and rows whose list referenced a changed college,
+        are recomputed in full; every other row just checks whether a changed
+        college now belongs in its list. The build-time scaling is kept as is.
+        """
+        ids = np.unique(np.asarray(list(ids), dtype=np.int64))
+        if len(ids) == 0:
+            return
+        old_n = len(self.neighbors)
+        if self.vectors is None or len(self.vectors) != old_n:
+            self.vectors = self._vectorize(df.iloc[:old_n])
+        if len(df) > old_n:
+            grow = len(df) - old_n
+            self.vectors = np.vstack([self.vectors, np.zeros((grow, self.vectors.shape[1]), dtype=np.float32)])
+            self.neighbors = np.vstack([self.neighbors, np.full((grow, self.k), -1, dtype=np.int32)])
+            self.distances = np.vstack([self.distances, np.full((grow, self.k), np.inf, dtype=np.float32)])
+        self.vectors[ids] = self._vectorize(df.iloc[ids])
+
+        stale = np.isin(self.neighbors, ids).any(axis=1) | (self.neighbors < 0).any(axis=1)
+        stale[ids] = True
+        recompute = np.flatnonzero(stale)
+        self.neighbors[recompute], self.distances[recompute] = self._knn(recompute)
+
+        others = np.flatnonzero(~stale)
+        if len(others) == 0:
+            return
+        d = np.sqrt(self._squared_distances(self.vectors[others], self.vectors[ids])).astype(np.float32)
+        closer = (d < self.distances[others, -1:]).any(axis=1)
+        rows = others[closer]
+        if len(rows) == 0:
+            return
+        merged_ids = np.hstack([self.neighbors[rows], np.broadcast_to(ids, (len(rows), len(ids)))])
+        merged_d = np.hstack([self.distances[rows], d[closer]])
+        order = np.argsort(merged_d, axis=1, kind="stable")[:, :self.k]
+        self.neighbors[rows] = np.take_along_axis(merged_ids, order, axis=1)
+        self.distances[rows] = np.take_along_axis(merged_d, order, axis=1)
+
+    def query(self, college_id, limit=10):
+        """Return [(college_id, similarity 0-1)] for the closest colleges"""
+        results = []
+        for neighbor, distance in zip(self.neighbors[college_id], self.distances[college_id]):
+            if neighbor < 0 or len(results) >= limit:
+                break
+            results.append((int(neighbor), round(1.0 - float(distance) / self.max_distance, 4)))
+        return results
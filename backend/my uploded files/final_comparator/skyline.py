@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# Skyline criteria and their direction: +1 = lower is better, -1 = higher is better
+CRITERIA = {
+    "fees": 1.0,
+    "rating": -1.0,
+    "ratio": 1.0,
+}
+
+
+def criteria_columns(df):
+    """Numeric skyline inputs per college; 0 counts as missing, like the API's scoring"""
+    def numbers(column):
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, copy=True)
+        values[values == 0] = np.nan
+        return values
+
+    students = numbers("Total Student Enrollments")
+    faculty = numbers("Total Faculty")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = students / faculty
+    return {"fees": numbers("Average Fees"), "rating": numbers("Rating"), "ratio": ratio}
+
+
+def _dominated(candidates, by):
+    """True for each candidate row that some row of `by` dominates (all <=, one <)"""
+    not_worse = np.ones((len(candidates), len(by)), dtype=bool)
+    better = np.zeros((len(candidates), len(by)), dtype=bool)
+    for column in range(candidates.shape[1]):
+        c, b = candidates[:, column][:, None], by[:, column][None, :]
+        not_worse &= b <= c
+        better |= b < c
+    return (not_worse & better).any(axis=1)
+
+
+def pareto_front(points, block_size=512, max_cells=2000000):
+    """Positions of the rows of points no other row dominates (every column minimised).
+
+    Sort-filter skyline with a stop rule (SaLSa). Rows must be sorted by their
+    smallest column value, ties by row sum; a row can then only be dominated by
+    rows before it, so each block is checked against the frontier found so far
+    and then against itself, and the survivors are final. Once the smallest
+    value of the next row exceeds the largest value of some frontier row, that
+    row dominates everything left and the scan stops.
+    """
+    row_min = points.min(axis=1)
+    frontier = np.empty((0, points.shape[1]))
+    stop = np.inf
+    kept = []
+    start = 0
+    end = len(points)
+    while start < end:
+        end = min(end, int(np.searchsorted(row_min, stop, side="right")))
+        step = max(64, min(block_size, max_cells // max(len(frontier), 1)))
+        block = points[start:min(start + step, end)]
+        positions = np.arange(start, start + len(block))
+        if len(frontier) and len(block):
+            alive = ~_dominated(block, frontier)
+            block, positions = block[alive], positions[alive]
+        if len(block) > 1:
+            alive = ~_dominated(block, block)
+            block, positions = block[alive], positions[alive]
+        if len(block):
+            frontier = np.vstack([frontier, block])
+            kept.extend(positions.tolist())
+            stop = min(stop, block.max(axis=1).min())
+        start += step
+    return np.array(kept, dtype=np.int64)
+
+
+class SkylineIndex:
+    """Pareto frontier ("best trade-off") queries over fees, rating and student/faculty ratio.
+
+    Criteria columns are precomputed once. The scaled, sorted points for each
+    criteria combination are computed on first use and cached, so a filtered
+    query only selects rows from an already sorted order. Unfiltered frontiers
+    are cached as well.
+    """
+
+    def __init__(self, df):
+        self.columns = criteria_columns(df)
+        self.cities = df["City"].map(str).str.strip().str.lower().to_numpy()
+        self.types = df["College Type"].map(str).str.strip().str.lower().to_numpy()
+        self._orders = {}
+        self._frontiers = {}
+        self._codes = {}
+        self.warm()
+
+    def warm(self):
+        """Precompute the default sort order and filter codes so first queries are fast"""
+        self._order(tuple(CRITERIA))
+        self._matching("cities", bool)
+        self._matching("types", bool)
+
+    def _matching(self, name, predicate):
+        """Mask of colleges whose city/type satisfies predicate, tested once per distinct value"""
+        if name not in self._codes:
+            self._codes[name] = pd.factorize(getattr(self, name))
+        codes, distinct = self._codes[name]
+        return np.array([predicate(value) for value in distinct], dtype=bool)[codes]
+
+    def update(self, df, ids):
+        ids = sorted(set(ids))
+        changed = df.iloc[ids]
+        grow = len(df) - len(self.cities)
+        if grow > 0:
+            for name in self.columns:
+                self.columns[name] = np.concatenate([self.columns[name], np.full(grow, np.nan)])
+            self.cities = np.concatenate([self.cities, np.full(grow, "", dtype=object)])
+            self.types = np.concatenate([self.types, np.full(grow, "", dtype=object)])
+        for name, values in criteria_columns(changed).items():
+            self.columns[name][ids] = values
+        self.cities[ids] = changed["City"].map(str).str.strip().str.lower().to_numpy()
+        self.types[ids] = changed["College Type"].map(str).str.strip().str.lower().to_numpy()
+        self._orders = {}
+        self._frontiers = {}
+        self._codes = {}
+        self.warm()
+
+    def _order(self, criteria):
+        """Colleges with every criterion known in pareto_front() order, with their
+        min-max scaled points (scaling keeps dominance and makes the stop rule bite)"""
+        if criteria not in self._orders:
+            points = np.column_stack([self.columns[name] * CRITERIA[name] for name in criteria])
+            complete = np.flatnonzero(~np.isnan(points).any(axis=1))
+            values = points[complete]
+            low, high = values.min(axis=0, initial=0.0), values.max(axis=0, initial=0.0)
+            scaled = (values - low) / np.where(high > low, high - low, 1.0)
+            order = np.lexsort((scaled.sum(axis=1), scaled.min(axis=1)))
+            self._orders[criteria] = (complete[order], scaled[order])
+        return self._orders[criteria]
+
+    def frontier(self, criteria=tuple(CRITERIA), city=None, college_type=None):
+        """Return (frontier college ids, colleges considered, colleges skipped for missing values)"""
+        criteria = tuple(criteria)
+        order, scaled = self._order(criteria)
+        mask = None
+        if city:
+            mask = self._matching("cities", lambda value: value == city.strip().lower())
+        if college_type:
+            # "government" matches "Public/Government"
+            type_mask = self._matching("types", lambda value: college_type.strip().lower() in value)
+            mask = type_mask if mask is None else mask & type_mask
+        matching = len(self.cities) if mask is None else int(mask.sum())
+
+        if mask is None:
+            if criteria not in self._frontiers:
+                self._frontiers[criteria] = order[pareto_front(scaled)]
+            ids = self._frontiers[criteria]
+            considered = len(order)
+        else:
+            selected = mask[order]
+            ids = order[selected][pareto_front(scaled[selected])]
+            considered = int(selected.sum())
+        return ids, considered, matching - considered
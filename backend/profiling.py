@@ -0,0 +1,125 @@
+"""
+Opt-in per-request profiling: named timing spans, Server-Timing output and
+an in-memory ring buffer of slow request samples. Also records how long each
+startup phase of the process took
+"""
+import contextvars
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Fraction of requests profiled without the header (0.0 - 1.0)
+SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Sampled requests slower than this are kept in the ring buffer
+SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_MS", "100"))
+BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "200"))
+PROFILE_HEADER = "x-profile"
+
+_current_profile: contextvars.ContextVar = contextvars.ContextVar("request_profile", default=None)
+_samples: deque = deque(maxlen=BUFFER_SIZE)
+# Startup phase -> milliseconds, in the order the phases ran
+_startup_phases: Dict[str, float] = {}
+
+
+class RequestProfile:
+    """Accumulated span timings for one request"""
+
+    def __init__(self, method: str, path: str, forced: bool):
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.total_ms: Optional[float] = None
+
+    def add(self, name: str, elapsed_ms: float):
+        self.spans[name] = self.spans.get(name, 0.0) + elapsed_ms
+
+    def finish(self) -> float:
+        self.total_ms = (time.perf_counter() - self.start) * 1000
+        return self.total_ms
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, readable in browser dev tools"""
+        parts = [f"{name};dur={ms:.3f}" for name, ms in self.spans.items()]
+        parts.append(f"total;dur={self.total_ms:.3f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "forced": self.forced,
+            "timestamp": self.started_at,
+            "total_ms": round(self.total_ms, 3),
+            "spans_ms": {name: round(ms, 3) for name, ms in self.spans.items()},
+            "unaccounted_ms": round(self.total_ms - sum(self.spans.values()), 3)
+        }
+
+
+def should_profile(headers) -> Optional[bool]:
+    """True if forced by header, False if sampled, None if the request is not profiled"""
+    if headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        return False
+    return None
+
+
+def start_profile(method: str, path: str, forced: bool) -> RequestProfile:
+    profile = RequestProfile(method, path, forced)
+    _current_profile.set(profile)
+    return profile
+
+
+def finish_profile(profile: RequestProfile):
+    """Close the profile and keep it if it was requested explicitly or was slow"""
+    total_ms = profile.finish()
+    if profile.forced or total_ms >= SLOW_REQUEST_MS:
+        _samples.append(profile.to_dict())
+
+
+@contextmanager
+def span(name: str):
+    """Time a named phase of the current request; a no-op unless it is profiled"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, (time.perf_counter() - start) * 1000)
+
+
+def recent_samples(limit: int = 50) -> List[Dict[str, Any]]:
+    """Newest stored samples first"""
+    return list(reversed(_samples))[:limit]
+
+
+def clear_samples():
+    _samples.clear()
+
+
+def record_startup_phase(name: str, elapsed_ms: float):
+    _startup_phases[name] = _startup_phases.get(name, 0.0) + elapsed_ms
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Time one phase of process startup (imports, unpickle, index build, warmup)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_startup_phase(name, (time.perf_counter() - start) * 1000)
+
+
+def startup_report() -> Dict[str, Any]:
+    phases = {name: round(ms, 3) for name, ms in _startup_phases.items()}
+    return {"phases_ms": phases, "total_ms": round(sum(phases.values()), 3)}
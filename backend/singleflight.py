@@ -0,0 +1,53 @@
+"""
+In-process request coalescing ("single flight"): identical calls that arrive
+while one is already running wait for that computation instead of starting
+their own
+"""
+import asyncio
+import os
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """Share one in-flight computation and its result (or error) between identical keys.
+
+    The computation runs in the thread pool as its own task, so the event loop
+    stays free to accept the duplicate requests, and a caller that disconnects
+    does not cancel the work other callers are waiting on. Nothing is cached:
+    the key is released as soon as the computation finishes.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key) if self.enabled else None
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(run_in_threadpool(fn, *args))
+            if self.enabled:
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.calls - self.executions,
+            "in_flight": len(self._inflight)
+        }
+
+
+coalescer = SingleFlight(enabled=os.getenv("COALESCE_REQUESTS", "1") != "0")
@@ -0,0 +1,141 @@
+"""
+AdmissionController driven directly with a tiny limit and queue, and the
+503 it sheds with: CORS headers included, so the browser frontend sees the
+status and Retry-After
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from admission import AdmissionController, RequestClass, Shed, admission
+
+ORIGIN = "http://localhost:3000"
+
+
+def test_shed_response_carries_cors_headers(monkeypatch):
+    async def shed(request_class, deadline):
+        raise Shed("queue_full", 3)
+
+    monkeypatch.setattr(admission, "acquire", shed)
+    response = TestClient(main.app).get("/api/colleges/list", headers={"Origin": ORIGIN})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert "Retry-After" in response.headers["access-control-expose-headers"]
+
+
+def controller(limit=1, queue_size=2):
+    classes = {"high": RequestClass("high", 0, 1000), "low": RequestClass("low", 2, 1000)}
+    return AdmissionController(limit, queue_size, classes), classes["high"], classes["low"]
+
+
+async def queued(gate, request_class, deadline_s=1.0):
+    """Start an acquire that has to wait, and return its task once it is queued"""
+    task = asyncio.ensure_future(gate.acquire(request_class, asyncio.get_running_loop().time() + deadline_s))
+    await asyncio.sleep(0)
+    assert not task.done()
+    return task
+
+
+def test_waiters_are_admitted_by_priority():
+    async def scenario():
+        gate, high, low = controller()
+        await gate.acquire(low, asyncio.get_running_loop().time() + 1)
+        later_low = await queued(gate, low)
+        first_high = await queued(gate, high)
+        assert gate.stats()["queue_depth"] == 2
+
+        gate.release()
+        await first_high
+        assert not later_low.done()
+        gate.release()
+        await later_low
+        gate.release()
+        return gate.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+    assert stats["classes"]["high"]["admitted"] == 1
+    assert stats["classes"]["low"]["admitted"] == 2
+
+
+def test_request_that_cannot_start_by_its_deadline_is_shed_at_once():
+    async def scenario():
+        gate, high, low = controller()
+        low.service_ms = 200
+        await gate.acquire(high, asyncio.get_running_loop().time() + 1)
+        with pytest.raises(Shed) as shed:
+            await gate.acquire(low, asyncio.get_running_loop().time() + 0.1)
+        return gate.stats(), shed.value
+
+    stats, shed = asyncio.run(scenario())
+    assert shed.reason == "deadline" and shed.retry_after >= 1
+    assert stats["classes"]["low"]["shed"] == {"queue_full": 0, "evicted": 0, "deadline": 1, "timeout": 0}
+    assert stats["queue_depth"] == 0 and stats["active"] == 1
+
+
+def test_full_queue_rejects_same_or_lower_priority():
+    async def scenario():
+        gate, high, low = controller(queue_size=1)
+        await gate.acquire(high, asyncio.get_running_loop().time() + 1)
+        waiting = await queued(gate, high)
+        reasons = []
+        for request_class in (high, low):
+            with pytest.raises(Shed) as shed:
+                await gate.acquire(request_class, asyncio.get_running_loop().time() + 1)
+            reasons.append(shed.value.reason)
+        gate.release()
+        await waiting
+        return gate.stats(), reasons
+
+    stats, reasons = asyncio.run(scenario())
+    assert reasons == ["queue_full", "queue_full"]
+    assert stats["classes"]["high"]["shed"]["queue_full"] == 1
+    assert stats["classes"]["low"]["shed"]["queue_full"] == 1
+    assert stats["classes"]["high"]["admitted"] == 2
+
+
+def test_higher_priority_evicts_the_newest_lower_priority_waiter():
+    async def scenario():
+        gate, high, low = controller(queue_size=2)
+        await gate.acquire(high, asyncio.get_running_loop().time() + 1)
+        older = await queued(gate, low)
+        newer = await queued(gate, low)
+        urgent = await queued(gate, high)
+        with pytest.raises(Shed) as evicted:
+            await newer
+        assert not older.done()
+
+        gate.release()
+        await urgent
+        assert not older.done()
+        gate.release()
+        await older
+        return gate.stats(), evicted.value
+
+    stats, evicted = asyncio.run(scenario())
+    assert evicted.reason == "evicted"
+    assert stats["classes"]["low"]["shed"]["evicted"] == 1
+    assert stats["classes"]["low"]["admitted"] == 1 and stats["classes"]["high"]["admitted"] == 2
+    assert stats["queue_depth"] == 0 and stats["active"] == 1
+
+
+def test_waiter_whose_deadline_passes_in_the_queue_times_out():
+    async def scenario():
+        gate, high, low = controller()
+        await gate.acquire(high, asyncio.get_running_loop().time() + 1)
+        waiting = await queued(gate, low, deadline_s=0.1)
+        with pytest.raises(Shed) as timed_out:
+            await waiting
+        during = gate.stats()
+        gate.release()
+        return during, gate.stats(), timed_out.value
+
+    during, after, timed_out = asyncio.run(scenario())
+    assert timed_out.reason == "timeout"
+    assert during["classes"]["low"]["shed"]["timeout"] == 1
+    assert during["queue_depth"] == 0 and during["active"] == 1
+    # The slot is not handed to the timed-out waiter
+    assert after["active"] == 0 and after["classes"]["low"]["admitted"] == 0
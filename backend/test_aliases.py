@@ -0,0 +1,26 @@
+"""
+Name resolution: exact names, acronyms and possessive names
+"""
+def test_every_exact_name_resolves_to_itself(model):
+    for college_id, name in enumerate(model.df["College Name"]):
+        college = model.find_college(name)
+        assert college is not None, name
+        # Duplicate names resolve to their first college, like the substring search did
+        first = model.df.index[model.df["name_clean"] == name.lower().strip()][0]
+        assert college.name == first, name
+
+
+def test_possessive_names_stay_apart(model):
+    assert model.find_college("Bharati Vidyapeeth's College of Engineering")["City"] == "Lavale"
+    assert model.find_college("Bharati Vidyapeeth College of Engineering")["City"] == "Navi Mumbai"
+    assert model.find_college("kit's")["College Name"] == "KIT's College of Engineering"
+
+
+def test_acronyms_still_resolve(model):
+    assert model.find_college("ict")["College Name"] == "Institute of Chemical Technology"
+    assert model.find_college("kits")["College Name"] == "Kavikulguru Institute of Technology and Science"
+
+
+def test_renamed_college_resolves_by_new_name(model):
+    model.upsert_college({"College Name": "Renamed Test College"}, college_id=5)
+    assert model.find_college("Renamed Test College").name == 5
@@ -0,0 +1,330 @@
+"""
+API regressions, run in-process against the bundled model
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).parent / "my uploded files" / "final_comparator"))
+
+import main
+
+# Colleges whose University cell is empty (NaN) in the dataset
+NAN_UNIVERSITY = ["Institute of Chemical Technology", "Savitribai Phule Pune University"]
+
+
+@pytest.fixture(scope="module")
+def client():
+    if main.default_dataset() is None:
+        main.load_model()
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("name", NAN_UNIVERSITY)
+def test_search_college_with_missing_university(client, name):
+    response = client.post("/api/colleges/search", json={"query": name})
+    assert response.status_code == 200
+    college = response.json()["college"]
+    assert college["name"] == name
+    assert college["university"] is None
+
+
+@pytest.mark.parametrize("name", NAN_UNIVERSITY)
+def test_cached_search_revalidates_with_etag(client, name):
+    response = client.get("/api/colleges/search", params={"query": name})
+    assert response.status_code == 200
+    assert response.json()["college"]["university"] is None
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+
+    revalidated = client.get("/api/colleges/search", params={"query": name}, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+
+def test_autocomplete_socket_follows_model_reload(client):
+    current = main.default_dataset()
+    renamed, _ = current.model.derive(pd.DataFrame({"College Name": {1: "Zzqx Reloaded Institute"}}))
+    try:
+        with client.websocket_connect("/api/colleges/autocomplete/ws") as socket:
+            socket.send_json({"id": 1, "query": "zzqx"})
+            assert socket.receive_json()["count"] == 0
+            # What /api/reload-model does: the default dataset is replaced
+            main.datasets[main.DEFAULT_DATASET] = main.Dataset(main.DEFAULT_DATASET, renamed)
+            socket.send_json({"id": 2, "query": "zzqx"})
+            reply = socket.receive_json()
+            assert [suggestion["name"] for suggestion in reply["suggestions"]] == ["Zzqx Reloaded Institute"]
+    finally:
+        main.datasets[main.DEFAULT_DATASET] = current
+
+
+def test_autocomplete_socket_matches_http(client):
+    queries = ["vi", "vid", "vidy", "vid", "pu", "pune", "institute of t", "institute of te", "college", "zz", "ab"]
+    with client.websocket_connect("/api/colleges/autocomplete/ws") as socket:
+        for position, query in enumerate(queries):
+            socket.send_json({"id": position, "query": query, "limit": 10})
+            reply = socket.receive_json()
+            expected = client.get("/api/colleges/autocomplete", params={"query": query, "limit": 10}).json()
+            assert reply["id"] == position
+            assert reply["suggestions"] == expected["suggestions"]
+
+
+class RawSocket:
+    """The app's autocomplete socket driven on the caller's event loop, with timeouts"""
+
+    def __init__(self):
+        self.inbox, self.outbox = asyncio.Queue(), asyncio.Queue()
+        scope = {"type": "websocket", "path": "/api/colleges/autocomplete/ws", "raw_path": b"/api/colleges/autocomplete/ws",
+                 "query_string": b"", "headers": [], "scheme": "ws", "server": ("test", 80), "client": ("test", 1),
+                 "root_path": "", "subprotocols": []}
+        self.task = asyncio.ensure_future(main.app(scope, self.inbox.get, self.outbox.put))
+
+    async def __aenter__(self):
+        await self.inbox.put({"type": "websocket.connect"})
+        assert (await asyncio.wait_for(self.outbox.get(), 5))["type"] == "websocket.accept"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.inbox.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self.task, 5)
+
+    async def send(self, message):
+        await self.inbox.put({"type": "websocket.receive", "text": json.dumps(message)})
+
+    async def receive(self):
+        return json.loads((await asyncio.wait_for(self.outbox.get(), 5))["text"])
+
+
+def test_autocomplete_socket_does_not_block_the_event_loop(client):
+    held, release = threading.Event(), threading.Event()
+
+    def hold_model_lock():
+        with main.model_lock:
+            held.set()
+            release.wait(1)
+
+    async def scenario():
+        async with RawSocket() as socket:
+            await socket.send({"id": 1, "query": "pune"})
+            started = time.perf_counter()
+            await asyncio.sleep(0.05)
+            stalled = time.perf_counter() - started
+            release.set()
+            assert (await socket.receive())["id"] == 1
+        return stalled
+
+    holder = threading.Thread(target=hold_model_lock)
+    holder.start()
+    held.wait(5)
+    try:
+        # A step run on the loop would stall it until the lock is released (1 s)
+        assert asyncio.run(scenario()) < 0.5
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_autocomplete_socket_reports_step_errors(client, monkeypatch):
+    def fail(ds, session, message):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        async with RawSocket() as socket:
+            monkeypatch.setattr(main, "autocomplete_step", fail)
+            await socket.send({"id": 1, "query": "pune"})
+            reply = await socket.receive()
+            assert reply["success"] is False and reply["id"] == 1
+            monkeypatch.undo()
+            await socket.send({"id": 2, "query": "pune"})
+            assert (await socket.receive())["success"] is True
+
+    asyncio.run(scenario())
+
+
+ADMIN = {"X-Admin-Token": "test-admin-token"}
+
+
+@pytest.fixture
+def scratch_dataset(client, monkeypatch):
+    """A throwaway dataset to add and update colleges in, with college edits enabled"""
+    monkeypatch.setattr(main, "ADMIN_TOKEN", ADMIN["X-Admin-Token"])
+    main.datasets["scratch"] = main.Dataset("scratch", main.default_dataset().model.derive(pd.DataFrame())[0])
+    yield "scratch"
+    main.datasets.pop("scratch", None)
+
+
+def test_college_edits_need_the_admin_token(client, scratch_dataset, monkeypatch):
+    fields = {"College Name": "Token Test College", "City": "Pune", "College Type": "Private"}
+    for headers in ({}, {"X-Admin-Token": "wrong"}):
+        assert client.post("/api/colleges", params={"dataset": scratch_dataset}, json={"fields": fields}, headers=headers).status_code == 403
+        assert client.put("/api/colleges/3", params={"dataset": scratch_dataset}, json={"fields": {"Rating": 1}}, headers=headers).status_code == 403
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    assert client.post("/api/colleges", params={"dataset": scratch_dataset}, json={"fields": fields}, headers=ADMIN).status_code == 403
+    assert len(main.datasets[scratch_dataset].model.df) == len(main.default_dataset().model.df)
+
+
+def test_add_college_requires_core_fields(client, scratch_dataset):
+    partial = {"College Name": "Partial Test College", "City": "Pune"}
+    response = client.post("/api/colleges", params={"dataset": scratch_dataset}, json={"fields": partial}, headers=ADMIN)
+    assert response.status_code == 422
+    assert "College Type" in response.json()["detail"]
+
+    complete = dict(partial, **{"College Type": "Private", "Average Fees": "125000"})
+    response = client.post("/api/colleges", params={"dataset": scratch_dataset}, json={"fields": complete}, headers=ADMIN)
+    assert response.status_code == 200
+    assert response.json()["college"]["type"] == "Private"
+    assert main.datasets[scratch_dataset].model.df["Average Fees"].iloc[-1] == 125000
+
+
+def test_update_college_cannot_clear_core_fields(client, scratch_dataset):
+    response = client.put("/api/colleges/3", params={"dataset": scratch_dataset}, json={"fields": {"College Type": ""}}, headers=ADMIN)
+    assert response.status_code == 422
+    assert main.datasets[scratch_dataset].model.df.loc[3, "College Type"] == main.default_dataset().model.df.loc[3, "College Type"]
+
+
+@pytest.mark.parametrize("fields", [
+    {"Average Fees": "abc"},
+    {"Rating": True},
+    {"Rating": "inf"},
+    {"City": 411001},
+    {"Not A Column": "x"},
+])
+def test_invalid_college_values_are_rejected_without_changes(client, scratch_dataset, fields):
+    model = main.datasets[scratch_dataset].model
+    before = model.df.copy(deep=True)
+    new = dict({"College Name": "Invalid Value College", "City": "Pune", "College Type": "Private"}, **fields)
+    response = client.post("/api/colleges", params={"dataset": scratch_dataset}, json={"fields": new}, headers=ADMIN)
+    assert response.status_code == 422
+    response = client.put("/api/colleges/3", params={"dataset": scratch_dataset}, json={"fields": fields}, headers=ADMIN)
+    assert response.status_code == 422
+    pd.testing.assert_frame_equal(model.df, before)
+
+
+def test_failed_index_refresh_leaves_the_model_unchanged(client, scratch_dataset, monkeypatch):
+    model = main.datasets[scratch_dataset].model
+    model.build_indexes()
+    before = model.df.copy(deep=True)
+    expected = model.similar_colleges(3)
+
+    def fail(*args):
+        raise RuntimeError("index update failed")
+    monkeypatch.setattr(type(model.skyline), "update", fail)
+    fields = {"College Name": "Rollback Test College", "City": "Pune", "College Type": "Private", "Rating": 5.0}
+    assert client.post("/api/colleges", params={"dataset": scratch_dataset}, json={"fields": fields}, headers=ADMIN).status_code == 500
+    # Indexes the failed update touched are dropped; build them again to fail the next one too
+    model.build_indexes()
+    assert client.put("/api/colleges/3", params={"dataset": scratch_dataset}, json={"fields": {"Rating": 0.5}}, headers=ADMIN).status_code == 500
+    pd.testing.assert_frame_equal(model.df, before)
+    monkeypatch.undo()
+    assert model.find_college("Rollback Test College") is None
+    assert model.similar_colleges(3) == expected
+
+
+def test_similar_colleges_follow_upserts(client, scratch_dataset):
+    model = main.datasets[scratch_dataset].model
+    clone = model.df.loc[3].drop(["name_clean", "location"]).to_dict()
+    fields = {column: main.safe_value(value) for column, value in clone.items()}
+    fields["College Name"] = "Similar Clone College"
+    response = client.post("/api/colleges", params={"dataset": scratch_dataset}, json={"fields": fields}, headers=ADMIN)
+    assert response.status_code == 200
+    clone_id = response.json()["college"]["id"]
+
+    body = client.get("/api/colleges/3/similar", params={"dataset": scratch_dataset, "limit": 5}).json()
+    assert body["college"]["id"] == 3 and body["count"] == 5
+    assert [(entry["id"], entry["similarity"]) for entry in body["similar"]] == model.similar_colleges(3, 5)
+    assert body["similar"][0]["id"] == clone_id and body["similar"][0]["similarity"] == 1.0
+    assert body["similar"][0]["name"] == "Similar Clone College"
+    # The served dataset is untouched
+    default = client.get("/api/colleges/3/similar", params={"limit": 5}).json()
+    assert clone_id not in [entry["id"] for entry in default["similar"]]
+    assert client.get(f"/api/colleges/{clone_id + 1}/similar", params={"dataset": scratch_dataset}).status_code == 404
+
+
+def test_building_bases_keeps_a_college_updated_meanwhile(client, scratch_dataset, monkeypatch):
+    ds = main.datasets[scratch_dataset]
+    build = main.build_college_base
+    responses = []
+
+    def build_then_update(college_data):
+        # A write lands while the first base is being built (the write builds a base too)
+        if not responses:
+            responses.append(None)
+            responses[0] = client.put("/api/colleges/5", params={"dataset": scratch_dataset},
+                                      json={"fields": {"Average Fees": 5000}}, headers=ADMIN)
+        return build(college_data)
+    monkeypatch.setattr(main, "build_college_base", build_then_update)
+    main.build_college_bases(ds)
+    monkeypatch.undo()
+
+    assert responses[0].status_code == 200
+    assert len(ds.college_bases) == len(ds.model.df)
+    assert ds.college_bases[5]["fees"] == 5000 and "Affordable fees" in ds.college_bases[5]["fee_strengths"]
+    assert main.get_score_features(ds)["fees"][5] == 5000
+
+
+@pytest.mark.parametrize("body, detail", [
+    ({"size": 0}, "size"),
+    ({"size": -5}, "size"),
+    ({"maxPerCity": 0}, "maxPerCity"),
+])
+def test_shortlist_rejects_empty_limits(client, body, detail):
+    response = client.post("/api/colleges/shortlist", json=body)
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+
+def test_shortlist_size_is_capped_by_the_catalogue(client):
+    body = client.post("/api/colleges/shortlist", json={"size": 1}).json()
+    assert body["count"] == 1
+    body = client.post("/api/colleges/shortlist", json={"size": 100_000}).json()
+    assert body["count"] == body["considered"] == body["total"]
+
+
+def test_ready_only_after_the_background_load(monkeypatch):
+    load_model = main.load_model
+    release = threading.Event()
+
+    def held_load():
+        release.wait(10)
+        load_model()
+    monkeypatch.setattr(main, "load_model", held_load)
+    monkeypatch.setattr(main, "model_status", "starting")
+
+    with TestClient(main.app) as starting:
+        assert starting.get("/health").status_code == 200
+        response = starting.get("/ready")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert response.json() == {"ready": False, "model_status": "starting", "warm": main.model_warm}
+
+        release.set()
+        deadline = time.monotonic() + 30
+        while starting.get("/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert starting.get("/ready").json()["ready"] is True
+        assert starting.get("/api/colleges/autocomplete", params={"query": "vjt"}).status_code == 200
+        # Let warm_up() finish before other tests use the reloaded model
+        while not main.model_warm and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert main.model_warm
+
+
+def test_snapshot_goes_stale_when_index_code_changes(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "SNAPSHOT_PATH", tmp_path / "warm.pkl")
+    main.save_snapshot()
+    assert main.load_snapshot() is not None
+
+    # Point the skyline module at an edited copy of its source
+    skyline = sys.modules["skyline"]
+    edited = tmp_path / "skyline.py"
+    edited.write_text(Path(skyline.__file__).read_text() + "\n# changed\n")
+    monkeypatch.setattr(skyline, "__file__", str(edited))
+    assert main.load_snapshot() is None
@@ -0,0 +1,44 @@
+"""
+The batch CLI's results must equal what POST /api/colleges/compare returns
+"""
+import json
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).parent / "my uploded files" / "final_comparator"))
+
+import batch_compare
+import main
+
+PERSONALIZATION = {"category": "OBC", "gender": "Female", "domicile": "Maharashtra", "maxBudget": 300000, "hostelRequired": True}
+# The pairs from the module docstring, plus one that cannot resolve
+LINES = [
+    "VJTI\tICT",
+    json.dumps({"colleges": ["PICT", "SPCE"], "personalization": PERSONALIZATION}),
+    "Veermata Jijabai Technological Institute\tNo Such College",
+]
+
+
+def test_cli_output_matches_compare_endpoint(tmp_path):
+    pairs = tmp_path / "pairs.txt"
+    pairs.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+    stdout = sys.stdout
+    try:
+        assert batch_compare.run(batch_compare.parse_args([str(pairs), "-o", str(output), "--workers", "1", "--quiet"])) == 0
+    finally:
+        sys.stdout = stdout
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [record["line"] for record in records] == [1, 2, 3]
+
+    client = TestClient(main.app)
+    for record, line in zip(records[:2], LINES):
+        body = batch_compare.parse_line(line).model_dump()
+        response = client.post("/api/colleges/compare", json=body)
+        assert response.status_code == 200
+        assert "error" not in record
+        assert record["result"] == response.json()
+    assert records[2]["error"] == "One or both colleges not found"
+    assert client.post("/api/colleges/compare", json={"colleges": LINES[2].split("\t")}).status_code == 404
@@ -0,0 +1,98 @@
+"""
+Content negotiation of compressed responses and ?fields= projection
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).parent / "my uploded files" / "final_comparator"))
+
+import compression
+import main
+from compression import accepted_encodings, brotli, choose_encoding
+
+LIST_URL = "/api/colleges/list?limit=200"
+
+
+@pytest.fixture(scope="module")
+def client():
+    if main.default_dataset() is None:
+        main.load_model()
+    return TestClient(main.app)
+
+
+def test_accepted_encodings_reads_q_values():
+    assert accepted_encodings("gzip, br;q=0.5, deflate;q=bad, *;q=0") == {"gzip": 1.0, "br": 0.5, "deflate": 0.0, "*": 0.0}
+
+
+@pytest.mark.parametrize("header, with_brotli, without_brotli", [
+    ("gzip, deflate, br", "br", "gzip"),
+    ("gzip;q=1.0, br;q=0.5", "gzip", "gzip"),
+    ("br", "br", None),
+    ("*", "br", "gzip"),
+    ("gzip;q=0, *", "br", None),
+    ("identity", None, None),
+    ("br;q=0, gzip;q=0", None, None),
+])
+def test_choose_encoding(monkeypatch, header, with_brotli, without_brotli):
+    if brotli is not None:
+        assert choose_encoding(header) == with_brotli
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(header) == without_brotli
+
+
+def test_gzip_response(client):
+    plain = client.get(LIST_URL, headers={"Accept-Encoding": "identity"})
+    response = client.get(LIST_URL, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # httpx decodes the body; the raw size is the compressed one
+    assert int(response.headers["content-length"]) < len(plain.content)
+    assert response.content == plain.content
+    assert response.headers["etag"] == "W/" + plain.headers["etag"]
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_brotli_preferred_when_accepted(client):
+    response = client.get(LIST_URL, headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json()["success"] is True
+
+
+def test_identity_response_still_varies(client):
+    response = client.get(LIST_URL, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert not response.headers["etag"].startswith("W/")
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_not_modified_passes_through(client):
+    etag = client.get(LIST_URL, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get(LIST_URL, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+
+
+def test_fields_projection(client):
+    colleges = client.get(LIST_URL + "&fields=name,fees").json()["colleges"]
+    assert colleges and all(set(college) == {"id", "name", "fees"} for college in colleges)
+
+
+@pytest.mark.parametrize("method, url, body", [
+    ("GET", LIST_URL + "&fields=name,password", None),
+    ("GET", "/api/colleges/search?query=VJTI&fields=rank", None),
+    ("POST", "/api/colleges/search?fields=name,,bogus", {"query": "VJTI"}),
+    ("POST", "/api/colleges/compare?fields=score,nope", {"colleges": ["VJTI", "ICT"]}),
+])
+def test_unknown_fields_are_rejected(client, method, url, body):
+    response = client.request(method, url, json=body)
+    assert response.status_code == 400
+    assert "Unknown fields" in response.json()["detail"]
@@ -0,0 +1,43 @@
+"""
+Course index: the postings codec round-trips, and incremental updates rank
+like a freshly built index
+"""
+import numpy as np
+import pytest
+
+from course_index import CourseIndex, decode_ids, encode_ids, tokenize
+
+QUERIES = ["computer engineering", "mba", "mechanical", "civil engineering", "quantum widgets", "phd", "b.tech"]
+
+
+@pytest.mark.parametrize("ids", [
+    [],
+    [0],
+    [127, 128],
+    [0, 1, 2, 3, 300, 16383, 16384, 2 ** 21, 2 ** 40],
+    sorted(np.random.default_rng(0).choice(10 ** 6, 500, replace=False).tolist()),
+])
+def test_postings_round_trip(ids):
+    decoded = decode_ids(encode_ids(ids))
+    assert decoded.dtype == np.int64
+    assert decoded.tolist() == ids
+
+
+def course_scores(index, query):
+    course_ids, scores = index.search_courses(query)
+    return {" ".join(tokenize(index.course_names[c])): round(s, 9) for c, s in zip(course_ids.tolist(), scores.tolist())}
+
+
+def test_incremental_update_matches_rebuild(model):
+    model.courses
+    offered = model.df["Courses"]
+    # Drop every course of college 0 (some offered nowhere else), add new ones
+    model.upsert_college({"Courses": "B.Tech Quantum Widgets, M.Tech Computer Engineering"}, college_id=0)
+    model.upsert_college({"Courses": "B.Tech Quantum Widgets, MBA"}, college_id=3)
+    model.upsert_college({"College Name": "Course Test College", "City": "Pune", "Courses": "PhD Quantum Widgets, " + offered[5]})
+    rebuilt = CourseIndex(model.df)
+    for query in QUERIES:
+        assert course_scores(model.courses, query) == course_scores(rebuilt, query), query
+        updated = [(college_id, score) for college_id, score, _ in model.courses.search(query, 30)]
+        expected = [(college_id, score) for college_id, score, _ in rebuilt.search(query, 30)]
+        assert updated == expected, query
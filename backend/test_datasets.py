@@ -0,0 +1,57 @@
+"""
+Derived dataset snapshots: shared columns and indexes never carry an edit
+from one snapshot into the other
+"""
+import pandas as pd
+
+from course_index import CourseIndex
+
+
+def snapshot_2024(model):
+    model.build_indexes()
+    changes = pd.DataFrame({"Average Fees": model.df["Average Fees"].iloc[::2] * 0.92})
+    return model.derive(changes)
+
+
+def test_upserts_leave_the_other_snapshot_unchanged(model):
+    base_df = model.df.copy(deep=True)
+    snapshot, changed = snapshot_2024(model)
+    assert changed == ["Average Fees"]
+    snapshot_df = snapshot.df.copy(deep=True)
+
+    snapshot.upsert_college({"College Name": "Overlay Renamed", "Rating": 4.9, "Facilities": "Gym"}, college_id=3)
+    snapshot.upsert_college({"College Name": "Overlay Only College", "City": "Pune", "College Type": "Private"})
+    pd.testing.assert_frame_equal(model.df, base_df)
+    assert model.find_college("Overlay Renamed") is None
+    assert model.filters.mask(["gym"])[3] == base_df["Facilities"].str.contains("Gym", na=False).iloc[3]
+
+    model.upsert_college({"Rating": 1.0, "Courses": "MBA"}, college_id=4)
+    pd.testing.assert_series_equal(snapshot.df.loc[4], snapshot_df.loc[4])
+    assert snapshot.courses.search("mba", 1000) == CourseIndex(snapshot.df).search("mba", 1000)
+
+
+def test_diff_reports_exactly_the_changed_rows(model):
+    snapshot, _ = snapshot_2024(model)
+    snapshot.upsert_college({"Rating": 4.9}, college_id=5)
+
+    changes = model.diff(snapshot, ["Average Fees", "Rating", "City"])
+    fees = model.df["Average Fees"]
+    changed_fees = fees.index[(fees.index % 2 == 0) & fees.notna() & (fees != 0)]
+    assert sorted(changes.loc[changes["column"] == "Average Fees", "college_id"]) == changed_fees.tolist()
+    for college_id, value, other_value in changes.loc[changes["column"] == "Average Fees", ["college_id", "value", "other_value"]].itertuples(index=False):
+        assert value == fees[college_id] and other_value == fees[college_id] * 0.92
+
+    rating = changes[changes["column"] == "Rating"]
+    assert rating["college_id"].tolist() == [5]
+    assert rating["other_value"].tolist() == [4.9]
+    assert not (changes["column"] == "City").any()
+    assert model.diff(model, ["Average Fees", "Rating"]).empty
+
+
+def test_unchanged_indexes_are_shared(model):
+    snapshot, _ = snapshot_2024(model)
+    assert snapshot.aliases is model.aliases
+    assert snapshot.facet_cubes is not model.facet_cubes
+    snapshot.upsert_college({"College Name": "Shared Index Test"}, college_id=6)
+    assert snapshot.aliases is not model.aliases
+    assert model.find_college("Shared Index Test") is None
@@ -0,0 +1,106 @@
+"""
+Packed filter bitmaps and facet cubes against the same filters and
+group-bys written in plain pandas
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from facets import FEE_BUCKETS, RATING_EDGES, RATING_LABELS
+
+FILTERS = [
+    ((), ()),
+    (("Hostel",), ()),
+    (("gym", "library"), ()),
+    (("Swimming Pool", "WiFi"), ()),
+    ((), ("B.Tech",)),
+    ((), ("mba",)),
+    (("hostel",), ("BE", "M.Tech")),
+    (("no such facility",), ()),
+]
+
+
+def pandas_mask(df, facilities=(), programs=()):
+    mask = pd.Series(True, index=df.index)
+    items = df["Facilities"].fillna("").str.lower().str.split(",").map(lambda values: {v.strip() for v in values})
+    for facility in facilities:
+        key = facility.strip().lower()
+        if key == "hostel":
+            mask &= df["Facilities"].fillna("").str.lower().str.contains("hostel", regex=False)
+        else:
+            mask &= items.map(lambda values: key in values)
+    first_words = (df["Courses"].fillna("").str.lower().str.replace(".", "", regex=False).str.split(",").explode()
+                   .str.extract(r"([a-z0-9]+)", expand=False))
+    for program in programs:
+        key = program.lower().replace(".", "")
+        mask &= (first_words == key).groupby(level=0).any()
+    return mask.to_numpy()
+
+
+def pandas_facets(df, mask):
+    rows = df[mask]
+    fees = rows["Average Fees"].astype(float)
+    upper_edges = [upper for upper, _ in FEE_BUCKETS]
+    fee_bucket = pd.cut(fees, [-np.inf] + upper_edges, right=False, labels=[label for _, label in FEE_BUCKETS])
+    rating = pd.cut(rows["Rating"].astype(float), [-np.inf] + RATING_EDGES + [np.inf], right=False, labels=RATING_LABELS[:-1])
+    groups = pd.DataFrame({
+        "city": rows["City"].fillna("Unknown").astype(str).str.strip(),
+        "type": rows["College Type"].fillna("Unknown").astype(str),
+        "university": rows["University"].fillna("Unknown").astype(str),
+        "fee_bucket": fee_bucket.astype(object).where(fees.notna(), "Unknown"),
+        "fees": fees,
+        "rating": rating.astype(object).where(rows["Rating"].notna(), "unrated"),
+    })
+    result = {}
+    for dim in ("city", "type", "university", "fee_bucket"):
+        by = groups.groupby(dim)
+        stats = by["fees"].agg(["size", "count", "min", "max", "mean"])
+        histograms = by["rating"].value_counts().unstack(fill_value=0).reindex(columns=RATING_LABELS, fill_value=0)
+        result[dim] = {
+            value: {
+                "count": int(row["size"]),
+                "fees": {
+                    "min": float(row["min"]) if row["count"] else None,
+                    "max": float(row["max"]) if row["count"] else None,
+                    "mean": round(float(row["mean"]), 2) if row["count"] else None,
+                },
+                "rating_histogram": {label: int(histograms.loc[value, label]) for label in RATING_LABELS},
+            }
+            for value, row in stats.iterrows()
+        }
+    return result
+
+
+def keyed(facets):
+    return {dim: {entry["value"]: {k: v for k, v in entry.items() if k != "value"} for entry in entries}
+            for dim, entries in facets.items()}
+
+
+def assert_facets_match(model, facilities, programs):
+    expected_mask = pandas_mask(model.df, facilities, programs)
+    assert np.array_equal(model.filters.mask(facilities, programs), expected_mask)
+    total, facets = model.facets(facilities, programs, limit=10000)
+    assert total == int(expected_mask.sum())
+    expected = pandas_facets(model.df, expected_mask)
+    actual = keyed(facets)
+    for dim, groups in expected.items():
+        assert actual[dim].keys() == groups.keys(), dim
+        for value, entry in groups.items():
+            assert actual[dim][value]["count"] == entry["count"]
+            assert actual[dim][value]["rating_histogram"] == entry["rating_histogram"]
+            assert actual[dim][value]["fees"] == pytest.approx(entry["fees"]), (dim, value)
+
+
+@pytest.mark.parametrize("facilities, programs", FILTERS)
+def test_bitmaps_and_cubes_match_pandas(model, facilities, programs):
+    assert_facets_match(model, facilities, programs)
+
+
+def test_updated_bitmaps_and_cubes_match_pandas(model):
+    model.facets()
+    model.upsert_college({"Facilities": "Gym, Library", "Courses": "MBA", "City": "Pune", "Average Fees": 95000, "Rating": 4.6}, college_id=2)
+    model.upsert_college({"Average Fees": None, "Rating": None, "University": "Test University"}, college_id=7)
+    model.upsert_college({"College Name": "Facet Test College", "City": "Satara", "College Type": "Private",
+                          "Facilities": "Hostel, Gym", "Courses": "B.Tech Civil Engineering", "Average Fees": 120000})
+    for facilities, programs in FILTERS:
+        assert_facets_match(model, facilities, programs)
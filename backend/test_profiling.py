@@ -0,0 +1,90 @@
+"""
+Request profiling: X-Profile produces Server-Timing, PROFILE_SAMPLE_RATE picks
+requests without it, and the ring buffer behind /api/admin/profiles
+"""
+import re
+from collections import deque
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import profiling
+
+COMPARE = {"colleges": ["PICT", "SPCE"]}
+COMPARE_SPANS = ["find", "extract", "score", "analyze", "recommend", "serialize"]
+
+
+@pytest.fixture(scope="module")
+def client():
+    if main.default_dataset() is None:
+        main.load_model()
+    return TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(monkeypatch):
+    monkeypatch.setattr(profiling, "_samples", deque(maxlen=profiling.BUFFER_SIZE))
+
+
+def server_timing(response):
+    """Server-Timing as [(name, duration ms)]"""
+    return [(name, float(ms)) for name, ms in re.findall(r"([\w-]+);dur=([\d.]+)", response.headers["server-timing"])]
+
+
+def test_x_profile_times_each_compare_phase(client):
+    response = client.post("/api/colleges/compare", json=COMPARE, headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    timings = server_timing(response)
+    assert [name for name, _ in timings] == COMPARE_SPANS + ["total"]
+    total = timings[-1][1]
+    assert all(ms >= 0 for _, ms in timings) and sum(ms for _, ms in timings[:-1]) <= total + 0.01
+
+    samples = client.get("/api/admin/profiles").json()["samples"]
+    assert len(samples) == 1
+    sample = samples[0]
+    assert (sample["method"], sample["path"], sample["forced"]) == ("POST", "/api/colleges/compare", True)
+    assert list(sample["spans_ms"]) == COMPARE_SPANS
+    assert sample["total_ms"] == pytest.approx(total, abs=0.001)
+
+
+def test_requests_are_not_profiled_by_default(client):
+    response = client.post("/api/colleges/compare", json=COMPARE)
+    assert "server-timing" not in response.headers
+    assert client.get("/api/admin/profiles").json()["count"] == 0
+
+
+def test_sample_rate_picks_requests_without_the_header(client, monkeypatch):
+    monkeypatch.setattr(profiling, "SAMPLE_RATE", 0.25)
+    monkeypatch.setattr(profiling, "SLOW_REQUEST_MS", 0.0)
+    # The last draw is for the /api/admin/profiles request itself
+    draws = iter([0.1, 0.3, 0.24, 0.9, 0.5])
+    monkeypatch.setattr(profiling.random, "random", lambda: next(draws))
+
+    profiled = ["server-timing" in client.get("/api/colleges/list").headers for _ in range(4)]
+    assert profiled == [True, False, True, False]
+    samples = client.get("/api/admin/profiles").json()["samples"]
+    assert [sample["forced"] for sample in samples] == [False, False]
+
+
+def test_sampled_requests_are_kept_only_when_slow(client, monkeypatch):
+    monkeypatch.setattr(profiling, "SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profiling, "SLOW_REQUEST_MS", 60_000.0)
+    assert "server-timing" in client.get("/api/colleges/list").headers
+    assert client.get("/api/admin/profiles").json()["count"] == 0
+
+
+def test_ring_buffer_keeps_the_newest_samples(client, monkeypatch):
+    monkeypatch.setattr(profiling, "_samples", deque(maxlen=3))
+    for query in ["a", "b", "c", "d", "e"]:
+        client.get("/api/colleges/search", params={"query": query}, headers={"X-Profile": "1"})
+
+    body = client.get("/api/admin/profiles").json()
+    assert body["count"] == 3
+    assert all(sample["path"] == "/api/colleges/search" for sample in body["samples"])
+    timestamps = [sample["timestamp"] for sample in body["samples"]]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert client.get("/api/admin/profiles", params={"limit": 2}).json()["samples"] == body["samples"][:2]
+
+    assert client.delete("/api/admin/profiles").json()["success"]
+    assert client.get("/api/admin/profiles").json()["count"] == 0
@@ -0,0 +1,81 @@
+"""
+Fact retrieval: rankings against a brute-force TF-IDF cosine, known queries,
+and incremental updates against a rebuild
+"""
+import math
+
+import numpy as np
+import pytest
+
+from course_index import tokenize
+from retrieval import FactIndex, college_terms, hash_token
+
+QUERIES = ["vjti fees", "pict hostel", "mba nagpur", "computer engineering pune", "gym library wifi"]
+
+
+def brute_force_search(df, query, dims, limit):
+    """Dense TF-IDF vectors of every college and cosine similarity to the query"""
+    tf = np.zeros((len(df), dims))
+    for college_id, (_, row) in enumerate(df.iterrows()):
+        for token, weight in college_terms(row).items():
+            tf[college_id, hash_token(token, dims)] += weight
+    doc_freq = (tf > 0).sum(axis=0)
+    idf = np.log((1 + len(df)) / (1 + doc_freq)) + 1.0
+    docs = tf * idf
+    docs /= np.maximum(np.linalg.norm(docs, axis=1, keepdims=True), 1e-12)
+
+    counts = {}
+    for token in tokenize(query):
+        bucket = hash_token(token, dims)
+        counts[bucket] = counts.get(bucket, 0) + 1
+    q = np.zeros(dims)
+    for bucket, count in counts.items():
+        if doc_freq[bucket]:
+            q[bucket] = (1 + math.log(count)) * idf[bucket]
+    q /= np.linalg.norm(q)
+    scores = docs @ q
+    order = sorted(np.flatnonzero(scores > 0), key=lambda college_id: (-scores[college_id], college_id))
+    return [(int(college_id), float(scores[college_id])) for college_id in order[:limit]]
+
+
+def assert_same_ranking(results, expected):
+    assert [college_id for college_id, _ in results] == [college_id for college_id, _ in expected]
+    np.testing.assert_allclose([score for _, score in results], [score for _, score in expected], atol=1e-4)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_brute_force(model, query):
+    index = FactIndex(model.df, dims=4096)
+    assert_same_ranking(index.search(query, 10), brute_force_search(model.df, query, 4096, 10))
+
+
+@pytest.mark.parametrize("query, name", [
+    ("vjti fees", "Veermata Jijabai Technological Institute"),
+    ("pict hostel", "SCTR's Pune Institute of Computer Technology"),
+])
+def test_acronym_queries_find_the_college(model, query, name):
+    (college_id, score), *others = model.retrieve(query, 5)
+    assert model.df.loc[college_id, "College Name"] == name
+    # Well ahead of colleges that only share the generic word
+    assert all(score > 3 * other for _, other in others)
+
+
+def test_nothing_matches_unknown_words(model):
+    assert model.retrieve("zzqx", 5) == []
+    assert model.retrieve("", 5) == []
+
+
+def test_upserts_match_a_rebuild(model):
+    index = model.facts
+    model.upsert_college({"College Name": "Retrieval Renamed Institute", "Facilities": "Gym, Rowing"}, college_id=3)
+    model.upsert_college({"Courses": "MBA, PhD Astrophysics"}, college_id=40)
+    new_id = model.upsert_college({"College Name": "Quasar Institute of Astrophysics", "City": "Nagpur",
+                                   "College Type": "Private", "Courses": "M.Sc Astrophysics"})
+
+    rebuilt = FactIndex(model.df)
+    for attribute in ("buckets", "idf", "offsets", "posting_docs", "posting_weights"):
+        np.testing.assert_array_equal(getattr(index, attribute), getattr(rebuilt, attribute))
+    for query in QUERIES + ["astrophysics", "rowing", "retrieval renamed", "vjti"]:
+        assert index.search(query, 10) == rebuilt.search(query, 10)
+    assert index.search("quasar astrophysics", 1)[0][0] == new_id
+    assert 3 not in [college_id for college_id, _ in index.search("vjti", 10)]
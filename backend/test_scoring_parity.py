@@ -0,0 +1,335 @@
+"""
+Parity check: the precomputed scoring base plus the rule-table kernel must
+reproduce the original calculate_score / analyze_college /
+generate_quota_insights exactly
+"""
+import itertools
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+MODEL_DIR = Path(__file__).parent / "my uploded files" / "final_comparator"
+sys.path.append(str(MODEL_DIR))
+
+import main
+from build_model import CollegeComparator
+from main import PersonalizationFactors, analyze_college, calculate_score, generate_quota_insights, safe_value
+
+# Reference implementation, copied verbatim from main.py before the split
+
+def reference_calculate_score(college_data: Dict, personalization: Optional[PersonalizationFactors] = None) -> float:
+    """calculate_score as it was before the static/personalized split"""
+    score = 5.0  # Base score
+    
+    # Adjust based on fees (lower is better)
+    fees = safe_value(college_data["fees"]["Average Fees"])
+    
+    if personalization and personalization.maxBudget:
+        # Personalized fee scoring based on user's budget
+        if fees and not pd.isna(fees):
+            if fees <= personalization.maxBudget * 0.7:  # Well within budget
+                score += 2.0
+            elif fees <= personalization.maxBudget:  # Within budget
+                score += 1.0
+            elif fees <= personalization.maxBudget * 1.2:  # Slightly over budget
+                score += 0.5
+            else:  # Over budget
+                score -= 1.5
+    else:
+        # Default fee scoring
+        if fees and not pd.isna(fees) and fees < 300000:
+            score += 1.5
+        elif fees and not pd.isna(fees) and fees < 500000:
+            score += 1.0
+        elif fees and not pd.isna(fees) and fees > 1000000:
+            score -= 1.0
+    
+    # Adjust based on type with personalization
+    ownership_type = str(college_data["overview"]["Ownership Type"])
+    is_government = "Public" in ownership_type or "Government" in ownership_type
+    
+    if is_government:
+        if personalization and personalization.prioritizeGovernmentCollege:
+            score += 1.5  # Higher boost if user prefers government
+        else:
+            score += 0.5  # Standard boost
+    
+    # Location preference
+    if personalization and personalization.locationPreference and 'Any' not in personalization.locationPreference:
+        city = str(college_data["location"]["City"])
+        if any(loc.lower() in city.lower() for loc in personalization.locationPreference):
+            score += 1.0  # Bonus for preferred location
+    
+    # Hostel requirement
+    if personalization and personalization.hostelRequired:
+        facilities = str(college_data["facilities"]["Facilities"])
+        if "Hostel" in facilities or "hostel" in facilities.lower():
+            score += 0.8
+        else:
+            score -= 1.0  # Penalty if hostel required but not available
+    
+    # Student-faculty ratio preference
+    if personalization and personalization.preferSmallCampus:
+        students = safe_value(college_data["academics"]["Total Students"])
+        faculty = safe_value(college_data["academics"]["Total Faculty"])
+        
+        if students and faculty and not pd.isna(students) and not pd.isna(faculty) and faculty > 0:
+            ratio = students / faculty
+            if ratio < 15:
+                score += 1.5
+            elif ratio < 20:
+                score += 1.0
+            elif ratio > 30:
+                score -= 0.5
+    
+    # Adjust based on rating
+    rating = safe_value(college_data["rating"]["Rating"])
+    if rating and not pd.isna(rating) and isinstance(rating, (int, float)):
+        score += (rating - 3.0)  # Assuming 3.0 is average
+    
+    # Adjust based on facilities
+    facilities = str(college_data["facilities"]["Facilities"])
+    if facilities and facilities != "nan" and len(facilities) > 100:
+        score += 0.5
+    
+    # Ensure score is between 0 and 10
+    return max(0.0, min(10.0, score))
+
+def reference_analyze_college(college_data: Dict, personalization: Optional[PersonalizationFactors] = None) -> tuple:
+    """analyze_college as it was before the static/personalized split"""
+    strengths = []
+    weaknesses = []
+    
+    # Check fees with personalization
+    fees = safe_value(college_data["fees"]["Average Fees"])
+    
+    if personalization and personalization.maxBudget and fees and not pd.isna(fees):
+        if fees <= personalization.maxBudget * 0.7:
+            strengths.append(f"Well within your budget (₹{fees/100000:.1f}L)")
+        elif fees <= personalization.maxBudget:
+            strengths.append(f"Within your budget (₹{fees/100000:.1f}L)")
+        elif fees > personalization.maxBudget * 1.2:
+            weaknesses.append(f"Above your budget (₹{fees/100000:.1f}L)")
+    else:
+        if fees and not pd.isna(fees) and fees < 300000:
+            strengths.append("Affordable fees")
+        elif fees and not pd.isna(fees) and fees > 800000:
+            weaknesses.append("High fees")
+    
+    # Check type
+    ownership_type = str(college_data["overview"]["Ownership Type"])
+    if "Public" in ownership_type or "Government" in ownership_type:
+        strengths.append("Government college")
+    
+    # Check students
+    students = safe_value(college_data["academics"]["Total Students"])
+    if students and not pd.isna(students) and students > 3000:
+        strengths.append("Large student community")
+    elif students and not pd.isna(students) and students < 1000:
+        weaknesses.append("Small student body")
+    
+    # Check faculty
+    faculty = safe_value(college_data["academics"]["Total Faculty"])
+    students = safe_value(college_data["academics"]["Total Students"])
+    if faculty and students and not pd.isna(faculty) and not pd.isna(students):
+        ratio = students / faculty
+        if ratio < 20:
+            strengths.append("Good student-faculty ratio")
+        elif ratio > 30:
+            weaknesses.append("High student-faculty ratio")
+    
+    # Check facilities with personalization
+    facilities = str(college_data["facilities"]["Facilities"])
+    if facilities and facilities != "nan":
+        has_hostel = "Hostel" in facilities or "hostel" in facilities.lower()
+        
+        if personalization and personalization.hostelRequired:
+            if has_hostel:
+                strengths.append("Hostel available (as required)")
+            else:
+                weaknesses.append("No hostel facility")
+        elif has_hostel:
+            strengths.append("Hostel available")
+            
+        if "Gym" in facilities and "Sports" in facilities:
+            strengths.append("Good sports facilities")
+    
+    # Location match
+    if personalization and personalization.locationPreference and 'Any' not in personalization.locationPreference:
+        city = str(college_data["location"]["City"])
+        if any(loc.lower() in city.lower() for loc in personalization.locationPreference):
+            strengths.append(f"In your preferred location ({city})")
+    
+    return strengths[:4], weaknesses[:3]  # Limit strengths to top 4, weaknesses to 3
+
+
+def reference_generate_quota_insights(college_data: Dict, personalization: PersonalizationFactors) -> Dict[str, Any]:
+    """generate_quota_insights as it was before the rule table"""
+    insights = {
+        "category": personalization.category,
+        "applicable_quotas": [],
+        "fee_benefits": [],
+        "admission_notes": []
+    }
+    
+    ownership_type = str(college_data["overview"]["Ownership Type"])
+    is_government = "Public" in ownership_type or "Government" in ownership_type
+    fees = safe_value(college_data["fees"]["Average Fees"])
+    
+    # Category-specific quota information
+    if personalization.category in ['SC', 'ST']:
+        insights["applicable_quotas"].append(f"{personalization.category} Reservation (15%/7.5% seats)")
+        if is_government:
+            insights["fee_benefits"].append("Fee concession/waiver available for SC/ST students")
+            insights["admission_notes"].append("Lower cutoff marks applicable")
+        insights["admission_notes"].append("Post-matric scholarship available")
+    
+    elif personalization.category == 'OBC':
+        insights["applicable_quotas"].append("OBC Reservation (27% seats)")
+        if is_government and fees and fees < 800000:
+            insights["fee_benefits"].append("May qualify for fee concession")
+        insights["admission_notes"].append("Creamy layer certificate required")
+    
+    elif personalization.category == 'EWS':
+        insights["applicable_quotas"].append("EWS Reservation (10% seats)")
+        if is_government:
+            insights["fee_benefits"].append("Fee structure same as general category")
+        insights["admission_notes"].append("Income certificate (< ₹8 lakh) required")
+    
+    elif personalization.category in ['NT-A', 'NT-B', 'NT-C', 'NT-D', 'VJ-A', 'SBC', 'SEBC']:
+        insights["applicable_quotas"].append(f"{personalization.category} Reservation (Maharashtra State)")
+        if is_government:
+            insights["fee_benefits"].append("State-level fee concessions may apply")
+        insights["admission_notes"].append("Domicile certificate required")
+    
+    # Domicile-specific information
+    if personalization.domicile == 'Maharashtra':
+        insights["admission_notes"].append("Home state quota applicable (85% seats)")
+    else:
+        insights["admission_notes"].append("All India quota applicable (15% seats)")
+        insights["admission_notes"].append("Higher cutoff may be required")
+    
+    # Gender-specific information
+    facilities = str(college_data["facilities"]["Facilities"])
+    if personalization.gender == 'Female':
+        if "Girls Hostel" in facilities or "girls hostel" in facilities.lower():
+            insights["admission_notes"].append("Girls hostel available")
+        if is_government:
+            insights["fee_benefits"].append("May qualify for girls' scholarships")
+    
+    # Financial aid information
+    if fees and fees > 200000:
+        insights["admission_notes"].append("Education loan facilities available")
+    
+    return insights
+
+def personalization_grid():
+    yield None
+    budgets = [None, 100000, 200000, 300000, 1000000]
+    locations = [[], ["Pune"], ["Any"], ["mumbai", "Nagpur"]]
+    for budget, hostel, location, small, government in itertools.product(
+        budgets, [False, True], locations, [False, True], [False, True]
+    ):
+        yield PersonalizationFactors(
+            category="General", gender="Male", domicile="Maharashtra",
+            maxBudget=budget, hostelRequired=hostel, locationPreference=location,
+            preferSmallCampus=small, prioritizeGovernmentCollege=government
+        )
+
+def load_colleges():
+    if main.default_dataset() is None:
+        main.import_model_modules()
+        model = CollegeComparator(str(MODEL_DIR / "maharashtra_colleges_location.csv"))
+        main.load_scoring_rules()
+        main.datasets[main.DEFAULT_DATASET] = main.Dataset(main.DEFAULT_DATASET, model)
+        main.build_college_bases()
+    model = main.default_dataset().model
+    return [model.extract(college) for _, college in model.df.iterrows()]
+
+def check_parity():
+    colleges = load_colleges()
+    checked = 0
+    for personalization in personalization_grid():
+        for college_data in colleges:
+            assert calculate_score(college_data, personalization) == reference_calculate_score(college_data, personalization)
+            assert analyze_college(college_data, personalization) == reference_analyze_college(college_data, personalization)
+            checked += 1
+    return checked
+
+def test_scoring_parity():
+    assert check_parity() > 0
+
+def test_vectorized_kernel_parity():
+    colleges = load_colleges()
+    for personalization in personalization_grid():
+        scores = main.scoring_kernel.score(main.get_score_features(), personalization)[0]
+        for college_data in colleges:
+            assert scores[college_data["id"]] == reference_calculate_score(college_data, personalization)
+
+def test_variant_scores_do_not_depend_on_other_variants():
+    load_colleges()
+    rules = main.scoring_rules
+    budget_bands = rules["score"]["budget_bands"]
+    variants = [
+        rules,
+        # An extra band the active table lacks, with an operator it does not use
+        main.merge_rules(rules, {"score": {"budget_bands": budget_bands + [{"op": ">", "value": 1.2, "points": -1.0}]}}),
+        main.merge_rules(rules, {"score": {"budget_bands": budget_bands[:1], "default_fee_bands": [{"op": ">=", "value": 0, "points": 0.5}]}}),
+        main.merge_rules(rules, {"score": {"small_campus_ratio_bands": []}}),
+    ]
+    features = main.get_score_features()
+    for personalization in itertools.islice(personalization_grid(), 0, None, 7):
+        mixed = main.ScoringKernel(variants).score(features, personalization)
+        for row, table in zip(mixed, variants):
+            assert row.tolist() == main.ScoringKernel([table]).score(features, personalization)[0].tolist()
+
+def test_quota_insights_parity():
+    colleges = load_colleges()
+    categories = ["General", "SC", "ST", "OBC", "EWS", "NT-B", "SEBC"]
+    for category, gender, domicile in itertools.product(categories, ["Male", "Female"], ["Maharashtra", "Other"]):
+        personalization = PersonalizationFactors(category=category, gender=gender, domicile=domicile)
+        for college_data in colleges:
+            assert generate_quota_insights(college_data, personalization) == reference_generate_quota_insights(college_data, personalization)
+
+def test_scoring_parity_without_precomputed_base():
+    colleges = load_colleges()
+    personalization = PersonalizationFactors(category="OBC", gender="Female", domicile="Maharashtra", maxBudget=250000, hostelRequired=True)
+    for college_data in colleges[:50]:
+        uncached = {key: value for key, value in college_data.items() if key != "id"}
+        assert calculate_score(uncached, personalization) == reference_calculate_score(college_data, personalization)
+        assert analyze_college(uncached, personalization) == reference_analyze_college(college_data, personalization)
+
+def test_shortlist_matches_calculate_score():
+    colleges = load_colleges()
+    request = main.ShortlistRequest(
+        personalization=PersonalizationFactors(category="OBC", gender="Female", domicile="Maharashtra",
+                                               maxBudget=200000, hostelRequired=True, locationPreference=["Pune"]),
+        maxFees=250000, facilities=["hostel"], maxPerCity=3, size=20
+    )
+    ids, scores, considered = main.build_shortlist(main.default_dataset(), request)
+    eligible = [
+        college_data for college_data in colleges
+        if "hostel" in str(college_data["facilities"]["Facilities"]).lower()
+        and safe_value(college_data["fees"]["Average Fees"]) and college_data["fees"]["Average Fees"] <= 250000
+    ]
+    ranked = sorted(eligible, key=lambda college_data: -reference_calculate_score(college_data, request.personalization))
+    expected, per_city = [], {}
+    for college_data in ranked:
+        city = str(college_data["location"]["City"]).lower()
+        if per_city.get(city, 0) < 3:
+            per_city[city] = per_city.get(city, 0) + 1
+            expected.append(college_data["id"])
+    assert considered == len(eligible)
+    assert ids.tolist() == expected[:20]
+    assert scores.tolist() == [reference_calculate_score(colleges[i], request.personalization) for i in expected[:20]]
+
+if __name__ == "__main__":
+    checked = check_parity()
+    test_scoring_parity_without_precomputed_base()
+    test_vectorized_kernel_parity()
+    test_quota_insights_parity()
+    test_variant_scores_do_not_depend_on_other_variants()
+    test_shortlist_matches_calculate_score()
+    print(f"✓ Scoring parity holds for {checked} college/personalization pairs")
@@ -0,0 +1,56 @@
+"""
+Similar-college neighbour lists after incremental updates against a brute-force
+search over every college
+"""
+import numpy as np
+import pytest
+
+from similarity import SimilarityIndex
+
+
+def brute_force_neighbors(index, df):
+    """Every college's distances to all others, with the index's build-time scaling"""
+    vectors = index._vectorize(df).astype(np.float64)
+    d = np.sqrt(np.maximum(((vectors[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2), 0.0))
+    np.fill_diagonal(d, np.inf)
+    return d
+
+
+def assert_matches_brute_force(index, df):
+    d = brute_force_neighbors(index, df)
+    k = min(index.k, len(df) - 1)
+    expected = np.sort(d, axis=1)[:, :k]
+    assert index.neighbors.shape == (len(df), index.k)
+    np.testing.assert_allclose(index.distances[:, :k], expected, atol=1e-3)
+    # Ties may be listed in any order, but every listed neighbour is at its listed distance
+    rows = np.arange(len(df))[:, None]
+    np.testing.assert_allclose(d[rows, index.neighbors[:, :k]], index.distances[:, :k], atol=1e-3)
+    assert all(len(set(row)) == k for row in index.neighbors[:, :k])
+
+
+def test_fresh_index_matches_brute_force(model):
+    assert_matches_brute_force(model.similarity, model.df)
+
+
+def test_upserts_match_brute_force(model):
+    index = model.similarity
+    clone = model.df.loc[3].drop(["name_clean", "location"]).to_dict()
+    clone_id = model.upsert_college(dict(clone, **{"College Name": "Similarity Clone College"}))
+    first_neighbor = int(index.neighbors[0, 0])
+    model.upsert_college({"Average Fees": 5_000_000, "Rating": 1.0, "Courses": "PhD Marine Biology"}, college_id=first_neighbor)
+    model.upsert_college({"Facilities": "Gym", "College Type": "Government"}, college_id=20)
+    model.upsert_college({"College Name": "Similarity Sparse College", "City": "Pune", "College Type": "Private"})
+
+    assert_matches_brute_force(index, model.df)
+    assert index.query(3, 1) == [(clone_id, 1.0)]
+    assert first_neighbor not in index.neighbors[0]
+
+
+@pytest.mark.parametrize("k", [1, 3])
+def test_small_data_and_k(model, k):
+    df = model.df.iloc[:8].copy()
+    index = SimilarityIndex(df, k=k)
+    assert_matches_brute_force(index, df)
+    df.loc[2, "Average Fees"] = 1.0
+    index.update(df, [2])
+    assert_matches_brute_force(index, df)
@@ -0,0 +1,99 @@
+"""
+Request coalescing: concurrent identical calls share one execution, its
+result and its error
+"""
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+CALLERS = 8
+
+
+class Blocking:
+    """Counts calls and holds each one until released, so every caller can join it"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return self.result, args
+
+
+async def run_together(flight, fn, key="key", callers=CALLERS, *args):
+    tasks = [asyncio.ensure_future(flight.run(key, fn, *args)) for _ in range(callers)]
+    await asyncio.sleep(0.05)
+    fn.release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    fn = Blocking(result={"score": 1})
+    results = asyncio.run(run_together(flight, fn, "key", CALLERS, "a", "b"))
+
+    assert fn.calls == 1
+    assert all(result is results[0] for result in results)
+    assert results[0] == ({"score": 1}, ("a", "b"))
+    assert flight.stats() == {"enabled": True, "calls": CALLERS, "executions": 1, "coalesced": CALLERS - 1, "in_flight": 0}
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    fn = Blocking(error=ValueError("no such college"))
+    results = asyncio.run(run_together(flight, fn))
+
+    assert fn.calls == 1
+    assert all(isinstance(result, ValueError) and str(result) == "no such college" for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_key_is_released_after_the_call_finishes():
+    async def scenario():
+        flight = SingleFlight()
+        fn = Blocking(result=1)
+        fn.release.set()
+        await flight.run("key", fn)
+        await flight.run("key", fn)
+        await asyncio.gather(flight.run("a", fn), flight.run("b", fn))
+        return fn.calls
+
+    assert asyncio.run(scenario()) == 4
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+        fn = Blocking(result=2)
+        first = asyncio.ensure_future(flight.run("key", fn))
+        second = asyncio.ensure_future(flight.run("key", fn))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0)
+        fn.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, fn.calls
+
+    assert asyncio.run(scenario()) == ((2, ()), 1)
+
+
+def test_disabled_runs_every_call():
+    flight = SingleFlight(enabled=False)
+    fn = Blocking(result=3)
+    results = asyncio.run(run_together(flight, fn))
+
+    assert fn.calls == CALLERS
+    assert results == [(3, ())] * CALLERS
+    assert flight.stats()["coalesced"] == 0
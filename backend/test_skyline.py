@@ -0,0 +1,72 @@
+"""
+Skyline frontier against a brute-force dominance check, and incremental
+updates against a rebuild
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from skyline import CRITERIA, SkylineIndex, criteria_columns, pareto_front
+
+
+def brute_force_front(points):
+    """Rows no other row dominates (all <=, one <), checked pairwise"""
+    keep = []
+    for i, row in enumerate(points):
+        dominated = any(np.all(other <= row) and np.any(other < row) for j, other in enumerate(points) if j != i)
+        if not dominated:
+            keep.append(i)
+    return keep
+
+
+def brute_force_frontier(df, criteria, city=None, college_type=None):
+    columns = criteria_columns(df)
+    points = np.column_stack([columns[name] * CRITERIA[name] for name in criteria])
+    selected = ~np.isnan(points).any(axis=1)
+    if city:
+        selected &= df["City"].map(str).str.strip().str.lower().to_numpy() == city.lower()
+    if college_type:
+        selected &= df["College Type"].map(str).str.lower().str.contains(college_type.lower(), regex=False).to_numpy()
+    ids = np.flatnonzero(selected)
+    return sorted(ids[brute_force_front(points[ids])].tolist())
+
+
+CRITERIA_SETS = [names for size in (1, 2, 3) for names in itertools.combinations(CRITERIA, size)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pareto_front_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    # Small integer grids give plenty of ties and duplicate rows
+    points = rng.integers(0, 6, size=(300, 3)).astype(float)
+    order = np.lexsort((points.sum(axis=1), points.min(axis=1)))
+    found = order[pareto_front(points[order], block_size=64)]
+    assert sorted(found.tolist()) == brute_force_front(points)
+
+
+@pytest.mark.parametrize("criteria", CRITERIA_SETS)
+def test_frontier_matches_brute_force(model, criteria):
+    ids, _, _ = model.skyline.frontier(criteria)
+    assert sorted(ids.tolist()) == brute_force_frontier(model.df, criteria)
+
+
+@pytest.mark.parametrize("city, college_type", [("Pune", None), (None, "government"), ("Mumbai", "private")])
+def test_filtered_frontier_matches_brute_force(model, city, college_type):
+    ids, _, _ = model.skyline.frontier(tuple(CRITERIA), city, college_type)
+    assert sorted(ids.tolist()) == brute_force_frontier(model.df, tuple(CRITERIA), city, college_type)
+
+
+def test_incremental_update_matches_rebuild(model):
+    model.skyline.frontier(("fees", "rating"))
+    model.upsert_college({"Average Fees": 1000, "Rating": 5.0, "City": "Pune"}, college_id=10)
+    model.upsert_college({"Average Fees": None}, college_id=11)
+    model.upsert_college({"College Name": "Skyline Test College", "City": "Nagpur", "College Type": "Private",
+                          "Average Fees": 50000, "Rating": 4.9, "Total Faculty": 200, "Total Student Enrollments": 1000})
+    rebuilt = SkylineIndex(model.df)
+    for criteria in CRITERIA_SETS:
+        for city in (None, "Pune", "Nagpur"):
+            updated, considered, skipped = model.skyline.frontier(criteria, city)
+            expected, expected_considered, expected_skipped = rebuilt.frontier(criteria, city)
+            assert sorted(updated.tolist()) == sorted(expected.tolist())
+            assert (considered, skipped) == (expected_considered, expected_skipped)
@@ -2,6 +2,11 @@ import { NextRequest, NextResponse } from 'next/server';
 
 const HUGGINGFACE_API_KEY = process.env.HUGGINGFACE_API_KEY || '';
 const GEMINI_API_KEY = process.env.GEMINI_API_KEY || '';
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+// Retrieval is best-effort: answer without college data rather than wait on the backend
+const RETRIEVAL_TIMEOUT_MS = 1500;
+// Facts below this similarity are too loosely related to quote
+const MIN_FACT_SCORE = 0.15;
 
 // College counselor system prompt
 const SYSTEM_PROMPT = `You are an AI College Counselor for Margadarshak, a college guidance platform for MHT-CET students in Maharashtra, India.
@@ -31,6 +36,14 @@ interface Message {
   content: string;
 }
 
+interface CollegeFact {
+  id: number;
+  name: string;
+  city: string;
+  score: number;
+  text: string;
+}
+
 // Free API fallback responses for common questions
 const FALLBACK_RESPONSES: Record<string, string> = {
   'cutoff': "MHT-CET cutoffs vary by college, branch, and category. Top colleges like VJTI, COEP, and MIT typically have cutoffs in the range of 500-5000 ranks for open category students. Government colleges generally have lower cutoffs than private ones. For personalized cutoff information, I recommend using our College Comparator to see detailed data for specific colleges.",
@@ -41,19 +54,42 @@ const FALLBACK_RESPONSES: Record<string, string> = {
   
   'admission': "MHT-CET admission process: 1) Register for MHT-CET exam, 2) Take the exam (PCM/PCB), 3) Check results and calculate percentile, 4) Participate in CAP rounds (Centralized Admission Process), 5) Fill choice form with preferred colleges, 6) Document verification, 7) Seat allotment, 8) Accept seat and pay fees. Important: Keep all certificates ready (Domicile, Caste, Income, etc.).",
   
-  'vjti': "VJTI (Veermata Jijabai Technological Institute) is one of Mumbai's premier government engineering colleges. Key features: Established 1887, Government college with low fees (₹80K/year), Strong placements (average 8-12 LPA), Top branches: Computer, IT, Electronics. Typical cutoff: 500-3000 rank for Computer Science (Open category). Great ROI and strong alumni network. Use our College Comparator to compare VJTI with other colleges!",
-  
-  'mit': "MIT College of Engineering, Pune is a top private college. Features: Established 1983, Private college (₹3.5-4L/year), Excellent infrastructure and facilities, Good placements (average 6-8 LPA), Strong industry connections. Popular branches: Computer, IT, Mechanical, Electronics. Cutoff ranges from 5000-20000 depending on branch and category.",
-  
   'scholarship': "Scholarships available: 1) Post-Matric Scholarship for SC/ST/OBC students (income < ₹8L), 2) EBC Scholarship for economically backward students, 3) Minority scholarships, 4) Merit-based college scholarships, 5) National Scholarships Portal (NSP) schemes, 6) State government schemes. Most government colleges also offer fee waivers for reserved categories.",
   
   'career': "Popular engineering career paths: 1) Software Engineering (highest demand, 5-15 LPA), 2) Data Science/AI/ML (growing field, 6-20 LPA), 3) Core Engineering (Mechanical, Civil, Electrical, 4-8 LPA), 4) Higher studies (M.Tech/MBA/MS abroad), 5) Government jobs (GATE/PSU/ESE), 6) Entrepreneurship. Consider your interests, aptitude, and market demand when choosing.",
 };
 
-async function getHuggingFaceResponse(messages: Message[]): Promise<string> {
+// Top matching colleges from the backend's retrieval index, [] if it is unavailable
+async function getCollegeFacts(query: string): Promise<CollegeFact[]> {
+  const controller = new AbortController();
+  const timeoutId = setTimeout(() => controller.abort(), RETRIEVAL_TIMEOUT_MS);
+  try {
+    const response = await fetch(
+      `${API_URL}/api/colleges/retrieve?query=${encodeURIComponent(query)}&limit=5`,
+      { signal: controller.signal }
+    );
+    if (!response.ok) {
+      console.log('[Chatbot] Retrieval failed:', response.status);
+      return [];
+    }
+    const data = await response.json();
+    return (data.results || []).filter((fact: CollegeFact) => fact.score >= MIN_FACT_SCORE);
+  } catch (error) {
+    console.log('[Chatbot] Retrieval unavailable, answering without college data');
+    return [];
+  } finally {
+    clearTimeout(timeoutId);
+  }
+}
+
+function formatFacts(facts: CollegeFact[]): string {
+  return facts.map((fact) => `- ${fact.text}`).join('\n');
+}
+
+async function getHuggingFaceResponse(messages: Message[], facts: CollegeFact[]): Promise<string> {
   if (!HUGGINGFACE_API_KEY) {
     console.log('[Chatbot] No Hugging Face API key found, using fallback');
-    return getFallbackResponse(messages[messages.length - 1].content);
+    return getFallbackResponse(messages[messages.length - 1].content, facts);
   }
 
   try {
@@ -61,7 +97,8 @@ async function getHuggingFaceResponse(messages: Message[]): Promise<string> {
     
     // Use Google's FLAN-T5 - reliable and fast on free tier
     const userMessage = messages[messages.length - 1].content;
-    const promptText = `You are a helpful college counselor for Maharashtra students. Answer this question concisely:\n\nQuestion: ${userMessage}\n\nAnswer:`;
+    const context = facts.length > 0 ? `College data:\n${formatFacts(facts)}\n\n` : '';
+    const promptText = `You are a helpful college counselor for Maharashtra students. Answer this question concisely using the college data if it is relevant:\n\n${context}Question: ${userMessage}\n\nAnswer:`;
     
     const response = await fetch(
       'https://api-inference.huggingface.co/models/google/flan-t5-large',
@@ -91,7 +128,7 @@ async function getHuggingFaceResponse(messages: Message[]): Promise<string> {
         console.log('[Chatbot] Model is loading, using fallback for now');
       }
       
-      return getFallbackResponse(messages[messages.length - 1].content);
+      return getFallbackResponse(messages[messages.length - 1].content, facts);
     }
 
     const data = await response.json();
@@ -107,17 +144,17 @@ async function getHuggingFaceResponse(messages: Message[]): Promise<string> {
     }
     
     console.log('[Chatbot] Unexpected response format, using fallback');
-    return getFallbackResponse(messages[messages.length - 1].content);
+    return getFallbackResponse(messages[messages.length - 1].content, facts);
   } catch (error) {
     console.error('[Chatbot] Hugging Face API error:', error);
-    return getFallbackResponse(messages[messages.length - 1].content);
+    return getFallbackResponse(messages[messages.length - 1].content, facts);
   }
 }
 
-async function getGeminiResponse(messages: Message[]): Promise<string> {
+async function getGeminiResponse(messages: Message[], facts: CollegeFact[]): Promise<string> {
   if (!GEMINI_API_KEY) {
     console.log('[Chatbot] No Gemini API key found, using fallback');
-    return getFallbackResponse(messages[messages.length - 1].content);
+    return getFallbackResponse(messages[messages.length - 1].content, facts);
   }
 
   try {
@@ -128,6 +165,9 @@ async function getGeminiResponse(messages: Message[]): Promise<string> {
     const conversationHistory = messages.slice(-6).map(m => 
       `${m.role === 'user' ? 'Student' : 'Counselor'}: ${m.content}`
     ).join('\n\n');
+    const collegeData = facts.length > 0
+      ? `\n\nCollege data from the Margadarshak database (use these figures rather than estimates):\n${formatFacts(facts)}`
+      : '';
     
     // Try multiple model versions for compatibility
     const modelsToTry = [
@@ -152,7 +192,7 @@ async function getGeminiResponse(messages: Message[]): Promise<string> {
                 {
                   parts: [
                     {
-                      text: `${SYSTEM_PROMPT}\n\nConversation History:\n${conversationHistory}\n\nProvide a helpful, detailed response to the student's question (2-4 paragraphs). Be specific about colleges, cutoffs, and procedures when relevant.`,
+                      text: `${SYSTEM_PROMPT}${collegeData}\n\nConversation History:\n${conversationHistory}\n\nProvide a helpful, detailed response to the student's question (2-4 paragraphs). Be specific about colleges, cutoffs, and procedures when relevant.`,
                     },
                   ],
                 },
@@ -207,11 +247,11 @@ async function getGeminiResponse(messages: Message[]): Promise<string> {
     
     // If all models failed, use fallback
     console.log('[Chatbot] All Gemini models failed, using fallback');
-    return getFallbackResponse(messages[messages.length - 1].content);
+    return getFallbackResponse(messages[messages.length - 1].content, facts);
     
   } catch (error) {
     console.error('[Chatbot] Gemini API error:', error);
-    return getFallbackResponse(messages[messages.length - 1].content);
+    return getFallbackResponse(messages[messages.length - 1].content, facts);
   }
 }
 
@@ -230,16 +270,23 @@ function buildPrompt(messages: Message[]): string {
   return prompt;
 }
 
-function getFallbackResponse(userMessage: string): string {
+function getFallbackResponse(userMessage: string, facts: CollegeFact[] = []): string {
   const lowerMessage = userMessage.toLowerCase();
+  const factsBlock = facts.length > 0
+    ? `Here is what our college database has on this:\n\n${formatFacts(facts.slice(0, 3))}\n\nUse the College Comparator for a detailed side-by-side comparison.`
+    : '';
   
   // Check for keywords and return appropriate response
   for (const [keyword, response] of Object.entries(FALLBACK_RESPONSES)) {
     if (lowerMessage.includes(keyword)) {
-      return response;
+      return factsBlock ? `${response}\n\n${factsBlock}` : response;
     }
   }
   
+  if (factsBlock) {
+    return factsBlock;
+  }
+  
   // Default response
   return `Thank you for your question! I can help you with:
 
@@ -287,18 +334,22 @@ export async function POST(request: NextRequest) {
       huggingFaceKeyPrefix: HUGGINGFACE_API_KEY ? HUGGINGFACE_API_KEY.substring(0, 6) + '...' : 'none'
     });
 
+    // Ground every answer in the dataset when the backend is reachable
+    const facts = await getCollegeFacts(message);
+    console.log(`[Chatbot] Retrieved ${facts.length} college facts`);
+
     // Try Gemini first (better quality), then Hugging Face, then fallback
     let response: string;
     
     if (GEMINI_API_KEY) {
       console.log('[Chatbot] Using Gemini API');
-      response = await getGeminiResponse(messages);
+      response = await getGeminiResponse(messages, facts);
     } else if (HUGGINGFACE_API_KEY) {
       console.log('[Chatbot] Using Hugging Face API');
-      response = await getHuggingFaceResponse(messages);
+      response = await getHuggingFaceResponse(messages, facts);
     } else {
       console.log('[Chatbot] Using fallback responses (no API keys configured)');
-      response = getFallbackResponse(message);
+      response = getFallbackResponse(message, facts);
     }
 
     return NextResponse.json({ response });
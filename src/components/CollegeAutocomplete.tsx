@@ -10,6 +10,9 @@ interface CollegeSuggestion {
   fees: number | null;
 }
 
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+const SOCKET_URL = `${API_URL.replace(/^http/, 'ws')}/api/colleges/autocomplete/ws`;
+
 interface CollegeAutocompleteProps {
   value: string;
   onChange: (value: string) => void;
@@ -29,6 +32,36 @@ export function CollegeAutocomplete({
   const [selectedIndex, setSelectedIndex] = useState(-1);
   const wrapperRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLInputElement>(null);
+  // One autocomplete session per input: the backend narrows each keystroke's
+  // matches from the previous query's instead of rescanning every college
+  const socketRef = useRef<WebSocket | null>(null);
+  const requestIdRef = useRef(0);
+  const socketUnavailableRef = useRef(false);
+
+  const openSocket = () => {
+    if (socketRef.current || socketUnavailableRef.current || typeof WebSocket === 'undefined') return;
+    const socket = new WebSocket(SOCKET_URL);
+    let connected = false;
+    socket.onopen = () => {
+      connected = true;
+    };
+    socket.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      // Answers to queries typed over since are ignored
+      if (data.id !== requestIdRef.current) return;
+      setSuggestions(data.suggestions || []);
+      setIsOpen((data.suggestions || []).length > 0);
+      setLoading(false);
+    };
+    socket.onclose = () => {
+      if (socketRef.current === socket) socketRef.current = null;
+      // Never connected (e.g. a proxy without WebSocket support): stay on HTTP
+      if (!connected) socketUnavailableRef.current = true;
+    };
+    socketRef.current = socket;
+  };
+
+  useEffect(() => () => socketRef.current?.close(), []);
 
   // Close dropdown when clicking outside
   useEffect(() => {
@@ -45,20 +78,28 @@ export function CollegeAutocomplete({
   // Fetch suggestions when user types
   useEffect(() => {
     const fetchSuggestions = async () => {
+      const requestId = ++requestIdRef.current;
       if (value.length < 2) {
         setSuggestions([]);
         setIsOpen(false);
+        setLoading(false);
         return;
       }
 
       setLoading(true);
+      const socket = socketRef.current;
+      if (socket?.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ id: requestId, query: value, limit: 8 }));
+        return;
+      }
+      // Plain HTTP until the socket is connected (or if it cannot connect)
+      openSocket();
       try {
-        const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
         const response = await fetch(
           `${API_URL}/api/colleges/autocomplete?query=${encodeURIComponent(value)}&limit=8`
         );
 
-        if (response.ok) {
+        if (response.ok && requestId === requestIdRef.current) {
           const data = await response.json();
           setSuggestions(data.suggestions || []);
           setIsOpen(data.suggestions.length > 0);
@@ -71,8 +112,9 @@ export function CollegeAutocomplete({
       }
     };
 
-    // Debounce API calls
-    const timeoutId = setTimeout(fetchSuggestions, 300);
+    // Debounce HTTP calls; over the socket each keystroke is cheap
+    const delay = socketRef.current?.readyState === WebSocket.OPEN ? 50 : 300;
+    const timeoutId = setTimeout(fetchSuggestions, delay);
     return () => clearTimeout(timeoutId);
   }, [value]);
 
@@ -6,6 +6,13 @@ import { UserProfile } from '@/types/profile';
 import { ProfileService } from '@/services/profileService';
 import { CollegeAutocomplete } from './CollegeAutocomplete';
 
+// Only the fields ComparisonResults displays; the full course and facility
+// lists are several KB per college and never shown on the cards
+const CARD_FIELDS = [
+  'score', 'strengths', 'weaknesses', 'quota_insights', 'city', 'state', 'type', 'established',
+  'total_students', 'total_faculty', 'student_faculty_ratio', 'google_maps',
+].join(',');
+
 interface CollegeComparatorProps {
   onComparisonComplete: (data: any) => void;
   onLoadingChange: (loading: boolean) => void;
@@ -69,7 +76,7 @@ export function CollegeComparator({
         requestBody.personalization = ProfileService.getComparisonFactors(userProfile);
       }
 
-      const response = await fetch(`${API_URL}/api/colleges/compare`, {
+      const response = await fetch(`${API_URL}/api/colleges/compare?fields=${CARD_FIELDS}`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -15,15 +15,15 @@ interface ComparisonData {
       state: string;
       type: string;
       established: number;
-      university: string;
-      campus_size: string;
+      university?: string;
+      campus_size?: string;
       total_students: number;
       total_faculty: number;
       student_faculty_ratio: number | null;
-      fees: number;
-      rating: number;
-      facilities: string;
-      courses: string;
+      fees?: number;
+      rating?: number;
+      facilities?: string;
+      courses?: string;
       google_maps: string;
     };
     quota_insights?: {